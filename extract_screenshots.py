@@ -1,48 +1,87 @@
 """
-Extract frames from test videos to show visual changes.
+Render screenshots of the test videos to show visual changes.
+
+Frames are rendered directly at the wanted times with render_frame_at, so
+the videos do not need to be rendered first.
 """
 
 import cv2
-import os
+from karaoke import render_frame_at
 
 
-def extract_frame(video_path, time_seconds, output_path):
-    """Extract a frame from video at specified time."""
-    if not os.path.exists(video_path):
-        print(f"Video not found: {video_path}")
-        return False
-    
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_number = int(time_seconds * fps)
-    
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-    ret, frame = cap.read()
-    
-    cap.release()
+# Settings of comprehensive_test.mp4 (see test_comprehensive.py)
+COMPREHENSIVE_CONFIG = {
+    'lyrics_data': [
+        {'text': 'Welcome to tiakalo.org karaoke', 'start_time': 0.0, 'end_time': 3.0},
+        {'text': 'Testing transparent header', 'start_time': 3.0, 'end_time': 6.0},
+        {'text': 'Long pause coming up...', 'start_time': 6.0, 'end_time': 9.0},
+        {'text': 'Pause time shows remaining', 'start_time': 13.0, 'end_time': 16.0},
+        {'text': 'Dark overlay helps visibility', 'start_time': 16.0, 'end_time': 19.0}
+    ],
+    'width': 1280,
+    'height': 720,
+    'fps': 30,
+    'font_size': 52,
+    'style': 'bold',
+    'bg_color': (10, 10, 30),
+    'bg_image': 'bg.jpg',
+    'show_header': True,
+    'show_time': True,
+    'title_duration': 3.0,
+    'song_title': 'This title should be skipped',
+    'artist_name': 'Test Artist'
+}
+
+# Settings of test_bg_overlay.mp4 (see test_overlay.py)
+OVERLAY_CONFIG = {
+    'lyrics_data': [
+        {'text': 'Testing text visibility', 'start_time': 0.0, 'end_time': 3.0},
+        {'text': 'With background image overlay', 'start_time': 3.0, 'end_time': 6.0},
+        {'text': 'Text should be readable now', 'start_time': 6.0, 'end_time': 9.0}
+    ],
+    'width': 1280,
+    'height': 720,
+    'fps': 30,
+    'font_size': 52,
+    'style': 'bold',
+    'bg_color': (10, 10, 30),
+    'bg_image': 'bg.jpg',
+    'show_header': True,
+    'show_time': True,
+    'title_duration': 2.0,
+    'song_title': 'Test Overlay',
+    'artist_name': 'Test Artist'
+}
+
+
+def render_screenshots(config, screenshots):
+    """
+    Render screenshots of a video at specified times.
     
-    if ret:
+    Args:
+        config: Dictionary of generate_karafun_video keyword arguments,
+                including lyrics_data
+        screenshots: List of (time_seconds, output_path) tuples
+    """
+    frames = render_frame_at(config, [time_seconds for time_seconds, _ in screenshots])
+    for (_, output_path), frame in zip(screenshots, frames):
         cv2.imwrite(output_path, frame)
-        print(f"✓ Extracted frame: {output_path}")
-        return True
-    else:
-        print(f"Failed to extract frame from {video_path}")
-        return False
+        print(f"✓ Rendered screenshot: {output_path}")
 
 
 if __name__ == '__main__':
-    print("Extracting frames to demonstrate changes...\n")
-    
-    # Extract frame showing transparent header
-    extract_frame('comprehensive_test.mp4', 4.0, 'screenshot_transparent_header.png')
-    
-    # Extract frame showing "Remaining:" time during pause
-    extract_frame('comprehensive_test.mp4', 10.0, 'screenshot_remaining_time.png')
+    print("Rendering screenshots to demonstrate changes...\n")
     
-    # Extract frame showing simple time format during singing
-    extract_frame('comprehensive_test.mp4', 4.5, 'screenshot_simple_time.png')
+    render_screenshots(COMPREHENSIVE_CONFIG, [
+        # Transparent header
+        (4.0, 'screenshot_transparent_header.png'),
+        # "Remaining:" time during pause
+        (10.0, 'screenshot_remaining_time.png'),
+        # Simple time format during singing
+        (4.5, 'screenshot_simple_time.png')
+    ])
     
-    # Extract frame showing overlay on background
-    extract_frame('test_bg_overlay.mp4', 3.0, 'screenshot_overlay.png')
+    # Overlay on background
+    render_screenshots(OVERLAY_CONFIG, [(3.0, 'screenshot_overlay.png')])
     
-    print("\n✅ All screenshots extracted!")
+    print("\n✅ All screenshots rendered!")
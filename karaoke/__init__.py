@@ -2,18 +2,34 @@
 Karaoke word fill effect module for generating karaoke-style videos.
 """
 
-from .main import generate_karaoke_video, generate_karaoke_video_with_lines, generate_karafun_video
+from .main import (
+    generate_karaoke_video, generate_karaoke_video_with_lines, generate_karafun_video,
+    generate_karafun_renditions, generate_karafun_overlay, render_frame_at
+)
+from .aio import generate_karafun_video_async, karafun_video_events
+from .contact_sheet import contact_sheet
 from .renderer import KaraokeRenderer
+from .subtitles import burn_subtitles, export_subtitles
 from .karafun_renderer import KarafunRenderer
 from .text_layout import TextLayout
+from .timeline import Timeline
 from .timing import WordTiming
 
 __all__ = [
     'generate_karaoke_video',
     'generate_karaoke_video_with_lines',
     'generate_karafun_video',
+    'generate_karafun_video_async',
+    'karafun_video_events',
+    'generate_karafun_renditions',
+    'generate_karafun_overlay',
+    'render_frame_at',
+    'contact_sheet',
+    'export_subtitles',
+    'burn_subtitles',
     'KaraokeRenderer',
     'KarafunRenderer',
     'TextLayout',
+    'Timeline',
     'WordTiming'
 ]
@@ -0,0 +1,214 @@
+"""
+Asyncio module for embedding renders in async services.
+
+The generate_* functions block until the video is written. The functions
+here run generate_karafun_video on an executor thread (the render itself can
+still use worker processes through the workers setting) and drive ffmpeg as
+an asyncio subprocess, so one event loop can run many renders at once.
+Progress is reported as events of an async iterator. Cancelling the task
+that consumes them stops the render at its next frame and removes the
+partial output.
+"""
+
+import asyncio
+import functools
+import os
+import tempfile
+import threading
+from pathlib import Path
+from .main import generate_karafun_video
+from .sinks import stream_files
+from .utils import audio_mux_command, check_ffmpeg_available
+
+
+class RenderCancelled(Exception):
+    """Raised in a render thread to stop a render whose task was cancelled."""
+
+
+async def add_audio_to_video_async(video_path, audio_path, output_path, audio_offset=0.0):
+    """
+    Add audio track to video using an ffmpeg subprocess, without blocking.
+    
+    Cancelling kills ffmpeg and removes the partial output.
+    
+    Args:
+        video_path: Path to input video file (without audio)
+        audio_path: Path to audio file to add
+        output_path: Path to output video file (with audio)
+        audio_offset: Offset in seconds to delay/advance audio (positive = delay, negative = advance)
+    
+    Returns:
+        Path to output video file
+    
+    Raises:
+        RuntimeError: If ffmpeg command fails or ffmpeg is not available
+        FileNotFoundError: If input files don't exist
+        ValueError: If audio_offset is not a valid number
+    """
+    if not check_ffmpeg_available():
+        raise RuntimeError(
+            "ffmpeg is not available in the system PATH. "
+            "Please install ffmpeg: https://ffmpeg.org/download.html"
+        )
+    
+    cmd = audio_mux_command(str(video_path), str(audio_path), str(output_path), audio_offset)
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await process.communicate()
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace')}")
+    return output_path
+
+
+async def _mux_audio_async(output_path, audio_path, audio_offset):
+    """
+    Add an audio track to a finished video, in place, without blocking.
+    
+    Like _mux_audio, the video is kept without audio (and a warning
+    printed) if ffmpeg cannot add the track.
+    
+    Returns:
+        Error message, or None if the track was added
+    """
+    output_file = Path(output_path)
+    fd, temp_video = tempfile.mkstemp(suffix=output_file.suffix, dir=output_file.parent)
+    os.close(fd)
+    os.replace(output_path, temp_video)
+    
+    try:
+        await add_audio_to_video_async(temp_video, audio_path, output_path, audio_offset)
+    except (RuntimeError, FileNotFoundError, ValueError) as e:
+        # Restore original video if audio merge fails
+        os.replace(temp_video, output_path)
+        print(f"Warning: Could not add audio: {e}")
+        return str(e)
+    except BaseException:
+        os.remove(temp_video)
+        raise
+    os.remove(temp_video)
+    return None
+
+
+async def karafun_video_events(lyrics_data, output_path='karafun_output.mp4', executor=None,
+                               **settings):
+    """
+    Generate a Karafun-style karaoke video, reporting progress as events.
+    
+    Used as `async for event in karafun_video_events(...)`. Events are
+    dictionaries with a 'stage' key:
+    - {'stage': 'render', 'frames': n, 'total_frames': total}: at every
+      percent of the frames rendered
+    - {'stage': 'audio'}: before the audio track is added
+    - {'stage': 'done', 'output_path': path, 'audio_error': message}: last
+      event; audio_error is None unless the audio track could not be added
+    
+    If the iteration stops early (the consuming task is cancelled or the
+    loop is left), the render stops at its next frame and the partial
+    output is removed, with the segments of a streamed HLS playlist.
+    Segments in a checkpoint_dir are kept for a resume.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                    or a Timeline
+        output_path: Path to output MP4 file
+        executor: concurrent.futures executor to render on (default: the
+                  loop's default executor). It must run in this process,
+                  e.g. a ThreadPoolExecutor bounding the concurrent renders;
+                  use the workers setting to render in processes
+        **settings: Other keyword arguments of generate_karafun_video,
+                    except progress_callback
+    
+    Raises:
+        Exceptions of generate_karafun_video, from the render thread
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancelled = threading.Event()
+    # The audio track is added without blocking once the video is written,
+    # except for streams, which mux it while encoding
+    audio_path = None if settings.get('streaming') else settings.pop('audio_path', None)
+    audio_offset = settings.pop('audio_offset', 0.0) if audio_path else 0.0
+    last_percent = -1
+    
+    def progress(frames, total_frames):
+        """Stop the render if cancelled, and hand progress to the loop."""
+        nonlocal last_percent
+        if cancelled.is_set():
+            raise RenderCancelled("Render cancelled")
+        # At most one event per percent, however many frames there are
+        percent = frames * 100 // total_frames
+        if percent != last_percent:
+            last_percent = percent
+            event = {'stage': 'render', 'frames': frames, 'total_frames': total_frames}
+            loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    render = loop.run_in_executor(executor, functools.partial(
+        generate_karafun_video, lyrics_data, output_path, progress_callback=progress, **settings
+    ))
+    # The end of the render wakes the consumer after the last progress event
+    render.add_done_callback(lambda _: events.put_nowait(None))
+    
+    finished = False
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        await render
+        
+        audio_error = None
+        if audio_path:
+            yield {'stage': 'audio'}
+            audio_error = await _mux_audio_async(output_path, audio_path, audio_offset)
+        finished = True
+        yield {'stage': 'done', 'output_path': output_path, 'audio_error': audio_error}
+    finally:
+        if not finished:
+            cancelled.set()
+            # The render thread cannot be interrupted, wait for it to stop
+            try:
+                await render
+            except Exception:
+                pass
+            partial = stream_files(output_path) if settings.get('streaming') else [Path(output_path)]
+            for path in partial:
+                path.unlink(missing_ok=True)
+
+
+async def generate_karafun_video_async(lyrics_data, output_path='karafun_output.mp4',
+                                       progress_callback=None, executor=None, **settings):
+    """
+    Generate a Karafun-style karaoke video without blocking the event loop.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                    or a Timeline
+        output_path: Path to output MP4 file
+        progress_callback: Called on the loop with every event of
+                           karafun_video_events (optional)
+        executor: Executor to render on, see karafun_video_events
+        **settings: Other keyword arguments of generate_karafun_video
+    
+    Returns:
+        Path to the generated video file
+    
+    Raises:
+        Exceptions of generate_karafun_video, from the render thread
+    """
+    events = karafun_video_events(lyrics_data, output_path, executor, **settings)
+    try:
+        async for event in events:
+            if progress_callback is not None:
+                progress_callback(event)
+    finally:
+        await events.aclose()
+    return output_path
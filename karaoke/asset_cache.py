@@ -0,0 +1,158 @@
+"""
+Asset cache module for preprocessed background images.
+
+Decoding a background image and resampling it to the video size is the
+slowest part of creating a renderer. The result only depends on the image
+contents, the output size and the overlay opacity, so it is stored once on
+disk as a raw .npy array keyed by those values. Renderers in other
+processes then memory-map the array instead of decoding it again.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from PIL import Image
+import numpy as np
+from .compositor import Compositor
+from .utils import DEFAULT_ASSET_CACHE_BYTES, DEFAULT_OVERLAY_OPACITY, file_hash
+
+
+def load_background(image_path, width, height, overlay_opacity=DEFAULT_OVERLAY_OPACITY):
+    """
+    Decode and resize a background image with its dark overlay blended in.
+    
+    Args:
+        image_path: Path to the background image
+        width: Video width in pixels
+        height: Video height in pixels
+        overlay_opacity: Opacity of the black overlay (0-255)
+    
+    Returns:
+        H x W x 3 uint8 array in BGR format
+    """
+    image = Image.open(image_path).convert('RGBA')
+    # Resize to match video dimensions with high-quality resampling
+    # Try new API first, fall back to old API for compatibility
+    try:
+        resample_method = Image.Resampling.LANCZOS
+    except AttributeError:
+        try:
+            # Fallback for older Pillow versions (< 9.1.0)
+            resample_method = Image.LANCZOS
+        except AttributeError:
+            # Ultimate fallback to BICUBIC if LANCZOS unavailable
+            resample_method = Image.BICUBIC
+    image = image.resize((width, height), resample_method)
+    
+    background = np.ascontiguousarray(np.array(image)[:, :, 2::-1])
+    # Add dark overlay to improve text visibility on bright backgrounds
+    if overlay_opacity:
+        Compositor(width, height).fill_rect(background, 0, 0, width, height,
+                                            (0, 0, 0, overlay_opacity))
+    return background
+
+
+class AssetCache:
+    """
+    On-disk cache of preprocessed backgrounds with a size cap.
+    
+    Entries are evicted least recently used first, using file modification
+    times that are refreshed on every hit, so several processes can share
+    one cache directory without coordination.
+    """
+    
+    def __init__(self, cache_dir, max_bytes=DEFAULT_ASSET_CACHE_BYTES):
+        """
+        Initialize asset cache.
+        
+        Args:
+            cache_dir: Directory holding the cached arrays (created if missing)
+            max_bytes: Maximum total size of the cached arrays
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+    
+    def background(self, image_path, width, height, overlay_opacity=DEFAULT_OVERLAY_OPACITY):
+        """
+        Get a preprocessed background, building and storing it on a miss.
+        
+        Args:
+            image_path: Path to the background image
+            width: Video width in pixels
+            height: Video height in pixels
+            overlay_opacity: Opacity of the black overlay (0-255)
+        
+        Returns:
+            Read-only memory-mapped H x W x 3 uint8 array in BGR format
+        """
+        entry = self.cache_dir / f"bg-{file_hash(image_path)}-{width}x{height}-{overlay_opacity}.npy"
+        
+        if entry.exists():
+            try:
+                background = np.load(entry, mmap_mode='r')
+                if background.shape == (height, width, 3):
+                    # Mark as recently used
+                    os.utime(entry)
+                    return background
+            except (OSError, ValueError):
+                pass
+            # Truncated or foreign file, rebuild it
+            entry.unlink(missing_ok=True)
+        
+        background = load_background(image_path, width, height, overlay_opacity)
+        
+        # Write to a temporary file first so readers never see a partial array
+        fd, temp_path = tempfile.mkstemp(suffix='.npy', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, background)
+            os.replace(temp_path, entry)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        self.evict(keep=entry)
+        return np.load(entry, mmap_mode='r')
+    
+    def size(self):
+        """
+        Get the total size of the cached arrays.
+        
+        Returns:
+            Size in bytes
+        """
+        return sum(size for _, _, size in self._entries())
+    
+    def evict(self, keep=None):
+        """
+        Delete least recently used entries until the cache fits its size cap.
+        
+        Args:
+            keep: Entry path that must not be deleted (optional)
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # Already evicted by another process
+                pass
+            total -= size
+    
+    def _entries(self):
+        """List cached arrays as (path, modification time, size) tuples."""
+        entries = []
+        for path in self.cache_dir.glob('bg-*.npy'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
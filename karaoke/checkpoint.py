@@ -0,0 +1,176 @@
+"""
+Checkpoint module for resumable renders.
+
+A checkpointed render writes its frames as a series of segments, each a
+frame store (see frame_store), and records every finished segment in a
+small JSON manifest. If the render is interrupted, running it again with
+resume picks up at the first unfinished segment; frames do not depend on
+the frames before them, so the result is the same as an uninterrupted
+render. The final video is encoded from the segments once all are done.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from .frame_store import FrameStore, FrameStoreWriter
+
+MANIFEST_FILE = 'manifest.json'
+
+
+class RenderCheckpoint:
+    """Segments and progress manifest of a resumable render."""
+    
+    def __init__(self, directory, key, total_frames, segment_frames, resume=False):
+        """
+        Initialize render checkpoint.
+        
+        Args:
+            directory: Checkpoint directory (created if missing)
+            key: String identifying the render settings; a checkpoint is only
+                 resumed by a render with the same key
+            total_frames: Number of frames of the video
+            segment_frames: Number of frames per segment
+            resume: Keep the finished segments of an earlier run of the same
+                    render, instead of starting over
+        
+        Raises:
+            ValueError: If resuming a checkpoint written by another render
+        """
+        self.directory = Path(directory)
+        self.key = key
+        self.total_frames = total_frames
+        self.segment_frames = max(1, segment_frames)
+        self.completed = set()
+        
+        manifest = self._read_manifest()
+        if resume and manifest is not None:
+            if (manifest['key'], manifest['total_frames'], manifest['segment_frames']) != \
+                    (key, total_frames, self.segment_frames):
+                raise ValueError(
+                    f"Checkpoint in {directory} was written by a different render, "
+                    f"remove it or render without resume"
+                )
+            self.completed = set(manifest['completed'])
+        else:
+            self._remove_segments()
+        
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write_manifest()
+    
+    def _remove_segments(self):
+        """Delete the segments of an earlier render, leaving other files alone."""
+        for path in self.directory.glob('segment_*'):
+            if path.is_dir():
+                shutil.rmtree(path)
+    
+    def _read_manifest(self):
+        """Read the manifest, or None if there is none."""
+        path = self.directory / MANIFEST_FILE
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_manifest(self):
+        """Write the manifest atomically."""
+        manifest = {
+            'key': self.key,
+            'total_frames': self.total_frames,
+            'segment_frames': self.segment_frames,
+            'completed': sorted(self.completed)
+        }
+        # Write to a temporary file first so a crash never leaves a partial manifest
+        fd, temp_path = tempfile.mkstemp(suffix='.json', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, self.directory / MANIFEST_FILE)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def segments(self):
+        """
+        Get the frame ranges of all segments.
+        
+        Returns:
+            List of (segment_index, start_frame, stop_frame) tuples
+        """
+        return [
+            (index, start, min(start + self.segment_frames, self.total_frames))
+            for index, start in enumerate(range(0, self.total_frames, self.segment_frames))
+        ]
+    
+    def pending(self):
+        """
+        Get the frame ranges of the segments still to render.
+        
+        Returns:
+            List of (segment_index, start_frame, stop_frame) tuples
+        """
+        return [segment for segment in self.segments() if segment[0] not in self.completed]
+    
+    def segment_path(self, index):
+        """
+        Get the frame store directory of a segment.
+        
+        Args:
+            index: Segment index
+        
+        Returns:
+            Path object
+        """
+        return self.directory / f"segment_{index:05d}"
+    
+    def writer(self, index, width, height, fps, channels=3):
+        """
+        Start writing a segment, replacing any partial one.
+        
+        Args:
+            index: Segment index
+            width: Frame width in pixels
+            height: Frame height in pixels
+            fps: Frames per second
+            channels: 3 for BGR frames, 4 for BGRA frames
+        
+        Returns:
+            FrameStoreWriter object
+        """
+        return FrameStoreWriter(self.segment_path(index), width, height, fps, channels=channels)
+    
+    def complete(self, index):
+        """
+        Record a segment as finished, once its writer is released.
+        
+        Args:
+            index: Segment index
+        """
+        self.completed.add(index)
+        self._write_manifest()
+    
+    def encode(self, out):
+        """
+        Write the frames of every segment to a video writer, in order.
+        
+        Args:
+            out: Object with write(frame), e.g. cv2.VideoWriter
+        
+        Raises:
+            RuntimeError: If a segment is not finished
+        """
+        for index, _, _ in self.segments():
+            if index not in self.completed:
+                raise RuntimeError(f"Segment {index} of {self.directory} is not rendered")
+            FrameStore(self.segment_path(index)).encode(out)
+    
+    def remove(self):
+        """Delete the segments and manifest, and the directory if nothing else is in it."""
+        self._remove_segments()
+        (self.directory / MANIFEST_FILE).unlink(missing_ok=True)
+        try:
+            self.directory.rmdir()
+        except OSError:
+            pass
@@ -5,9 +5,34 @@ CLI module for karaoke video generation with config file support.
 import argparse
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
-from .main import generate_karafun_video
+from typing import Dict, Any, List, Optional
+import cv2
+from .contact_sheet import contact_sheet
+from .frame_store import encode_frame_store
+from .main import generate_karafun_overlay, generate_karafun_renditions, generate_karafun_video
+from .package import SongPackage, compile_song
+from .preview_server import make_preview_server
+from .sinks import ALPHA_VIDEO_CODECS, H264_CODEC_ARGS
+from .subtitles import burn_subtitles, export_subtitles
+
+# Settings of generate_karafun_video that also apply to overlays
+OVERLAY_SETTINGS = (
+    'width', 'height', 'fps', 'font_family', 'font_size', 'style', 'show_header',
+    'title_duration', 'song_title', 'artist_name', 'show_time', 'typewriter_speed'
+)
+
+# Settings of generate_karafun_video that are set per rendition instead
+RENDITION_OWN_SETTINGS = ('output_path', 'width', 'height')
+
+# Settings of generate_karafun_video that also apply to subtitles
+SUBTITLE_SETTINGS = ('width', 'height', 'font_family', 'font_size', 'style')
+
+# Settings of generate_karafun_video that also apply to burned-in subtitles
+BURN_SUBTITLE_SETTINGS = SUBTITLE_SETTINGS + (
+    'output_path', 'fps', 'bg_color', 'bg_image', 'audio_path', 'audio_offset'
+)
 
 
 def load_config(config_path: str) -> Dict[str, Any]:
@@ -58,8 +83,306 @@ def validate_config(config: Dict[str, Any]) -> None:
                 raise ValueError(f"Lyric at index {i} missing required field: {field}")
 
 
-def main():
+def resolve_settings(config: Dict[str, Any], output_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve configuration sections into generate_karafun_video settings.
+    
+    Args:
+        config: Validated configuration dictionary
+        output_path: Output video path overriding the config (optional)
+    
+    Returns:
+        Dictionary of generate_karafun_video keyword arguments, without lyrics_data
+    
+    Raises:
+        ValueError: If a setting is invalid
+    """
+    # Video settings
+    video_config = config.get('video', {})
+    
+    # Background settings
+    background_config = config.get('background', {})
+    bg_color_raw = background_config.get('color', [0, 0, 0])
+    
+    # Validate and convert bg_color
+    if not isinstance(bg_color_raw, (list, tuple)) or len(bg_color_raw) != 3:
+        raise ValueError("Background color must be an array of 3 RGB values (e.g., [255, 0, 0])")
+    
+    try:
+        bg_color = tuple(int(c) for c in bg_color_raw)
+        if not all(0 <= c <= 255 for c in bg_color):
+            raise ValueError("RGB values must be between 0 and 255")
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid background color format: {e}")
+    
+    # Font, title screen, animation, display and audio settings
+    font_config = config.get('font', {})
+    title_config = config.get('title', {})
+    animation_config = config.get('animation', {})
+    display_config = config.get('display', {})
+    audio_config = config.get('audio', {})
+    
+    return {
+        'output_path': output_path or config.get('output_path', 'karaoke_output.mp4'),
+        'width': video_config.get('width', 1280),
+        'height': video_config.get('height', 720),
+        'fps': video_config.get('fps', 30),
+        'font_family': font_config.get('family', 'Arial'),
+        'font_size': font_config.get('size', 52),
+        'style': font_config.get('style', 'bold'),
+        'bg_color': bg_color,
+        'show_header': animation_config.get('show_header', True),
+        'title_duration': title_config.get('duration', 3.0),
+        'song_title': title_config.get('song', None),
+        'artist_name': title_config.get('artist', None),
+        'bg_image': background_config.get('image', None),
+        'asset_cache_dir': background_config.get('cache_dir', None),
+        'show_time': display_config.get('show_time', True),
+        'typewriter_speed': animation_config.get('typewriter_speed', 0.05),
+        'audio_path': audio_config.get('path', None),
+        'audio_offset': audio_config.get('offset', 0.0)
+    }
+
+
+def compile_config(config_path: str, output_dir: Optional[str] = None) -> str:
+    """
+    Compile a JSON configuration into a song package.
+    
+    Args:
+        config_path: Path to JSON configuration file
+        output_dir: Directory for the package (default: next to the config)
+    
+    Returns:
+        Path to the written package
+    """
+    config = load_config(config_path)
+    validate_config(config)
+    settings = resolve_settings(config)
+    
+    config_file = Path(config_path)
+    package_dir = Path(output_dir) if output_dir else config_file.parent
+    return compile_song(config['lyrics'], settings, package_dir / f"{config_file.stem}.npz",
+                        renditions=config.get('renditions'))
+
+
+def compile_main(argv: List[str]) -> int:
+    """
+    Entry point of the compile subcommand.
+    
+    Args:
+        argv: Command line arguments after 'compile'
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m karaoke.cli compile',
+        description='Compile JSON configurations into binary song packages'
+    )
+    parser.add_argument('configs', nargs='+', help='JSON configuration files')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Directory for the packages (default: next to each config)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Number of parallel workers (default: one per CPU)')
+    args = parser.parse_args(argv)
+    
+    if args.output_dir:
+        Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    
+    failures = 0
+    if len(args.configs) == 1 or args.jobs == 1:
+        results = []
+        for config_path in args.configs:
+            try:
+                results.append((config_path, compile_config(config_path, args.output_dir), None))
+            except Exception as e:
+                results.append((config_path, None, e))
+    else:
+        # Bulk import: compile configurations in parallel worker processes
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = [
+                (config_path, executor.submit(compile_config, config_path, args.output_dir))
+                for config_path in args.configs
+            ]
+            results = []
+            for config_path, future in futures:
+                try:
+                    results.append((config_path, future.result(), None))
+                except Exception as e:
+                    results.append((config_path, None, e))
+    
+    for config_path, package_path, error in results:
+        if error is None:
+            print(f"✓ {config_path} -> {package_path}")
+        else:
+            failures += 1
+            print(f"Error compiling {config_path}: {error}", file=sys.stderr)
+    
+    return 1 if failures else 0
+
+
+def encode_main(argv: List[str]) -> int:
+    """
+    Entry point of the encode subcommand.
+    
+    Args:
+        argv: Command line arguments after 'encode'
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m karaoke.cli encode',
+        description='Encode the frames of a frame store without rendering them again'
+    )
+    parser.add_argument('store', help='Frame store directory written with --frame-store')
+    parser.add_argument('output', help='Output video path')
+    parser.add_argument('--crf', type=int, default=None,
+                        help='Encode H.264 with ffmpeg at this quality (lower is better)')
+    parser.add_argument('--preset', type=str, default=None,
+                        help='Encode H.264 with ffmpeg at this x264 preset (e.g. slow)')
+    args = parser.parse_args(argv)
+    
+    codec_args = None
+    if args.crf is not None or args.preset is not None:
+        codec_args = list(H264_CODEC_ARGS)
+        if args.crf is not None:
+            codec_args += ['-crf', str(args.crf)]
+        if args.preset is not None:
+            codec_args += ['-preset', args.preset]
+    
+    try:
+        result_path = encode_frame_store(args.store, args.output, codec_args)
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"✓ Video encoded successfully: {result_path}")
+    return 0
+
+
+def sheet_main(argv: List[str]) -> int:
+    """
+    Entry point of the sheet subcommand.
+    
+    Args:
+        argv: Command line arguments after 'sheet'
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m karaoke.cli sheet',
+        description='Render a contact sheet of thumbnails at sampled times, without rendering the video'
+    )
+    parser.add_argument('config', help='JSON configuration file')
+    parser.add_argument('output', help='Output image path (e.g. sheet.png)')
+    parser.add_argument('--count', type=int, default=12,
+                        help='Number of evenly spaced times to sample (default: 12)')
+    parser.add_argument('--times', type=float, nargs='+', default=None, metavar='SECONDS',
+                        help='Render these times instead of sampled ones')
+    parser.add_argument('--columns', type=int, default=4,
+                        help='Number of thumbnails per row (default: 4)')
+    parser.add_argument('--thumb-width', type=int, default=320,
+                        help='Thumbnail width in pixels (default: 320)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of processes rendering thumbnails (default: 1)')
+    args = parser.parse_args(argv)
+    
+    try:
+        config = load_config(args.config)
+        validate_config(config)
+        settings = resolve_settings(config)
+        settings['lyrics_data'] = config['lyrics']
+        sheet = contact_sheet(settings, count=args.count, columns=args.columns,
+                              thumb_width=args.thumb_width, times=args.times, workers=args.jobs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if not cv2.imwrite(args.output, sheet):
+        print(f"Error: Could not write image: {args.output}", file=sys.stderr)
+        return 1
+    print(f"✓ Contact sheet written: {args.output}")
+    return 0
+
+
+def preview_main(argv: List[str]) -> int:
+    """
+    Entry point of the preview subcommand.
+    
+    Args:
+        argv: Command line arguments after 'preview'
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m karaoke.cli preview',
+        description='Serve frames of a song at any time on localhost, with editable line timings'
+    )
+    parser.add_argument('config', help='JSON configuration file')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Port to listen on (default: 8765)')
+    args = parser.parse_args(argv)
+    
+    try:
+        config = load_config(args.config)
+        validate_config(config)
+        settings = resolve_settings(config)
+        settings['lyrics_data'] = config['lyrics']
+        server = make_preview_server(settings, args.host, args.port)
+    except (FileNotFoundError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    host, port = server.server_address[:2]
+    print(f"✓ Preview server running at http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.session.close()
+    return 0
+
+
+def overlay_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert video settings into generate_karafun_overlay settings.
+    
+    The background and audio settings are dropped. An output path that is
+    not an alpha video becomes a directory for the image sequence.
+    
+    Args:
+        settings: Resolved generate_karafun_video settings
+    
+    Returns:
+        Dictionary of generate_karafun_overlay keyword arguments, without lyrics_data
+    """
+    output_path = Path(settings['output_path'])
+    if output_path.suffix.lower() not in ALPHA_VIDEO_CODECS:
+        output_path = output_path.with_suffix('')
+    
+    overlay = {key: settings[key] for key in OVERLAY_SETTINGS if key in settings}
+    overlay['output_path'] = str(output_path)
+    return overlay
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == 'compile':
+        return compile_main(argv[1:])
+    if argv and argv[0] == 'encode':
+        return encode_main(argv[1:])
+    if argv and argv[0] == 'sheet':
+        return sheet_main(argv[1:])
+    if argv and argv[0] == 'preview':
+        return preview_main(argv[1:])
+    
     parser = argparse.ArgumentParser(
         description='Generate Karafun-style karaoke videos',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -70,16 +393,51 @@ Examples:
   
   # Specify custom output path
   python -m karaoke.cli --config config.json --output my_video.mp4
+  
+  # Compile configs into song packages, then render one without layout work
+  python -m karaoke.cli compile songs/*.json --output-dir packages
+  python -m karaoke.cli --package packages/song.npz
+  
+  # Export only the lyrics with transparency, as PNG frames or a ProRes 4444 video
+  python -m karaoke.cli --config config.json --overlay --output overlay_frames
+  python -m karaoke.cli --config config.json --overlay --output overlay.mov
+  
+  # Keep the rendered frames, then encode them again without rendering
+  python -m karaoke.cli --config config.json --frame-store frames
+  python -m karaoke.cli encode frames final.mp4 --crf 18
+  
+  # Preview a song as a grid of thumbnails, or take screenshots at given times
+  python -m karaoke.cli sheet config.json sheet.png --count 12 --jobs 4
+  python -m karaoke.cli sheet config.json shots.png --times 4 10 --columns 1 --thumb-width 1280
+  
+  # Scrub through a song at http://127.0.0.1:8765/ while editing its timings
+  python -m karaoke.cli preview config.json
+  
+  # Render in checkpointed segments, and pick up where an interrupted run stopped
+  python -m karaoke.cli --config config.json --resume
+  
+  # Start watching the video while it renders, as HLS or fragmented MP4
+  python -m karaoke.cli --config config.json --stream --output live/song.m3u8
+  
+  # Export karaoke subtitles, or let ffmpeg draw them on the background
+  python -m karaoke.cli --config config.json --subtitles lyrics.ass
+  python -m karaoke.cli --config config.json --burn-subtitles
         """
     )
     
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         '--config',
         type=str,
-        required=True,
         help='Path to JSON configuration file'
     )
     
+    source.add_argument(
+        '--package',
+        type=str,
+        help='Path to a song package written by the compile command'
+    )
+    
     parser.add_argument(
         '--output',
         type=str,
@@ -87,100 +445,140 @@ Examples:
         help='Output video path (overrides config)'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--overlay',
+        action='store_true',
+        help='Export only the lyrics with an alpha channel: a directory of PNG frames, '
+             'or a .mov/.webm video (requires ffmpeg)'
+    )
+    
+    parser.add_argument(
+        '--frame-store',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Also spool the rendered frames to a frame store in DIR, '
+             'to encode them again with the encode command (rejected with renditions)'
+    )
+    
+    parser.add_argument(
+        '--checkpoint-dir',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help='Render in checkpointed segments in DIR, so that an interrupted render '
+             'can be resumed (default with --resume: OUTPUT.checkpoint; rejected with renditions)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume an interrupted checkpointed render of the same configuration '
+             '(rejected with renditions)'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Write the video so that it can be played while it renders: an HLS playlist '
+             'with segments if the output ends in .m3u8, a fragmented MP4 otherwise '
+             '(requires ffmpeg; rejected with renditions)'
+    )
+    
+    parser.add_argument(
+        '--subtitles',
+        type=str,
+        default=None,
+        metavar='PATH',
+        help='Export the lyrics as a .ass (karaoke), .srt or .vtt subtitle file '
+             'instead of rendering a video'
+    )
+    
+    parser.add_argument(
+        '--burn-subtitles',
+        action='store_true',
+        help='Render the video by drawing ASS subtitles on the background with ffmpeg '
+             '(fast, lyric lines only; requires ffmpeg; rejected with renditions)'
+    )
+    
+    args = parser.parse_args(argv)
     
     try:
-        # Load and validate configuration
-        print(f"Loading configuration from: {args.config}")
-        config = load_config(args.config)
-        validate_config(config)
-        
-        # Extract configuration values with defaults
-        lyrics_data = config['lyrics']
-        
-        # Video settings
-        video_config = config.get('video', {})
-        output_path = args.output or config.get('output_path', 'karaoke_output.mp4')
-        width = video_config.get('width', 1280)
-        height = video_config.get('height', 720)
-        fps = video_config.get('fps', 30)
-        
-        # Background settings
-        background_config = config.get('background', {})
-        bg_color_raw = background_config.get('color', [0, 0, 0])
+        if args.package:
+            # Settings and layout come precompiled from the package
+            print(f"Loading song package from: {args.package}")
+            package = SongPackage.load(args.package)
+            settings = dict(package.settings)
+            if args.output:
+                settings['output_path'] = args.output
+            lyrics_data = package.timeline()
+            renditions = package.renditions
+        else:
+            # Load and validate configuration
+            print(f"Loading configuration from: {args.config}")
+            config = load_config(args.config)
+            validate_config(config)
+            settings = resolve_settings(config, args.output)
+            lyrics_data = config['lyrics']
+            renditions = config.get('renditions')
         
-        # Validate and convert bg_color
-        if not isinstance(bg_color_raw, (list, tuple)) or len(bg_color_raw) != 3:
-            raise ValueError("Background color must be an array of 3 RGB values (e.g., [255, 0, 0])")
+        if args.subtitles:
+            # Subtitles follow the song, so there is no title screen offset
+            result_path = export_subtitles(lyrics_data, args.subtitles,
+                                           **{key: settings[key] for key in SUBTITLE_SETTINGS})
+            print(f"\n✓ Subtitles exported successfully: {result_path}")
+            return 0
         
-        try:
-            bg_color = tuple(int(c) for c in bg_color_raw)
-            if not all(0 <= c <= 255 for c in bg_color):
-                raise ValueError("RGB values must be between 0 and 255")
-        except (ValueError, TypeError) as e:
-            raise ValueError(f"Invalid background color format: {e}")
-        
-        bg_image = background_config.get('image', None)
-        
-        # Font settings
-        font_config = config.get('font', {})
-        font_family = font_config.get('family', 'Arial')
-        font_size = font_config.get('size', 52)
-        font_style = font_config.get('style', 'bold')
-        
-        # Title screen settings
-        title_config = config.get('title', {})
-        song_title = title_config.get('song', None)
-        artist_name = title_config.get('artist', None)
-        title_duration = title_config.get('duration', 3.0)
-        
-        # Animation settings
-        animation_config = config.get('animation', {})
-        show_header = animation_config.get('show_header', True)
-        typewriter_speed = animation_config.get('typewriter_speed', 0.05)
+        print("Generating karaoke video...")
+        print(f"  Output: {settings['output_path']}")
+        print(f"  Resolution: {settings['width']}x{settings['height']}")
+        print(f"  FPS: {settings['fps']}")
+        print(f"  Lines: {len(lyrics_data)}")
+        if settings['audio_path']:
+            print(f"  Audio: {settings['audio_path']} (offset: {settings['audio_offset']}s)")
         
-        # Display settings
-        display_config = config.get('display', {})
-        show_time = display_config.get('show_time', True)
+        if args.overlay:
+            # Text layers only, composited over the footage in an editor
+            result_path = generate_karafun_overlay(lyrics_data=lyrics_data,
+                                                   **overlay_settings(settings))
+            print(f"\n✓ Overlay generated successfully: {result_path}")
+            return 0
         
-        # Audio settings
-        audio_config = config.get('audio', {})
-        audio_path = audio_config.get('path', None)
-        audio_offset = audio_config.get('offset', 0.0)
+        if renditions:
+            unsupported = [flag for flag, value in (
+                ('--frame-store', args.frame_store), ('--checkpoint-dir', args.checkpoint_dir),
+                ('--resume', args.resume), ('--stream', args.stream),
+                ('--burn-subtitles', args.burn_subtitles)
+            ) if value]
+            if unsupported:
+                raise ValueError(f"{', '.join(unsupported)} cannot be used with renditions")
+            
+            # Every rendition is rendered from the same pass over the timeline
+            shared = {key: value for key, value in settings.items() if key not in RENDITION_OWN_SETTINGS}
+            result_paths = generate_karafun_renditions(lyrics_data=lyrics_data,
+                                                       renditions=renditions, **shared)
+            print(f"\n✓ Videos generated successfully: {', '.join(result_paths)}")
+            return 0
         
-        print("Generating karaoke video...")
-        print(f"  Output: {output_path}")
-        print(f"  Resolution: {width}x{height}")
-        print(f"  FPS: {fps}")
-        print(f"  Lines: {len(lyrics_data)}")
-        if audio_path:
-            print(f"  Audio: {audio_path} (offset: {audio_offset}s)")
+        if args.burn_subtitles:
+            result_path = burn_subtitles(lyrics_data,
+                                         **{key: settings[key] for key in BURN_SUBTITLE_SETTINGS})
+            print(f"\n✓ Video generated successfully: {result_path}")
+            return 0
         
         # Generate video
-        result_path = generate_karafun_video(
-            lyrics_data=lyrics_data,
-            output_path=output_path,
-            width=width,
-            height=height,
-            fps=fps,
-            font_family=font_family,
-            font_size=font_size,
-            style=font_style,
-            bg_color=bg_color,
-            show_header=show_header,
-            title_duration=title_duration,
-            song_title=song_title,
-            artist_name=artist_name,
-            bg_image=bg_image,
-            show_time=show_time,
-            typewriter_speed=typewriter_speed,
-            audio_path=audio_path,
-            audio_offset=audio_offset
-        )
+        checkpoint_dir = args.checkpoint_dir
+        if args.resume and not checkpoint_dir:
+            checkpoint_dir = f"{settings['output_path']}.checkpoint"
+        result_path = generate_karafun_video(lyrics_data=lyrics_data,
+                                             frame_store_dir=args.frame_store,
+                                             checkpoint_dir=checkpoint_dir,
+                                             resume=args.resume, streaming=args.stream,
+                                             **settings)
         
         print(f"\n✓ Video generated successfully: {result_path}")
         return 0
-        
+    
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
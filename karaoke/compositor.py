@@ -0,0 +1,261 @@
+"""
+Compositor module for blending premultiplied-alpha NumPy layers.
+
+Layers are H x W x 4 uint8 arrays in premultiplied BGRA order, so that a
+finished canvas is directly usable as an OpenCV frame. Canvases are either
+opaque H x W x 3 BGR arrays or H x W x 4 premultiplied BGRA arrays.
+"""
+
+import numpy as np
+
+
+def premultiply(rgba):
+    """
+    Convert a straight-alpha RGBA array to a premultiplied BGRA layer.
+    
+    Args:
+        rgba: H x W x 4 uint8 array in RGBA order
+    
+    Returns:
+        H x W x 4 uint8 array in premultiplied BGRA order
+    """
+    rgba = np.asarray(rgba, dtype=np.uint8)
+    alpha = rgba[:, :, 3:4].astype(np.uint16)
+    layer = np.empty(rgba.shape, dtype=np.uint8)
+    layer[:, :, :3] = _div255(rgba[:, :, 2::-1] * alpha)
+    layer[:, :, 3] = rgba[:, :, 3]
+    return layer
+
+
+def unpremultiply(layer):
+    """
+    Convert a premultiplied BGRA layer to straight-alpha BGRA.
+    
+    Args:
+        layer: H x W x 4 uint8 array in premultiplied BGRA order
+    
+    Returns:
+        H x W x 4 uint8 array in straight-alpha BGRA order
+    """
+    alpha = layer[:, :, 3:4].astype(np.uint32)
+    color = (layer[:, :, :3].astype(np.uint32) * 255 + alpha // 2) // np.maximum(alpha, 1)
+    straight = np.empty(layer.shape, dtype=np.uint8)
+    straight[:, :, :3] = np.minimum(color, 255)
+    straight[:, :, 3] = layer[:, :, 3]
+    return straight
+
+
+def solid_layer(width, height, color):
+    """
+    Create a layer filled with a single color.
+    
+    Args:
+        width: Layer width in pixels
+        height: Layer height in pixels
+        color: RGBA color tuple
+    
+    Returns:
+        H x W x 4 uint8 array in premultiplied BGRA order
+    """
+    layer = np.empty((height, width, 4), dtype=np.uint8)
+    layer[:, :] = premultiplied_color(color)
+    return layer
+
+
+def mask_layer(mask, color):
+    """
+    Create a layer from a coverage mask and a color.
+    
+    Args:
+        mask: H x W uint8 coverage array (e.g. rasterized glyphs)
+        color: RGBA color tuple
+    
+    Returns:
+        H x W x 4 uint8 array in premultiplied BGRA order
+    """
+    alpha = _div255(mask.astype(np.uint16) * color[3]).astype(np.uint16)
+    layer = np.empty(mask.shape + (4,), dtype=np.uint8)
+    for channel, value in enumerate((color[2], color[1], color[0])):
+        layer[:, :, channel] = _div255(alpha * value)
+    layer[:, :, 3] = alpha
+    return layer
+
+
+def premultiplied_color(color):
+    """
+    Convert an RGBA color tuple to a premultiplied BGRA array.
+    
+    Args:
+        color: RGBA color tuple (alpha defaults to 255)
+    
+    Returns:
+        Length-4 uint8 array in premultiplied BGRA order
+    """
+    alpha = color[3] if len(color) > 3 else 255
+    return np.array(
+        [(color[2] * alpha + 127) // 255,
+         (color[1] * alpha + 127) // 255,
+         (color[0] * alpha + 127) // 255,
+         alpha],
+        dtype=np.uint8
+    )
+
+
+def _div255(values):
+    """Divide a uint16 array by 255 with rounding."""
+    values = values.astype(np.uint16) + 128
+    return ((values + (values >> 8)) >> 8).astype(np.uint8)
+
+
+class Compositor:
+    """
+    Blends premultiplied layers onto a canvas in place.
+    
+    All intermediate results go to scratch buffers that are grown to the
+    largest region seen so far, so blending is allocation-free once the
+    compositor has warmed up.
+    """
+    
+    def __init__(self, width, height):
+        """
+        Initialize compositor.
+        
+        Args:
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+        """
+        self.width = width
+        self.height = height
+        self._product = np.empty(0, dtype=np.uint16)
+        self._shifted = np.empty(0, dtype=np.uint16)
+        self._scaled = np.empty(0, dtype=np.uint16)
+        self._inverse = np.empty(0, dtype=np.uint16)
+    
+    def new_canvas(self, color=(0, 0, 0, 255), channels=3):
+        """
+        Create a canvas filled with a color.
+        
+        Args:
+            color: RGBA color tuple
+            channels: 3 for an opaque BGR canvas, 4 for premultiplied BGRA
+        
+        Returns:
+            H x W x channels uint8 array
+        """
+        canvas = np.empty((self.height, self.width, channels), dtype=np.uint8)
+        canvas[:, :] = premultiplied_color(color)[:channels]
+        return canvas
+    
+    def over(self, dst, layer, x=0, y=0, opacity=1.0):
+        """
+        Blend a layer over a canvas region in place (Porter-Duff over).
+        
+        The layer is clipped to the canvas bounds.
+        
+        Args:
+            dst: Canvas array (H x W x 3 BGR or H x W x 4 premultiplied BGRA)
+            layer: Premultiplied BGRA layer
+            x: Left position of the layer on the canvas
+            y: Top position of the layer on the canvas
+            opacity: Extra opacity applied to the whole layer (0.0 to 1.0)
+        """
+        if opacity <= 0:
+            return
+        
+        region = self._clip(dst, layer, x, y)
+        if region is None:
+            return
+        target, source = region
+        height, width, channels = target.shape
+        product, shifted, scaled, inverse = self._scratch(height, width, channels)
+        
+        if opacity < 1.0:
+            np.multiply(source, np.uint16(int(round(opacity * 256))), out=scaled)
+            np.right_shift(scaled, 8, out=scaled)
+            source = scaled
+        
+        # dst = src + dst * (255 - src_alpha) / 255
+        np.subtract(255, source[:, :, 3:4], out=inverse)
+        np.multiply(target, inverse, out=product)
+        self._round_div255(product, shifted)
+        np.add(product, source[:, :, :channels], out=product)
+        np.copyto(target, product, casting='unsafe')
+    
+    def fill_rect(self, dst, left, top, right, bottom, color):
+        """
+        Blend a solid color over a canvas rectangle in place.
+        
+        Args:
+            dst: Canvas array
+            left: Left edge (inclusive)
+            top: Top edge (inclusive)
+            right: Right edge (exclusive)
+            bottom: Bottom edge (exclusive)
+            color: RGBA color tuple
+        """
+        left, top = max(0, int(left)), max(0, int(top))
+        right, bottom = min(dst.shape[1], int(right)), min(dst.shape[0], int(bottom))
+        if right <= left or bottom <= top:
+            return
+        
+        target = dst[top:bottom, left:right]
+        height, width, channels = target.shape
+        premultiplied = premultiplied_color(color)
+        alpha = int(premultiplied[3])
+        
+        if alpha == 255:
+            target[:, :] = premultiplied[:channels]
+            return
+        
+        product, shifted, _, _ = self._scratch(height, width, channels)
+        np.multiply(target, np.uint16(255 - alpha), out=product)
+        self._round_div255(product, shifted)
+        np.add(product, premultiplied[:channels], out=product)
+        np.copyto(target, product, casting='unsafe')
+    
+    def _clip(self, dst, layer, x, y):
+        """
+        Clip a layer placed at (x, y) to the canvas bounds.
+        
+        Returns:
+            Tuple of (canvas view, layer view), or None if nothing overlaps
+        """
+        x, y = int(x), int(y)
+        layer_height, layer_width = layer.shape[:2]
+        left, top = max(0, x), max(0, y)
+        right = min(dst.shape[1], x + layer_width)
+        bottom = min(dst.shape[0], y + layer_height)
+        if right <= left or bottom <= top:
+            return None
+        return (
+            dst[top:bottom, left:right],
+            layer[top - y:bottom - y, left - x:right - x]
+        )
+    
+    def _scratch(self, height, width, channels):
+        """
+        Get contiguous scratch buffer views, growing the buffers if needed.
+        
+        Returns:
+            Tuple of (product, shifted, scaled, inverse) uint16 views
+        """
+        pixels = height * width
+        if self._product.size < pixels * 4:
+            self._product = np.empty(pixels * 4, dtype=np.uint16)
+            self._shifted = np.empty(pixels * 4, dtype=np.uint16)
+            self._scaled = np.empty(pixels * 4, dtype=np.uint16)
+            self._inverse = np.empty(pixels, dtype=np.uint16)
+        return (
+            self._product[:pixels * channels].reshape(height, width, channels),
+            self._shifted[:pixels * channels].reshape(height, width, channels),
+            self._scaled[:pixels * 4].reshape(height, width, 4),
+            self._inverse[:pixels].reshape(height, width, 1)
+        )
+    
+    @staticmethod
+    def _round_div255(values, shifted):
+        """Divide a uint16 array by 255 in place with rounding."""
+        np.add(values, 128, out=values)
+        np.right_shift(values, 8, out=shifted)
+        np.add(values, shifted, out=values)
+        np.right_shift(values, 8, out=values)
@@ -0,0 +1,132 @@
+"""
+Contact sheet module for previewing a video without rendering it.
+
+Frames are rendered directly at sampled times with render_frame_at, shrunk
+to thumbnails and laid out in a grid labelled with their times: a quick
+storyboard of a song, or a set of QA screenshots, for the cost of a few
+frames instead of a full render.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from .main import _scene_from_config, render_frame_at
+
+SHEET_GAP = 4  # Pixels between thumbnails
+LABEL_COLOR = (255, 255, 255)  # BGR color of the time labels
+LABEL_SHADOW_COLOR = (0, 0, 0)  # BGR color under the time labels
+
+
+def sample_times(duration, count):
+    """
+    Get evenly spaced times covering a video.
+    
+    Every time is the middle of one of count equal parts of the video, so
+    the first and last frames (usually blank) are not sampled.
+    
+    Args:
+        duration: Video duration in seconds
+        count: Number of times
+    
+    Returns:
+        List of times in seconds
+    """
+    return [(i + 0.5) * duration / count for i in range(count)]
+
+
+def format_time(t):
+    """
+    Format a time for a thumbnail label.
+    
+    Args:
+        t: Time in seconds
+    
+    Returns:
+        String like '1:05.3'
+    """
+    minutes, seconds = divmod(t, 60)
+    return f"{int(minutes)}:{seconds:04.1f}"
+
+
+def _thumbnail(frame, thumb_width):
+    """Shrink a frame to a thumbnail width, keeping its aspect ratio."""
+    height, width = frame.shape[:2]
+    thumb_height = max(1, round(height * thumb_width / width))
+    return cv2.resize(frame, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+
+
+def _render_thumbnails(config, times, thumb_width):
+    """Render thumbnails at times, in a worker process."""
+    return [_thumbnail(frame, thumb_width) for frame in render_frame_at(config, times)]
+
+
+def _label(thumbnail, text):
+    """Draw a time label in the bottom left corner of a thumbnail."""
+    scale = max(0.35, thumbnail.shape[1] / 640)
+    origin = (4, thumbnail.shape[0] - 6)
+    cv2.putText(thumbnail, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale,
+                LABEL_SHADOW_COLOR, 3, cv2.LINE_AA)
+    cv2.putText(thumbnail, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale,
+                LABEL_COLOR, 1, cv2.LINE_AA)
+
+
+def contact_sheet(config, count=12, columns=4, thumb_width=320, times=None,
+                  workers=1, labels=True):
+    """
+    Render a grid of thumbnails of a Karafun-style video at sampled times.
+    
+    Args:
+        config: Dictionary of generate_karafun_video keyword arguments,
+                including lyrics_data (see render_frame_at)
+        count: Number of evenly spaced times to sample, when times is not given
+        columns: Number of thumbnails per row
+        thumb_width: Thumbnail width in pixels
+        times: List of times in seconds to render instead of sampled ones
+        workers: Number of processes rendering thumbnails; this process
+                 renders its share too
+        labels: Whether to label every thumbnail with its time
+    
+    Returns:
+        H x W x 3 BGR array of the sheet
+    
+    Raises:
+        TypeError: If config holds an unknown setting
+        ValueError: If no lyrics are given, or there is nothing to render
+    """
+    video_duration, render_at = _scene_from_config(config)
+    try:
+        if times is None:
+            times = sample_times(video_duration, count)
+        times = list(times)
+        if not times or columns < 1:
+            raise ValueError("A contact sheet needs at least one time and one column")
+        
+        # Times are split in contiguous chunks; the first is rendered here with
+        # the scene already set up, the others by worker processes
+        workers = max(1, min(workers, len(times)))
+        chunk = -(-len(times) // workers)
+        chunks = [times[i:i + chunk] for i in range(0, len(times), chunk)]
+        if len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=len(chunks) - 1) as executor:
+                futures = [executor.submit(_render_thumbnails, config, part, thumb_width)
+                           for part in chunks[1:]]
+                thumbnails = [_thumbnail(render_at(t), thumb_width) for t in chunks[0]]
+                for future in futures:
+                    thumbnails.extend(future.result())
+        else:
+            thumbnails = [_thumbnail(render_at(t), thumb_width) for t in times]
+    finally:
+        render_at.close()
+    
+    thumb_height = thumbnails[0].shape[0]
+    columns = min(columns, len(thumbnails))
+    rows = -(-len(thumbnails) // columns)
+    sheet = np.zeros((rows * thumb_height + (rows + 1) * SHEET_GAP,
+                      columns * thumb_width + (columns + 1) * SHEET_GAP, 3), dtype=np.uint8)
+    for i, (t, thumbnail) in enumerate(zip(times, thumbnails)):
+        if labels:
+            _label(thumbnail, format_time(t))
+        y = SHEET_GAP + (i // columns) * (thumb_height + SHEET_GAP)
+        x = SHEET_GAP + (i % columns) * (thumb_width + SHEET_GAP)
+        sheet[y:y + thumb_height, x:x + thumb_width] = thumbnail
+    return sheet
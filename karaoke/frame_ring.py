@@ -0,0 +1,150 @@
+"""
+Frame ring module for passing frames between processes without copying.
+
+Render workers write frames straight into slots of a shared memory block
+and the encoder reads them from the same memory. Frame i always lives in
+slot i % slots. Each slot has a 'free' and a 'ready' semaphore, so a worker
+that runs ahead of the encoder blocks until its slot has been written out,
+and the encoder blocks until the frame it needs next has been rendered.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class FrameRing:
+    """Ring of shared memory frame slots with per-slot semaphores."""
+    
+    def __init__(self, width, height, slots=8, context=None, channels=3):
+        """
+        Initialize frame ring.
+        
+        Frames that share a slot must be produced in frame order. Either use
+        a single producer, or give each producer every n-th frame with slots
+        a multiple of n.
+        
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            slots: Number of frame slots
+            context: multiprocessing context the workers are started from
+            channels: Channels per pixel (3 for BGR, 4 for BGRA)
+        """
+        context = context or multiprocessing.get_context()
+        self.shape = (height, width, channels)
+        self.slots = slots
+        self.frame_bytes = width * height * channels
+        
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * self.frame_bytes)
+        self._owner = True
+        self._free = [context.Semaphore(1) for _ in range(slots)]
+        self._ready = [context.Semaphore(0) for _ in range(slots)]
+        self._frames = self._map()
+    
+    def __getstate__(self):
+        # Sent to spawned workers: they attach to the memory block by name
+        return {
+            'shape': self.shape,
+            'slots': self.slots,
+            'name': self.shm.name,
+            'free': self._free,
+            'ready': self._ready
+        }
+    
+    def __setstate__(self, state):
+        height, width, channels = state['shape']
+        self.shape = state['shape']
+        self.slots = state['slots']
+        self.frame_bytes = width * height * channels
+        self.shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self._free = state['free']
+        self._ready = state['ready']
+        self._frames = self._map()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        self.unlink()
+    
+    def _map(self):
+        """View the memory block as an array of frames."""
+        return np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+    
+    def slot(self, index):
+        """
+        Get the slot a frame is stored in.
+        
+        Args:
+            index: Frame index
+        
+        Returns:
+            Slot index
+        """
+        return index % self.slots
+    
+    def acquire(self, index, timeout=None):
+        """
+        Wait until the slot of a frame is free to be written (producer side).
+        
+        Args:
+            index: Frame index
+            timeout: Maximum time to wait in seconds (None waits forever)
+        
+        Returns:
+            H x W x channels uint8 array to render the frame into, or None on timeout
+        """
+        slot = self.slot(index)
+        if not self._free[slot].acquire(timeout=timeout):
+            return None
+        return self._frames[slot]
+    
+    def publish(self, index):
+        """
+        Mark a frame written with acquire() as ready to encode (producer side).
+        
+        Args:
+            index: Frame index
+        """
+        self._ready[self.slot(index)].release()
+    
+    def wait(self, index, timeout=None):
+        """
+        Wait until a frame is ready to be read (consumer side).
+        
+        Args:
+            index: Frame index
+            timeout: Maximum time to wait in seconds (None waits forever)
+        
+        Returns:
+            H x W x channels uint8 array holding the frame, or None on timeout
+        """
+        slot = self.slot(index)
+        if not self._ready[slot].acquire(timeout=timeout):
+            return None
+        return self._frames[slot]
+    
+    def release(self, index):
+        """
+        Hand the slot of a frame read with wait() back to producers (consumer side).
+        
+        The array returned by wait() must not be used afterwards.
+        
+        Args:
+            index: Frame index
+        """
+        self._free[self.slot(index)].release()
+    
+    def close(self):
+        """Detach from the shared memory block."""
+        self._frames = None
+        self.shm.close()
+    
+    def unlink(self):
+        """Free the shared memory block, if this process created it."""
+        if self._owner:
+            self._owner = False
+            self.shm.unlink()
@@ -0,0 +1,250 @@
+"""
+Frame store module for spooling rendered frames to disk once.
+
+Rendering is the slow part of making a video; encoding the same frames at
+another quality or with another codec does not need to repeat it. A frame
+store keeps the raw frames in a directory, split into bands of rows: a band
+is only stored when it differs from the same band of the previous frame, so
+static frames cost an index row and a moving lyric line costs the few bands
+it covers. Stores are memory-mapped when read, so any number of encoders,
+in as many processes, can read one store at once, and any frame can be
+fetched directly by number.
+
+A store directory holds:
+- bands.raw: Stored bands, band_rows x width x channels uint8 each
+- index.raw: int32 band numbers, one row of bands per frame
+- store.json: Frame size and counts, written last when the store is complete
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+import cv2
+import numpy as np
+from .sinks import FFmpegSink
+from .utils import FRAME_STORE_BAND_ROWS
+
+BANDS_FILE = 'bands.raw'
+INDEX_FILE = 'index.raw'
+METADATA_FILE = 'store.json'
+
+
+class FrameStoreWriter:
+    """Writes frames into a new frame store, with the interface of cv2.VideoWriter."""
+    
+    def __init__(self, directory, width, height, fps, channels=3, band_rows=FRAME_STORE_BAND_ROWS):
+        """
+        Initialize frame store writer.
+        
+        Args:
+            directory: Store directory (created if missing, overwritten if a store)
+            width: Frame width in pixels
+            height: Frame height in pixels
+            fps: Frames per second, kept for encoders
+            channels: 3 for BGR frames, 4 for BGRA frames
+            band_rows: Height of a stored band in rows
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.channels = channels
+        self.band_rows = band_rows
+        self.band_count = -(-height // band_rows)
+        self.frame_count = 0
+        self.stored_bands = 0
+        
+        # A store without metadata is incomplete and cannot be opened
+        metadata_path = self.directory / METADATA_FILE
+        if metadata_path.exists():
+            metadata_path.unlink()
+        self._bands_file = open(self.directory / BANDS_FILE, 'wb')
+        self._index_file = open(self.directory / INDEX_FILE, 'wb')
+        
+        # Frames padded to whole bands; the previous frame is kept to find
+        # the bands that changed
+        shape = (self.band_count * band_rows, width, channels)
+        self._frame = np.zeros(shape, dtype=np.uint8)
+        self._previous = np.zeros(shape, dtype=np.uint8)
+        self._previous_index = None
+        # Bands are compared 8 bytes at a time when their size allows it
+        self._word = np.uint64 if (band_rows * width * channels) % 8 == 0 else np.uint8
+    
+    def write(self, frame):
+        """
+        Append the next frame.
+        
+        Args:
+            frame: H x W x channels uint8 array
+        """
+        self._frame[:self.height] = frame
+        bands = self._frame.reshape(self.band_count, -1)
+        
+        if self._previous_index is None:
+            changed = np.ones(self.band_count, dtype=bool)
+            index = np.empty(self.band_count, dtype=np.int32)
+        else:
+            previous = self._previous.reshape(self.band_count, -1)
+            changed = (bands.view(self._word) != previous.view(self._word)).any(axis=1)
+            index = self._previous_index.copy()
+        
+        new_bands = np.flatnonzero(changed)
+        if len(new_bands):
+            index[new_bands] = np.arange(self.stored_bands, self.stored_bands + len(new_bands))
+            self.stored_bands += len(new_bands)
+            self._bands_file.write(memoryview(np.ascontiguousarray(bands[new_bands])))
+        self._index_file.write(memoryview(index))
+        
+        self._previous_index = index
+        self._frame, self._previous = self._previous, self._frame
+        self.frame_count += 1
+    
+    def release(self):
+        """Finish the store, making it readable."""
+        self._bands_file.close()
+        self._index_file.close()
+        
+        metadata = {
+            'width': self.width,
+            'height': self.height,
+            'fps': self.fps,
+            'channels': self.channels,
+            'band_rows': self.band_rows,
+            'frame_count': self.frame_count,
+            'stored_bands': self.stored_bands
+        }
+        # Write to a temporary file first so readers never see partial metadata
+        fd, temp_path = tempfile.mkstemp(suffix='.json', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f)
+            os.replace(temp_path, self.directory / METADATA_FILE)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class FrameStore:
+    """Reads frames from a frame store by frame number."""
+    
+    def __init__(self, directory):
+        """
+        Open a frame store.
+        
+        Args:
+            directory: Store directory written by FrameStoreWriter
+        
+        Raises:
+            FileNotFoundError: If the directory holds no complete store
+        """
+        self.directory = Path(directory)
+        metadata_path = self.directory / METADATA_FILE
+        if not metadata_path.exists():
+            raise FileNotFoundError(f"Frame store not found or incomplete: {directory}")
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        
+        self.width = metadata['width']
+        self.height = metadata['height']
+        self.fps = metadata['fps']
+        self.channels = metadata['channels']
+        self.band_rows = metadata['band_rows']
+        self.frame_count = metadata['frame_count']
+        self.stored_bands = metadata['stored_bands']
+        self.band_count = -(-self.height // self.band_rows)
+        
+        band_shape = (self.band_rows, self.width, self.channels)
+        if self.stored_bands:
+            self._bands = np.memmap(self.directory / BANDS_FILE, dtype=np.uint8, mode='r',
+                                    shape=(self.stored_bands,) + band_shape)
+            self._index = np.memmap(self.directory / INDEX_FILE, dtype=np.int32, mode='r',
+                                    shape=(self.frame_count, self.band_count))
+        else:
+            # Memory maps cannot be empty
+            self._bands = np.zeros((0,) + band_shape, dtype=np.uint8)
+            self._index = np.zeros((0, self.band_count), dtype=np.int32)
+    
+    def __len__(self):
+        return self.frame_count
+    
+    def __getitem__(self, frame_number):
+        return self.frame(frame_number)
+    
+    @property
+    def nbytes(self):
+        """Size of the stored bands in bytes."""
+        return self._bands.nbytes
+    
+    def frame(self, frame_number, out=None):
+        """
+        Read a frame.
+        
+        Args:
+            frame_number: Frame number, negative numbers count from the end
+            out: Optional array of band_count * band_rows x W x channels uint8
+                 to assemble the frame in
+        
+        Returns:
+            H x W x channels uint8 array
+        
+        Raises:
+            IndexError: If the frame number is out of range
+        """
+        if not -self.frame_count <= frame_number < self.frame_count:
+            raise IndexError(f"Frame {frame_number} out of range (0-{self.frame_count - 1})")
+        index = self._index[frame_number]
+        if out is None:
+            out = np.empty((self.band_count,) + self._bands.shape[1:], dtype=np.uint8)
+        np.take(self._bands, index, axis=0, out=out.reshape((self.band_count,) + self._bands.shape[1:]))
+        return out.reshape(-1, self.width, self.channels)[:self.height]
+    
+    def encode(self, out, start=0, stop=None):
+        """
+        Write a range of frames to a video writer, in order.
+        
+        Args:
+            out: Object with write(frame), e.g. cv2.VideoWriter or FFmpegSink
+            start: First frame number
+            stop: Frame number to stop before (default: end of the store)
+        """
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+        buffer = np.empty((self.band_count * self.band_rows, self.width, self.channels), dtype=np.uint8)
+        for frame_number in range(start, stop):
+            out.write(self.frame(frame_number, out=buffer))
+
+
+def encode_frame_store(directory, output_path, codec_args=None):
+    """
+    Encode the frames of a frame store into a video.
+    
+    Args:
+        directory: Store directory
+        output_path: Output video path
+        codec_args: ffmpeg output arguments selecting the encoder, e.g.
+                    ['-c:v', 'libx264', '-crf', '18'] (requires ffmpeg).
+                    None writes MP4 with OpenCV like generate_karafun_video
+    
+    Returns:
+        Path to the output video
+    
+    Raises:
+        FileNotFoundError: If the directory holds no complete store
+        ValueError: If an OpenCV encode is asked for BGRA frames
+        RuntimeError: If ffmpeg is needed and not available, or fails
+    """
+    store = FrameStore(directory)
+    if codec_args is not None:
+        out = FFmpegSink(output_path, store.width, store.height, store.fps, codec_args,
+                         pix_fmt='bgra' if store.channels == 4 else 'bgr24')
+    elif store.channels == 3:
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(str(output_path), fourcc, store.fps, (store.width, store.height))
+    else:
+        raise ValueError("Frames with alpha can only be encoded with ffmpeg codec_args")
+    
+    store.encode(out)
+    out.release()
+    return output_path
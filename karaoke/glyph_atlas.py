@@ -0,0 +1,342 @@
+"""
+Glyph atlas module for assembling text from pre-rasterized glyph tiles.
+
+Each code point is rasterized once per font into a packed coverage atlas
+along with its advance, and pair kerning is measured once per pair. Text is
+then assembled by copying tiles at pen positions computed in FreeType's 26.6
+fixed point, which reproduces ImageDraw.text placement without touching the
+font face again. Atlases can be saved to disk and memory-mapped back.
+
+Atlases are shared between threads. Reading existing glyphs is lock-free;
+rasterizing a new glyph, and any other use of a font face, happens under
+the lock returned by font_lock(). Only the most recently used atlases are
+kept shared, so services cycling through many font sizes stay bounded.
+"""
+
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from PIL import Image, ImageDraw
+import numpy as np
+
+# Width of the packed atlas in pixels, rows are added as glyphs arrive
+ATLAS_WIDTH = 1024
+
+# Empty rows kept between shelves and columns between tiles
+ATLAS_GUTTER = 1
+
+# Maximum number of shared atlases, the least recently used is dropped
+MAX_SHARED_ATLASES = 32
+
+_atlases = OrderedDict()
+# A lock lives while an atlas or a thread holds it, so every user of a font
+# face at the same time gets the same lock
+_font_locks = weakref.WeakValueDictionary()
+_registry_lock = threading.RLock()
+
+
+def font_key(font):
+    """
+    Get a hashable identity for a font.
+    
+    Args:
+        font: PIL Font object
+    
+    Returns:
+        Tuple identifying the font face and size
+    """
+    path = getattr(font, 'path', None)
+    if path:
+        return (str(path), getattr(font, 'size', None), getattr(font, 'index', 0))
+    return ('id', id(font))
+
+
+def font_lock(font):
+    """
+    Get the lock serializing the use of a font face across threads.
+    
+    FreeType faces are not thread-safe, so measuring or drawing with a font
+    that other threads may use must happen while holding this lock.
+    
+    Args:
+        font: PIL Font object
+    
+    Returns:
+        Reentrant lock shared by every font with the same font_key()
+    """
+    key = font_key(font)
+    lock = _font_locks.get(key)
+    if lock is None:
+        with _registry_lock:
+            lock = _font_locks.setdefault(key, threading.RLock())
+    return lock
+
+
+def glyph_atlas(font):
+    """
+    Get the shared glyph atlas of a font, creating it on first use.
+    
+    Args:
+        font: PIL Font object
+    
+    Returns:
+        GlyphAtlas object
+    """
+    key = font_key(font)
+    with _registry_lock:
+        atlas = _atlases.get(key)
+        if atlas is not None:
+            _atlases.move_to_end(key)
+            return atlas
+        # Renderers holding a dropped atlas keep using it
+        atlas = GlyphAtlas(font)
+        _atlases[key] = atlas
+        if len(_atlases) > MAX_SHARED_ATLASES:
+            _atlases.popitem(last=False)
+    return atlas
+
+
+class GlyphAtlas:
+    """
+    Coverage tiles of every glyph drawn with one font, packed on shelves.
+    
+    Glyph entries are (x, y, width, height, left, top, advance) tuples where
+    (x, y) locate the tile in the atlas, (left, top) place it relative to the
+    pen position and the advance is in 1/64 pixels.
+    """
+    
+    def __init__(self, font):
+        """
+        Initialize an empty glyph atlas.
+        
+        Args:
+            font: PIL Font object
+        """
+        self.font = font
+        self.key = font_key(font)
+        self.lock = font_lock(font)
+        self.pixels = np.zeros((0, ATLAS_WIDTH), dtype=np.uint8)
+        self.glyphs = {}
+        self.kerning = {}
+        
+        # Shelf packing cursor: current shelf top, height and next free column
+        self._shelf_y = 0
+        self._shelf_height = 0
+        self._shelf_x = 0
+    
+    def glyph(self, char):
+        """
+        Get the atlas entry of a code point, rasterizing it on first use.
+        
+        Args:
+            char: Single character
+        
+        Returns:
+            Tuple of (x, y, width, height, left, top, advance)
+        """
+        entry = self.glyphs.get(char)
+        if entry is None:
+            with self.lock:
+                entry = self.glyphs.get(char)
+                if entry is None:
+                    # Published only once its tile is in the pixels
+                    entry = self._rasterize(char)
+                    self.glyphs[char] = entry
+        return entry
+    
+    def kern(self, left_char, right_char):
+        """
+        Get the kerning adjustment between two characters.
+        
+        Args:
+            left_char: First character
+            right_char: Character following it
+        
+        Returns:
+            Adjustment of the pen position in 1/64 pixels
+        """
+        pair = left_char + right_char
+        adjustment = self.kerning.get(pair)
+        if adjustment is None:
+            with self.lock:
+                adjustment = (
+                    self._length(pair)
+                    - self.glyph(left_char)[6]
+                    - self.glyph(right_char)[6]
+                )
+                self.kerning[pair] = adjustment
+        return adjustment
+    
+    def layout(self, text, x=0.0):
+        """
+        Place the glyphs of a string.
+        
+        Args:
+            text: Text to place
+            x: X position of the draw origin (may be fractional)
+        
+        Returns:
+            List of (entry, pixel_x) tuples for glyphs with a visible tile,
+            where pixel_x is the rounded pen position
+        """
+        placements = []
+        pen = int(round(x * 64))
+        previous = None
+        for char in text:
+            if previous is not None:
+                pen += self.kern(previous, char)
+            entry = self.glyph(char)
+            if entry[2] > 0:
+                placements.append((entry, (pen + 32) >> 6))
+            pen += entry[6]
+            previous = char
+        return placements
+    
+    def mask(self, text, x_offset=0.0):
+        """
+        Assemble text into a tight glyph coverage mask.
+        
+        Args:
+            text: Text to assemble
+            x_offset: Sub-pixel horizontal offset of the draw origin (0.0 to 1.0)
+        
+        Returns:
+            Tuple of (mask, left, top) where mask is an H x W uint8 array and
+            (left, top) is its position relative to the draw origin
+        """
+        placements = self.layout(text, x_offset)
+        if not placements:
+            return np.zeros((0, 0), dtype=np.uint8), 0, 0
+        
+        left = min(px + entry[4] for entry, px in placements)
+        top = min(entry[5] for entry, px in placements)
+        right = max(px + entry[4] + entry[2] for entry, px in placements)
+        bottom = max(entry[5] + entry[3] for entry, px in placements)
+        
+        mask = np.zeros((bottom - top, right - left), dtype=np.uint8)
+        self._blit(mask, placements, -left, -top)
+        return mask, left, top
+    
+    def draw(self, mask, text, x, y):
+        """
+        Draw text into an existing coverage mask like ImageDraw.text would.
+        
+        Args:
+            mask: H x W uint8 array to draw into
+            text: Text to draw
+            x: X position of the draw origin (may be fractional)
+            y: Y position of the draw origin
+        """
+        origin_x = int(np.floor(x))
+        self._blit(mask, self.layout(text, x - origin_x), origin_x, int(y))
+    
+    def save(self, path):
+        """
+        Save the atlas as a .npy pixel array and a .json glyph table.
+        
+        Args:
+            path: Output path without extension
+        """
+        np.save(f"{path}.npy", self.pixels)
+        metadata = {
+            'font': list(self.key),
+            'glyphs': {char: list(entry) for char, entry in self.glyphs.items()},
+            'kerning': self.kerning,
+            'shelf': [self._shelf_y, self._shelf_height, self._shelf_x]
+        }
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, path, font):
+        """
+        Load a saved atlas, memory-mapping its pixels.
+        
+        Args:
+            path: Path the atlas was saved to (without extension)
+            font: PIL Font object the atlas was built with
+        
+        Returns:
+            GlyphAtlas object
+        
+        Raises:
+            ValueError: If the atlas was built with a different font
+        """
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        
+        atlas = cls(font)
+        if tuple(metadata['font']) != atlas.key:
+            raise ValueError(f"Glyph atlas {path} was built for another font")
+        
+        atlas.pixels = np.load(f"{path}.npy", mmap_mode='r')
+        atlas.glyphs = {char: tuple(entry) for char, entry in metadata['glyphs'].items()}
+        atlas.kerning = metadata['kerning']
+        atlas._shelf_y, atlas._shelf_height, atlas._shelf_x = metadata['shelf']
+        return atlas
+    
+    def _blit(self, mask, placements, offset_x, offset_y):
+        """Combine glyph tiles into a mask with coverage 'over' blending."""
+        mask_height, mask_width = mask.shape
+        for entry, pixel_x in placements:
+            x, y, width, height, left, top = entry[:6]
+            dst_left = offset_x + pixel_x + left
+            dst_top = offset_y + top
+            
+            # Clip the tile to the mask
+            clip_left = max(0, -dst_left)
+            clip_top = max(0, -dst_top)
+            clip_right = min(width, mask_width - dst_left)
+            clip_bottom = min(height, mask_height - dst_top)
+            if clip_right <= clip_left or clip_bottom <= clip_top:
+                continue
+            
+            tile = self.pixels[y + clip_top:y + clip_bottom, x + clip_left:x + clip_right]
+            view = mask[dst_top + clip_top:dst_top + clip_bottom,
+                        dst_left + clip_left:dst_left + clip_right]
+            
+            # Overlapping glyphs (e.g. 'ff') accumulate coverage as Pillow does
+            coverage = view.astype(np.uint16)
+            view[:] = coverage + tile - coverage * tile // 255
+    
+    def _length(self, text):
+        """Get the advance of a string in 1/64 pixels."""
+        return int(round(self.font.getlength(text) * 64))
+    
+    def _rasterize(self, char):
+        """Rasterize one glyph and pack it into the atlas."""
+        advance = self._length(char)
+        left, top, right, bottom = self.font.getbbox(char)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            return (0, 0, 0, 0, 0, 0, advance)
+        
+        tile = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(tile).text((-left, -top), char, font=self.font, fill=255)
+        x, y = self._pack(width, height)
+        self.pixels[y:y + height, x:x + width] = np.array(tile)
+        return (x, y, width, height, left, top, advance)
+    
+    def _pack(self, width, height):
+        """Reserve a width x height tile on the current shelf or a new one."""
+        if self._shelf_x + width > self.pixels.shape[1]:
+            # Start a new shelf below the current one
+            self._shelf_y += self._shelf_height + ATLAS_GUTTER if self._shelf_height else 0
+            self._shelf_height = 0
+            self._shelf_x = 0
+        
+        x, y = self._shelf_x, self._shelf_y
+        self._shelf_x += width + ATLAS_GUTTER
+        self._shelf_height = max(self._shelf_height, height)
+        
+        rows = max(y + height, self.pixels.shape[0])
+        columns = max(x + width, self.pixels.shape[1])
+        if (rows, columns) != self.pixels.shape or not self.pixels.flags.writeable:
+            # Grow geometrically; a memory-mapped atlas becomes a private copy
+            if rows > self.pixels.shape[0]:
+                rows = max(rows, self.pixels.shape[0] * 2)
+            pixels = np.zeros((rows, columns), dtype=np.uint8)
+            pixels[:self.pixels.shape[0], :self.pixels.shape[1]] = self.pixels
+            self.pixels = pixels
+        return x, y
@@ -2,16 +2,40 @@
 Karafun-style karaoke renderer with two-line display and animations.
 """
 
-from PIL import Image, ImageDraw, ImageFont
 import numpy as np
-from .utils import map_in_range
+from .asset_cache import load_background
+from .compositor import Compositor, solid_layer
+from .layers import LayerGraph
+from .line_strip import LineStrip
+from .sprites import SpriteCache, font_key
+from .stripes import StripePool
+from .time_badge import TimeBadge
+from .timeline import Timeline
+from .title_card import TitleCard
+from .utils import DEFAULT_OVERLAY_OPACITY
 from pathlib import Path
 
+# Vertical center of the two lyric lines, as a fraction of the frame height
+LINE_CENTERS = {
+    'landscape': 0.40,  # Karafun style, leaving room below for the background
+    'portrait': 0.50  # Tall 9:16 frames, lines in the middle of the screen
+}
+
 
 class KarafunRenderer:
-    """Renders Karafun-style karaoke effect with two lines displayed."""
+    """
+    Renders Karafun-style karaoke effect with two lines displayed.
+    
+    A renderer keeps the previous frame and must only be used by one thread
+    at a time. To render frames concurrently, give every thread its own
+    renderer from thread_renderer(): renderers created this way share the
+    background and sprite cache, and fonts, glyph atlases and timelines are
+    safe to share between them.
+    """
     
-    def __init__(self, width=1280, height=720, bg_color=(0, 0, 0, 255), bg_image=None):
+    def __init__(self, width=1280, height=720, bg_color=(0, 0, 0, 255), bg_image=None,
+                 asset_cache=None, threads=1, sprites=None, background=None,
+                 transparent=False, layout='landscape'):
         """
         Initialize Karafun renderer.
         
@@ -20,46 +44,125 @@ class KarafunRenderer:
             height: Frame height in pixels
             bg_color: Background color as RGBA tuple
             bg_image: Path to background image (optional)
+            asset_cache: AssetCache to load the preprocessed background from (optional)
+            threads: Number of threads sharing full-frame compositing passes
+            sprites: SpriteCache shared with other renderers (optional)
+            background: Preprocessed H x W x 3 BGR background, used instead
+                        of loading bg_image (optional)
+            transparent: Render only the text, header and time layers over a
+                         transparent canvas, ignoring bg_color and bg_image
+            layout: Placement of the lyric lines, 'landscape' or 'portrait'
+        
+        Raises:
+            ValueError: If layout is unknown
         """
+        if layout not in LINE_CENTERS:
+            raise ValueError(f"Unknown layout: {layout}. Use one of: {', '.join(LINE_CENTERS)}")
         self.width = width
         self.height = height
         self.bg_color = bg_color
-        
-        # Load background image if provided
-        self.bg_image = None
-        if bg_image and Path(bg_image).exists():
+        self.transparent = transparent
+        self.layout = layout
+        
+        # Static background with the dark overlay blended in once; it is
+        # copied as the starting canvas of every frame
+        self.compositor = Compositor(width, height)
+        self._background = background
+        if transparent and background is None:
+            # Frames are premultiplied BGRA with nothing behind the text
+            self._background = self.compositor.new_canvas((0, 0, 0, 0), channels=4)
+        
+        # Load background image if provided, from the asset cache when given
+        self.bg_image = bg_image if background is not None else None
+        if self._background is None and bg_image and Path(bg_image).exists():
             try:
-                self.bg_image = Image.open(bg_image).convert('RGBA')
-                # Resize to match video dimensions with high-quality resampling
-                # Try new API first, fall back to old API for compatibility
-                try:
-                    resample_method = Image.Resampling.LANCZOS
-                except AttributeError:
-                    try:
-                        # Fallback for older Pillow versions (< 9.1.0)
-                        resample_method = Image.LANCZOS
-                    except AttributeError:
-                        # Ultimate fallback to BICUBIC if LANCZOS unavailable
-                        resample_method = Image.BICUBIC
-                self.bg_image = self.bg_image.resize((width, height), resample_method)
+                if asset_cache is not None:
+                    self._background = asset_cache.background(bg_image, width, height,
+                                                              DEFAULT_OVERLAY_OPACITY)
+                else:
+                    self._background = load_background(bg_image, width, height,
+                                                       DEFAULT_OVERLAY_OPACITY)
+                self.bg_image = bg_image
             except Exception as e:
                 print(f"Warning: Could not load background image: {e}")
-                self.bg_image = None
+        
+        if self._background is None:
+            self._background = self.compositor.new_canvas(bg_color)
         
         # Karafun color scheme
         self.inactive_color = (255, 255, 255, 255)  # White for inactive
         self.done_color = (237, 61, 234, 255)  # Magenta/pink for done words
         self.active_fill_color = (255, 255, 255, 255)  # White for active filling
+        self.title_glow = (3, (237, 61, 234, 160))  # Glow radius and color behind the title
+        
+        # Rasterized text and effects, reused by every frame showing them
+        self.sprites = sprites if sprites is not None else SpriteCache()
+        
+        # Rasterized line strips, kept only while their line is visible
+        self._line_strips = {}
+        self._visible_strips = set()
+        
+        # Title card of the current song, as (key, TitleCard)
+        self._title_card = None
+        
+        # Remaining-time badge, as (key, TimeBadge)
+        self._time_badge = None
+        
+        # Large recompositions and the frame copy are split into stripes
+        # processed in parallel (high resolutions only benefit)
+        self.stripes = StripePool(threads) if threads > 1 else None
+        
+        # Retained frame: layers are recomposed only when their content changes
+        self.layers = LayerGraph(
+            self._background,
+            self.compositor,
+            ['header', 'time', 'current_line', 'next_line', 'title'],
+            stripes=self.stripes
+        )
+    
+    def close(self):
+        """Stop the stripe threads; the renderer must not be used afterwards."""
+        if self.stripes is not None:
+            self.stripes.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def thread_renderer(self):
+        """
+        Create a renderer for another thread, sharing this one's caches.
+        
+        Returns:
+            KarafunRenderer with the same size and background
+        """
+        return KarafunRenderer(
+            width=self.width,
+            height=self.height,
+            bg_color=self.bg_color,
+            bg_image=self.bg_image,
+            sprites=self.sprites,
+            background=self._background,
+            transparent=self.transparent,
+            layout=self.layout
+        )
     
     def render_frame(self, lines_data, text_layout, current_time, 
                      show_header=True, show_title=False,
                      song_title=None, artist_name=None, show_time=False,
-                     typewriter_speed=0.05, video_duration=None):
+                     typewriter_speed=0.05, video_duration=None, out=None):
         """
         Render a single frame with Karafun style (two lines).
         
+        The frame is kept between calls and only the layers whose content
+        changed (header, time badge, current line, next line, title card)
+        are recomposed, each within its own rectangle.
+        
         Args:
-            lines_data: List of line dictionaries with word_timings and word_sizes
+            lines_data: List of line dictionaries with word_timings and word_sizes,
+                        or a Timeline that lays lines out on demand
             text_layout: TextLayout object for font information
             current_time: Current time in seconds
             show_header: Whether to show the header
@@ -69,406 +172,293 @@ class KarafunRenderer:
             show_time: Whether to show time display
             typewriter_speed: Speed of typewriter animation (seconds per character)
             video_duration: Total video duration for time remaining calculation
+            out: Optional H x W x 3 (x 4 when transparent) uint8 array to
+                 write the frame into
         
         Returns:
-            NumPy array representing the frame (H x W x 3 in BGR format for OpenCV)
+            NumPy array representing the frame (H x W x 3 in BGR format for
+            OpenCV, or H x W x 4 premultiplied BGRA when transparent)
         """
-        # Create PIL image with background
-        if self.bg_image:
-            img = self.bg_image.copy()
-            # Add dark overlay to improve text visibility on bright backgrounds
-            from .utils import DEFAULT_OVERLAY_OPACITY
-            overlay = Image.new('RGBA', (self.width, self.height), (0, 0, 0, DEFAULT_OVERLAY_OPACITY))
-            img = Image.alpha_composite(img, overlay)
+        layers = self.layers
+        title_screen = bool(show_title and song_title)
+        
+        # Title screen with typewriter animation
+        if title_screen:
+            card_key, card = self._get_title_card(song_title, artist_name,
+                                                  text_layout, typewriter_speed)
+            title_state = card.state(current_time)
+            layers.update('title', card_key + title_state, lambda: card.card(*title_state))
         else:
-            img = Image.new('RGBA', (self.width, self.height), self.bg_color)
-        
-        if show_title and song_title:
-            # Show title screen with typewriter animation
-            self._render_title_screen(img, song_title, artist_name, text_layout, current_time, typewriter_speed)
+            layers.update('title', None, None)
+        
+        # Header
+        header_visible = show_header and not title_screen
+        layers.update(
+            'header',
+            self._layout_key(text_layout) if header_visible else None,
+            lambda: self._header_sprites(text_layout)
+        )
+        
+        # Time display, changes at most once per second
+        if show_time and video_duration and not title_screen:
+            badge_key, badge = self._get_time_badge(text_layout)
+            time_state = badge.state(current_time, video_duration, lines_data)
+            layers.update('time', (badge_key,) + time_state, lambda: badge.sprites(time_state))
         else:
-            # Show header if enabled
-            if show_header:
-                self._render_header(img, text_layout)
-            
-            # Show time display if enabled
-            if show_time and video_duration:
-                self._render_time_display(img, text_layout, current_time, video_duration, lines_data)
-            
-            # Find the current and next line using alternating sliding logic
-            current_line = None
-            next_line = None
+            layers.update('time', None, None)
+        
+        # Current and next lyric lines
+        current_line, next_line = (None, None) if title_screen else self._find_lines(lines_data, current_time)
+        
+        # Calculate positions for two lines
+        # Karafun style: centered vertically around 40% from top (50% in portrait)
+        center_y = int(self.height * LINE_CENTERS[self.layout])
+        
+        if current_line:
+            line_height = max(w['height'] for w in current_line['word_sizes']) if current_line['word_sizes'] else 60
+            line_spacing = int(line_height * 0.8)
             
-            for i, line in enumerate(lines_data):
-                # Current line is the one being sung
-                if line['start_time'] <= current_time <= line['end_time']:
-                    current_line = line
-                    # Next line is the one after current
-                    if i + 1 < len(lines_data):
-                        next_line = lines_data[i + 1]
-                    break
+            # Current line position (upper line)
+            current_y = center_y - line_spacing // 2
+            self._update_line_layer('current_line', current_line, text_layout,
+                                    current_time, current_y, is_current=True)
+        else:
+            layers.update('current_line', None, None)
+        
+        if current_line and next_line:
+            next_y = center_y + line_spacing // 2 + line_height
             
-            # If no current line, check if we're before first line or after last
-            if current_line is None:
-                if lines_data and current_time < lines_data[0]['start_time']:
-                    # Before first line - show first two lines
-                    current_line = lines_data[0]
-                    if len(lines_data) > 1:
-                        next_line = lines_data[1]
-                elif lines_data and current_time > lines_data[-1]['end_time']:
-                    # After last line - show last line
-                    current_line = lines_data[-1]
+            # Calculate opacity for next line (fade in as current line progresses)
+            line_progress = 0
+            if current_line['end_time'] > current_line['start_time']:
+                line_progress = (current_time - current_line['start_time']) / (current_line['end_time'] - current_line['start_time'])
             
-            # Calculate positions for two lines
-            # Karafun style: centered vertically around 40% from top
-            center_y = int(self.height * 0.40)
+            opacity = min(1.0, line_progress * 2)  # Fade in during first half
             
-            if current_line:
-                line_height = max(w['height'] for w in current_line['word_sizes']) if current_line['word_sizes'] else 60
-                line_spacing = int(line_height * 0.8)
-                
-                # Current line position (upper line)
-                current_y = center_y - line_spacing // 2
-                
-                # Render current line
-                self._render_line(
-                    img, 
-                    current_line['word_timings'],
-                    current_line['word_sizes'],
-                    text_layout,
-                    current_time,
-                    current_y,
-                    is_current=True,
-                    line_index=0
-                )
-                
-                # Render next line if it exists
-                if next_line:
-                    next_y = center_y + line_spacing // 2 + line_height
-                    
-                    # Calculate opacity for next line (fade in as current line progresses)
-                    line_progress = 0
-                    if current_line['end_time'] > current_line['start_time']:
-                        line_progress = (current_time - current_line['start_time']) / (current_line['end_time'] - current_line['start_time'])
-                    
-                    opacity = min(1.0, line_progress * 2)  # Fade in during first half
-                    
-                    self._render_line(
-                        img,
-                        next_line['word_timings'],
-                        next_line['word_sizes'],
-                        text_layout,
-                        current_time,
-                        next_y,
-                        is_current=False,
-                        line_index=1,
-                        opacity=opacity
-                    )
-        
-        # Convert PIL image to OpenCV format (BGR)
-        img_rgb = img.convert('RGB')
-        img_array = np.array(img_rgb)
-        img_bgr = img_array[:, :, ::-1]
-        
-        return img_bgr
+            self._update_line_layer('next_line', next_line, text_layout,
+                                    current_time, next_y, is_current=False, opacity=opacity)
+        else:
+            layers.update('next_line', None, None)
+        
+        self._evict_line_strips()
+        
+        # The canvas is already in OpenCV format (BGR)
+        canvas = layers.compose()
+        if out is None:
+            out = np.empty_like(canvas)
+        if self.stripes is not None:
+            self.stripes.copy(out, canvas)
+        else:
+            np.copyto(out, canvas)
+        return out
     
-    def _render_line(self, img, word_timings, word_sizes, text_layout, current_time, 
-                     y_position, is_current=True, line_index=0, opacity=1.0):
+    def _find_lines(self, lines_data, current_time):
         """
-        Render a single line of lyrics with Karafun style.
+        Find the current and next line using alternating sliding logic.
         
         Args:
-            img: PIL Image to draw on
-            word_timings: List of WordTiming objects
-            word_sizes: List of word size dictionaries
+            lines_data: List of line dictionaries or a Timeline
+            current_time: Current time in seconds
+        
+        Returns:
+            Tuple of (current_line, next_line), either may be None
+        """
+        if isinstance(lines_data, Timeline):
+            return lines_data.find_lines(current_time)
+        
+        current_line = None
+        next_line = None
+        
+        for i, line in enumerate(lines_data):
+            # Current line is the one being sung
+            if line['start_time'] <= current_time <= line['end_time']:
+                current_line = line
+                # Next line is the one after current
+                if i + 1 < len(lines_data):
+                    next_line = lines_data[i + 1]
+                break
+        
+        # If no current line, check if we're before first line or after last
+        if current_line is None:
+            if lines_data and current_time < lines_data[0]['start_time']:
+                # Before first line - show first two lines
+                current_line = lines_data[0]
+                if len(lines_data) > 1:
+                    next_line = lines_data[1]
+            elif lines_data and current_time > lines_data[-1]['end_time']:
+                # After last line - show last line
+                current_line = lines_data[-1]
+        
+        return current_line, next_line
+    
+    def _update_line_layer(self, name, line, text_layout, current_time,
+                           y_position, is_current=True, opacity=1.0):
+        """
+        Update a lyric line layer with Karafun style.
+        
+        The line is rasterized once into cached strips (see LineStrip), and
+        the layer only becomes dirty when the fill cutoff moves to another
+        pixel column or the fade opacity changes.
+        
+        Args:
+            name: Layer name ('current_line' or 'next_line')
+            line: Line dictionary with word_timings and word_sizes
             text_layout: TextLayout object
             current_time: Current time in seconds
             y_position: Y position for the line
             is_current: Whether this is the currently playing line
-            line_index: Line index (0 for current/odd, 1 for next/even)
             opacity: Line opacity (0.0 to 1.0)
         """
+        word_timings = line['word_timings']
+        word_sizes = line['word_sizes']
         if not word_timings:
+            self.layers.update(name, None, None)
             return
         
         # Calculate total width for centering
         total_width = sum(w['width'] for w in word_sizes)
         start_x = (self.width - total_width) / 2
+        origin_x = int(np.floor(start_x))
         
-        # Apply uppercase style if needed
-        from .utils import parse_text_style
-        styles = parse_text_style(text_layout.style)
+        strip_key, strip = self._get_line_strip(word_sizes, text_layout, start_x - origin_x)
         
-        # Draw each word
-        for timing, word_info in zip(word_timings, word_sizes):
-            word_text = word_info['text']
-            word_width = word_info['width']
-            word_x = start_x + word_info['widthRange'][0]
-            
-            if styles.get('uppercase'):
-                word_text = word_text.upper()
-            
-            status = timing.get_status(current_time)
-            
-            # Determine color based on status and whether it's current line
-            if not is_current:
-                # Next line: always white with opacity
-                color = tuple(int(c * opacity) for c in self.inactive_color[:3]) + (int(255 * opacity),)
-                self._draw_text(img, word_text, word_x, y_position, text_layout.font, color)
-            
-            elif status == 'inactive':
-                # Inactive: white
-                color = tuple(int(c * opacity) for c in self.inactive_color[:3]) + (int(255 * opacity),)
-                self._draw_text(img, word_text, word_x, y_position, text_layout.font, color)
-            
-            elif status == 'passed':
-                # Passed: magenta/pink
-                color = tuple(int(c * opacity) for c in self.done_color[:3]) + (int(255 * opacity),)
-                self._draw_text(img, word_text, word_x, y_position, text_layout.font, color)
-            
-            elif status == 'active':
-                # Active: progressive fill from white to white (the fill itself is white on white base)
-                progress = timing.get_progress(current_time)
-                
-                # Draw base in white
-                base_color = tuple(int(c * opacity) for c in self.inactive_color[:3]) + (int(255 * opacity),)
-                self._draw_text(img, word_text, word_x, y_position, text_layout.font, base_color)
-                
-                # Calculate fill width
-                fill_width = map_in_range(progress, 0, 100, 0, word_width, constrain=True)
-                
-                # Draw the filled portion in done color (magenta)
-                if fill_width > 0:
-                    temp_img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-                    fill_color = tuple(int(c * opacity) for c in self.done_color[:3]) + (int(255 * opacity),)
-                    self._draw_text(temp_img, word_text, word_x, y_position, text_layout.font, fill_color)
-                    
-                    # Create mask for filled portion
-                    mask = Image.new('L', (self.width, self.height), 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.rectangle(
-                        [word_x, 0, word_x + fill_width, self.height],
-                        fill=int(255 * opacity)
-                    )
-                    
-                    # Composite
-                    img.paste(temp_img, (0, 0), mask)
+        # Next line is never filled, current line is filled up to the cutoff
+        if is_current:
+            cutoff = LineStrip.cutoff(word_timings, word_sizes, current_time)
+        else:
+            cutoff = 0.0
+        column = strip.column(cutoff)
+        
+        # Quantize opacity to the steps the compositor can represent
+        opacity_step = max(0, min(256, int(round(opacity * 256))))
+        
+        x = origin_x - strip.padding
+        y = int(y_position) - strip.padding
+        self.layers.update(
+            name,
+            (strip_key, column, x, y, opacity_step) if opacity_step > 0 else None,
+            lambda: [(strip.compose_column(column), x, y, min(1.0, opacity_step / 256))]
+        )
     
-    def _render_header(self, img, text_layout):
+    def _get_line_strip(self, word_sizes, text_layout, x_offset):
         """
-        Render Karafun-style header with site name and status.
+        Get the cached strip for a line, rasterizing it on first use.
         
         Args:
-            img: PIL Image to draw on
+            word_sizes: List of word size dictionaries
             text_layout: TextLayout object
+            x_offset: Sub-pixel offset of the line start
+        
+        Returns:
+            Tuple of (strip key, LineStrip object)
         """
-        draw = ImageDraw.Draw(img)
+        key = (
+            self._layout_key(text_layout),
+            round(x_offset, 3),
+            tuple((w['text'], w['widthRange'][0]) for w in word_sizes)
+        )
+        strip = self._line_strips.get(key)
+        if strip is None:
+            strip = LineStrip(word_sizes, text_layout, self.inactive_color,
+                              self.done_color, x_offset=x_offset)
+            self._line_strips[key] = strip
+        self._visible_strips.add(key)
+        return key, strip
+    
+    def _evict_line_strips(self):
+        """Drop cached strips of lines that were not visible in the last frame."""
+        for key in list(self._line_strips):
+            if key not in self._visible_strips:
+                del self._line_strips[key]
+        self._visible_strips = set()
+    
+    @staticmethod
+    def _layout_key(text_layout):
+        """Get a hashable identity for the font settings of a text layout."""
+        return (font_key(text_layout.font), text_layout.font_size, text_layout.style)
+    
+    def _header_sprites(self, text_layout):
+        """
+        Build Karafun-style header with site name and status.
+        
+        Args:
+            text_layout: TextLayout object
         
+        Returns:
+            List of (layer, x, y, opacity) sprites
+        """
         # Header background - fully transparent (no black bar)
         header_height = 80
         
         # Draw decorative top line
-        draw.line([(0, 0), (self.width, 0)], fill=(237, 61, 234, 255), width=2)
+        sprites = [(solid_layer(self.width, 2, (237, 61, 234, 255)), 0, 0, 1.0)]
         
         # Site name on the left
         site_name = "tiakalo.org"
-        font_size = 32
-        try:
-            font_path = getattr(text_layout.font, 'path', None)
-            if font_path:
-                header_font = ImageFont.truetype(font_path, font_size)
-            else:
-                header_font = text_layout.font
-        except Exception:
-            header_font = text_layout.font
-        
-        draw.text((30, 25), site_name, font=header_font, fill=(255, 255, 255, 255))
+        header_font = text_layout.font_variant(32)
+        
+        sprites.append(self._text_sprite(site_name, 30, 25, header_font, (255, 255, 255, 255)))
         
         # Status indicator on the right
         status_text = "♪ KARAOKE"
         status_x = self.width - 200
         
         # Draw status background
-        status_bg = Image.new('RGBA', (150, 40), (237, 61, 234, 77))  # 30% opacity
-        img.paste(status_bg, (status_x, 20), status_bg)
+        status_bg = solid_layer(150, 40, (237, 61, 234, 77))  # 30% opacity
+        sprites.append((status_bg, status_x, 20, 1.0))
         
-        draw.text((status_x + 15, 25), status_text, font=header_font, fill=(255, 255, 255, 255))
+        sprites.append(self._text_sprite(status_text, status_x + 15, 25, header_font, (255, 255, 255, 255)))
+        return sprites
     
-    def _render_title_screen(self, img, title, artist, text_layout, current_time, typewriter_speed=0.05):
+    def _get_title_card(self, title, artist, text_layout, typewriter_speed):
         """
-        Render title screen with song title and artist name using typewriter animation.
+        Get the title card for a song, creating it when the song or font changes.
         
         Args:
-            img: PIL Image to draw on
             title: Song title
             artist: Artist name
             text_layout: TextLayout object
-            current_time: Current time in seconds for animation
             typewriter_speed: Speed of typewriter effect (seconds per character)
+        
+        Returns:
+            Tuple of (card key, TitleCard object)
         """
-        draw = ImageDraw.Draw(img)
-        
-        # Create larger font for title
-        title_size = int(text_layout.font_size * 1.8)
-        artist_size = int(text_layout.font_size * 1.2)
-        
-        try:
-            font_path = getattr(text_layout.font, 'path', None)
-            if font_path:
-                title_font = ImageFont.truetype(font_path, title_size)
-                artist_font = ImageFont.truetype(font_path, artist_size)
-            else:
-                title_font = text_layout.font
-                artist_font = text_layout.font
-        except Exception:
-            title_font = text_layout.font
-            artist_font = text_layout.font
-        
-        # Calculate how many characters to display based on current time (typewriter effect)
-        chars_per_second = 1.0 / typewriter_speed if typewriter_speed > 0 else 20
-        title_chars_to_show = int(current_time * chars_per_second)
-        
-        # Display partial title with typewriter effect
-        title_display = title[:title_chars_to_show] if title_chars_to_show < len(title) else title
-        title_complete = title_chars_to_show >= len(title)
-        
-        # Start showing artist after title is complete
-        artist_delay = len(title) * typewriter_speed
-        artist_chars_to_show = int((current_time - artist_delay) * chars_per_second) if current_time > artist_delay else 0
-        
-        # Measure text
-        title_bbox = draw.textbbox((0, 0), title_display, font=title_font)
-        title_width = title_bbox[2] - title_bbox[0]
-        title_height = title_bbox[3] - title_bbox[1]
-        
-        # Full width for underline animation
-        full_title_bbox = draw.textbbox((0, 0), title, font=title_font)
-        full_title_width = full_title_bbox[2] - full_title_bbox[0]
-        
-        if artist and artist_chars_to_show > 0:
-            artist_display = artist[:artist_chars_to_show] if artist_chars_to_show < len(artist) else artist
-            artist_text = f"> {artist_display} <"
-            artist_bbox = draw.textbbox((0, 0), artist_text, font=artist_font)
-            artist_width = artist_bbox[2] - artist_bbox[0]
-            artist_height = artist_bbox[3] - artist_bbox[1]
-        else:
-            artist_width = 0
-            artist_height = 0
-            artist_display = None
-        
-        # Calculate positions (centered)
-        center_y = self.height // 2
-        title_y = center_y - title_height - 40
-        artist_y = center_y + 20
-        
-        # Draw title with glow effect
-        title_x = (self.width - title_width) // 2
-        
-        # Glow effect (draw multiple times with offset)
-        glow_color = (237, 61, 234, 100)
-        for offset in [(-2, -2), (2, -2), (-2, 2), (2, 2)]:
-            draw.text((title_x + offset[0], title_y + offset[1]), title_display, 
-                     font=title_font, fill=glow_color)
-        
-        # Main title text
-        draw.text((title_x, title_y), title_display, font=title_font, fill=(255, 255, 255, 255))
-        
-        # Draw decorative animated underline under title (progressive from left to right)
-        if title_complete:
-            line_y = title_y + title_height + 10
-            line_start_x = (self.width - full_title_width) // 2
-            
-            # Animate underline from left to right after title completes
-            # Constants for underline animation timing
-            UNDERLINE_START_DELAY = 0.5  # Wait 0.5s after title completes before starting
-            UNDERLINE_SPEED_MULTIPLIER = 2.0  # Speed at which underline progresses (2x = 0.5s duration)
-            
-            underline_progress = min(1.0, (current_time - artist_delay + UNDERLINE_START_DELAY) * UNDERLINE_SPEED_MULTIPLIER)
-            line_end_x = line_start_x + int(full_title_width * underline_progress)
-            
-            if underline_progress > 0:
-                draw.line([(line_start_x, line_y), (line_end_x, line_y)], 
-                         fill=(237, 61, 234, 255), width=3)
-        
-        # Draw artist name if provided and visible
-        if artist and artist_display:
-            artist_text = f"> {artist_display} <"
-            artist_x = (self.width - artist_width) // 2
-            draw.text((artist_x, artist_y), artist_text, 
-                     font=artist_font, fill=(200, 200, 200, 255))
+        key = (self._layout_key(text_layout), title, artist, typewriter_speed)
+        if self._title_card is None or self._title_card[0] != key:
+            card = TitleCard(title, artist, text_layout, self.width, self.height,
+                             typewriter_speed=typewriter_speed, sprites=self.sprites,
+                             glow=self.title_glow)
+            self._title_card = (key, card)
+        return self._title_card
     
-    def _render_time_display(self, img, text_layout, current_time, video_duration, lines_data):
+    def _get_time_badge(self, text_layout):
         """
-        Render time display showing remaining time.
+        Get the time badge, creating it when the font changes.
         
         Args:
-            img: PIL Image to draw on
             text_layout: TextLayout object
-            current_time: Current time in seconds
-            video_duration: Total video duration in seconds
-            lines_data: List of line data (to determine if we're in waiting state)
-        """
-        draw = ImageDraw.Draw(img)
-        
-        # Calculate remaining time
-        remaining_seconds = max(0, video_duration - current_time)
-        
-        # Check if we're in waiting state (before first line or between lines)
-        # Note: any() evaluates until first True is found, optimizing most common case
-        in_waiting = True
-        if lines_data:
-            in_waiting = not any(line['start_time'] <= current_time <= line['end_time'] for line in lines_data)
         
-        # Format time display
-        minutes = int(remaining_seconds // 60)
-        seconds = int(remaining_seconds % 60)
-        
-        if in_waiting:
-            # Show long remaining format when waiting
-            time_text = f"Remaining: {minutes:02d}:{seconds:02d}"
-        else:
-            # Show short remaining format when singing
-            time_text = f"{minutes:02d}:{seconds:02d}"
-        
-        # Create font for time display
-        time_font_size = 24
-        try:
-            # Try to get font path, with fallback for fonts without path attribute
-            font_path = getattr(text_layout.font, 'path', None)
-            if font_path:
-                time_font = ImageFont.truetype(font_path, time_font_size)
-            else:
-                time_font = text_layout.font
-        except Exception:
-            time_font = text_layout.font
-        
-        # Measure text
-        time_bbox = draw.textbbox((0, 0), time_text, font=time_font)
-        time_width = time_bbox[2] - time_bbox[0]
-        
-        # Position in bottom right corner
-        time_x = self.width - time_width - 30
-        time_y = self.height - 50
-        
-        # Draw time with semi-transparent background
-        bg_padding = 10
-        bg_rect = Image.new('RGBA', (time_width + bg_padding * 2, 35), (0, 0, 0, 128))
-        img.paste(bg_rect, (time_x - bg_padding, time_y - 5), bg_rect)
-        
-        # Draw time text
-        draw.text((time_x, time_y), time_text, font=time_font, fill=(255, 255, 255, 255))
+        Returns:
+            Tuple of (badge key, TimeBadge object)
+        """
+        key = self._layout_key(text_layout)
+        if self._time_badge is None or self._time_badge[0] != key:
+            self._time_badge = (key, TimeBadge(text_layout, self.width, self.height))
+        return self._time_badge
     
-    def _draw_text(self, img, text, x, y, font, color):
+    def _text_sprite(self, text, x, y, font, color, **effects):
         """
-        Draw text on image.
+        Get a cached text sprite placed at a position.
         
         Args:
-            img: PIL Image object
             text: Text to draw
             x: X position
             y: Y position
             font: PIL Font object
             color: RGBA color tuple
+            **effects: Optional outline, shadow or glow (see sprites.text_layer)
+        
+        Returns:
+            (layer, x, y, opacity) sprite
         """
-        draw = ImageDraw.Draw(img)
-        draw.text((x, y), text, font=font, fill=color)
+        return self.sprites.place(text, x, y, font, color, **effects)
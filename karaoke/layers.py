@@ -0,0 +1,184 @@
+"""
+Layer graph module for retained-mode frame composition.
+
+A frame is made of independent layers (header, time badge, lyric lines...)
+that change on their own schedule. Each layer declares a key describing its
+visible content; when the key changes the layer is rebuilt and only the
+rectangles it covered before and after are recomposed.
+"""
+
+
+class LayerGraph:
+    """Keeps a composed canvas and recomposes only dirty rectangles."""
+    
+    def __init__(self, background, compositor, layer_names, stripes=None):
+        """
+        Initialize layer graph.
+        
+        Args:
+            background: Static background canvas (BGR or premultiplied BGRA)
+            compositor: Compositor used for blending
+            layer_names: Layer names in drawing order (bottom to top)
+            stripes: StripePool to recompose large rectangles in parallel (optional)
+        """
+        self.background = background
+        self.compositor = compositor
+        self.layer_names = list(layer_names)
+        self.canvas = background.copy()
+        
+        # Compositors keep scratch buffers, so every stripe gets its own
+        self.stripes = stripes
+        self._compositors = [compositor]
+        if stripes is not None:
+            self._compositors += [
+                type(compositor)(compositor.width, compositor.height)
+                for _ in range(stripes.threads - 1)
+            ]
+        
+        self._keys = {}
+        self._sprites = {name: [] for name in self.layer_names}
+        self._bounds = {name: None for name in self.layer_names}
+        self._dirty = []
+    
+    def update(self, name, key, build):
+        """
+        Declare the current content of a layer.
+        
+        The layer is rebuilt only when its key differs from the previous
+        frame. Sprites are (layer, x, y, opacity) tuples where layer is a
+        premultiplied BGRA array.
+        
+        Args:
+            name: Layer name
+            key: Hashable description of the layer content (None = hidden)
+            build: Callable returning the list of sprites for this key
+        
+        Returns:
+            True if the layer was rebuilt
+        """
+        if name in self._keys and self._keys[name] == key:
+            return False
+        
+        sprites = build() if key is not None else []
+        bounds = self._sprite_bounds(sprites)
+        
+        self._dirty.append(self._bounds[name])
+        self._dirty.append(bounds)
+        
+        self._keys[name] = key
+        self._sprites[name] = sprites
+        self._bounds[name] = bounds
+        return True
+    
+    def invalidate(self, rect=None):
+        """
+        Force a rectangle (or the whole canvas) to be recomposed.
+        
+        Args:
+            rect: (left, top, right, bottom) tuple, or None for the whole canvas
+        """
+        if rect is None:
+            height, width = self.canvas.shape[:2]
+            rect = (0, 0, width, height)
+        self._dirty.append(rect)
+    
+    def compose(self):
+        """
+        Recompose the dirty rectangles.
+        
+        Returns:
+            The composed canvas (owned by the graph, do not modify)
+        """
+        for rect in self._merge_rects(self._dirty):
+            self._recompose(rect)
+        self._dirty = []
+        return self.canvas
+    
+    def dirty_rects(self):
+        """
+        Get the rectangles that the next compose() will redraw.
+        
+        Returns:
+            List of (left, top, right, bottom) tuples
+        """
+        return self._merge_rects(self._dirty)
+    
+    def _recompose(self, rect):
+        """Restore the background in a rectangle and redraw every layer over it."""
+        if self.stripes is None:
+            self._recompose_rows(rect, rect[1], rect[3], self.compositor)
+            return
+        
+        def recompose_stripe(index, top, bottom):
+            self._recompose_rows(rect, top, bottom, self._compositors[index])
+        
+        self.stripes.run(recompose_stripe, rect[1], rect[3])
+    
+    def _recompose_rows(self, rect, top, bottom, compositor):
+        """Recompose the rows top to bottom of a rectangle with a compositor."""
+        left, right = rect[0], rect[2]
+        view = self.canvas[top:bottom, left:right]
+        view[:] = self.background[top:bottom, left:right]
+        
+        for name in self.layer_names:
+            bounds = self._bounds[name]
+            if bounds is None or not self._intersects(bounds, rect):
+                continue
+            for layer, x, y, opacity in self._sprites[name]:
+                # Drawing into the view clips the sprite to the rectangle
+                compositor.over(view, layer, x - left, y - top, opacity)
+    
+    def _sprite_bounds(self, sprites):
+        """Get the canvas rectangle covered by a list of sprites."""
+        height, width = self.canvas.shape[:2]
+        bounds = None
+        for layer, x, y, opacity in sprites:
+            if opacity <= 0:
+                continue
+            rect = (
+                max(0, int(x)),
+                max(0, int(y)),
+                min(width, int(x) + layer.shape[1]),
+                min(height, int(y) + layer.shape[0])
+            )
+            if rect[2] <= rect[0] or rect[3] <= rect[1]:
+                continue
+            if bounds is None:
+                bounds = rect
+            else:
+                bounds = (
+                    min(bounds[0], rect[0]),
+                    min(bounds[1], rect[1]),
+                    max(bounds[2], rect[2]),
+                    max(bounds[3], rect[3])
+                )
+        return bounds
+    
+    @staticmethod
+    def _intersects(a, b):
+        """Check whether two rectangles overlap."""
+        return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+    
+    @classmethod
+    def _merge_rects(cls, rects):
+        """Merge overlapping rectangles so no pixel is recomposed twice."""
+        merged = []
+        for rect in rects:
+            if rect is None:
+                continue
+            changed = True
+            while changed:
+                changed = False
+                for other in merged:
+                    if cls._intersects(rect, other):
+                        merged.remove(other)
+                        rect = (
+                            min(rect[0], other[0]),
+                            min(rect[1], other[1]),
+                            max(rect[2], other[2]),
+                            max(rect[3], other[3])
+                        )
+                        changed = True
+                        break
+            merged.append(rect)
+        return merged
@@ -0,0 +1,164 @@
+"""
+Line strip module for rasterizing a lyric line once and wiping it by column.
+"""
+
+import math
+import numpy as np
+from .compositor import Compositor, mask_layer
+from .glyph_atlas import font_lock, glyph_atlas
+from .sprites import effects_layer, effects_padding, style_effects
+from .utils import map_in_range, parse_text_style
+
+
+class LineStrip:
+    """
+    A lyric line rasterized once into an inactive strip and a done strip.
+    
+    Every frame of the line is then produced by taking done pixels left of
+    a single x-cutoff and inactive pixels to the right of it, so no font
+    rasterization happens after the line first becomes visible. Outline and
+    shadow styles are rendered once into both strips.
+    """
+    
+    def __init__(self, word_sizes, text_layout, inactive_color, done_color, x_offset=0.0):
+        """
+        Rasterize a line into two full-line strips.
+        
+        Args:
+            word_sizes: List of word size dictionaries from TextLayout
+            text_layout: TextLayout object for font information
+            inactive_color: RGBA color for words not yet sung
+            done_color: RGBA color for sung words
+            x_offset: Sub-pixel offset of the line start (0.0 to 1.0)
+        """
+        font = text_layout.font
+        styles = parse_text_style(text_layout.style)
+        
+        self.total_width = sum(w['width'] for w in word_sizes)
+        self.x_offset = x_offset
+        
+        effects = style_effects(text_layout.style, text_layout.font_size)
+        
+        # Padding keeps glyph overhangs (bold, italic) and effects inside the strip
+        self.padding = max(4, int(text_layout.font_size) // 4, effects_padding(**effects))
+        
+        with font_lock(font):
+            try:
+                ascent, descent = font.getmetrics()
+            except AttributeError:
+                ascent, descent = font.getbbox('Ay')[3], 0
+        
+        strip_width = int(math.ceil(self.total_width + x_offset)) + self.padding * 2
+        strip_height = ascent + descent + self.padding * 2
+        
+        # Assemble the glyph coverage once from the font's glyph atlas
+        self.mask = np.zeros((strip_height, strip_width), dtype=np.uint8)
+        atlas = glyph_atlas(font)
+        for word_info in word_sizes:
+            word_text = word_info['text']
+            if styles.get('uppercase'):
+                word_text = word_text.upper()
+            word_x = self.padding + x_offset + word_info['widthRange'][0]
+            atlas.draw(self.mask, word_text, word_x, self.padding)
+        
+        if effects:
+            # Effects are shared by both strips, only the fill color differs
+            compositor = Compositor(strip_width, strip_height)
+            underlay = effects_layer(self.mask, **effects)
+            self.inactive = underlay.copy()
+            compositor.over(self.inactive, mask_layer(self.mask, inactive_color))
+            self.done = underlay
+            compositor.over(self.done, mask_layer(self.mask, done_color))
+        else:
+            self.inactive = mask_layer(self.mask, inactive_color)
+            self.done = mask_layer(self.mask, done_color)
+        self._frame = np.empty_like(self.inactive)
+    
+    @property
+    def width(self):
+        """Strip width in pixels."""
+        return self.mask.shape[1]
+    
+    @property
+    def height(self):
+        """Strip height in pixels."""
+        return self.mask.shape[0]
+    
+    @staticmethod
+    def cutoff(word_timings, word_sizes, current_time):
+        """
+        Calculate the fill cutoff of a line relative to its start.
+        
+        Passed words are filled completely and the active word is filled
+        proportionally to its progress, so the sung part of a line is always
+        a single run starting at the left edge.
+        
+        Args:
+            word_timings: List of WordTiming objects
+            word_sizes: List of word size dictionaries
+            current_time: Current time in seconds
+        
+        Returns:
+            Cutoff x position in pixels from the line start
+        """
+        cutoff = 0.0
+        for timing, word_info in zip(word_timings, word_sizes):
+            status = timing.get_status(current_time)
+            if status == 'passed':
+                cutoff = word_info['widthRange'][1]
+            elif status == 'active':
+                progress = timing.get_progress(current_time)
+                fill_width = map_in_range(progress, 0, 100, 0, word_info['width'], constrain=True)
+                cutoff = word_info['widthRange'][0] + fill_width
+                break
+            else:
+                break
+        return cutoff
+    
+    def column(self, cutoff):
+        """
+        Get the strip column where done pixels end for a fill cutoff.
+        
+        Args:
+            cutoff: Fill cutoff in pixels from the line start
+        
+        Returns:
+            Column index in strip coordinates
+        """
+        column = int(round(self.padding + self.x_offset + cutoff)) if cutoff > 0 else 0
+        return max(0, min(self.width, column))
+    
+    def compose(self, cutoff):
+        """
+        Compose the line for a given fill cutoff.
+        
+        Args:
+            cutoff: Fill cutoff in pixels from the line start
+        
+        Returns:
+            H x W x 4 premultiplied BGRA layer
+        """
+        return self.compose_column(self.column(cutoff))
+    
+    def compose_column(self, column):
+        """
+        Compose the line with done pixels left of a strip column.
+        
+        Fully inactive and fully done lines return the cached strips
+        themselves; partially filled lines reuse a single buffer.
+        
+        Args:
+            column: Column index in strip coordinates
+        
+        Returns:
+            H x W x 4 premultiplied BGRA layer (do not modify)
+        """
+        if column <= 0:
+            return self.inactive
+        if column >= self.width:
+            return self.done
+        
+        frame = self._frame
+        frame[:, :column] = self.done[:, :column]
+        frame[:, column:] = self.inactive[:, column:]
+        return frame
@@ -2,12 +2,34 @@
 Main module for generating karaoke videos.
 """
 
+import bisect
+import hashlib
+import inspect
+import json
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import cv2
-import numpy as np
 from .renderer import KaraokeRenderer
 from .karafun_renderer import KarafunRenderer
+from .asset_cache import AssetCache
+from .checkpoint import RenderCheckpoint
+from .compositor import unpremultiply
+from .frame_ring import FrameRing
+from .frame_store import FrameStoreWriter
+from .sinks import (
+    ALPHA_VIDEO_CODECS, ImageSequenceSink, ProgressSink, TeeSink, alpha_video_sink,
+    composited_video_sink, streaming_video_sink
+)
 from .text_layout import TextLayout
+from .timeline import Timeline
 from .timing import create_word_timings
+from .utils import (
+    CHECKPOINT_SEGMENT_SECONDS, DEFAULT_OVERLAY_OPACITY, FRAME_RING_SLOTS_PER_WORKER,
+    RENDITION_MAX_LINE_WIDTH, STREAM_SEGMENT_SECONDS, file_hash, gil_enabled
+)
 
 
 def generate_karaoke_video(
@@ -26,6 +48,10 @@ def generate_karaoke_video(
     """
     Generate a karaoke video from lyrics data.
     
+    Each lyric line is split into pages that fit the screen width, and every
+    frame shows the page being sung, so frame cost does not grow with the
+    length of the song.
+    
     Args:
         lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time'
                     Example: [
@@ -63,9 +89,11 @@ def generate_karaoke_video(
     active_color = active_color + (255,)
     inactive_color = inactive_color + (255,)
     
-    # Process all lyrics to create word timings
-    all_word_timings = []
-    all_word_sizes = []
+    # Process all lyrics into screen-width pages of words, so a frame only
+    # ever draws the words that fit on screen
+    pages = []
+    video_duration = None
+    max_page_width = width - font_size * 2
     
     for lyric in lyrics_data:
         text = lyric['text']
@@ -74,20 +102,36 @@ def generate_karaoke_video(
         
         # Create word timings
         word_timings = create_word_timings(text, start_time, end_time)
+        if not word_timings:
+            continue
         
         # Measure words
         words = [wt.text for wt in word_timings]
         word_sizes = text_layout.measure_words(words)
         
-        all_word_timings.extend(word_timings)
-        all_word_sizes.extend(word_sizes)
+        lyric_end = max(wt.end_time for wt in word_timings)
+        video_duration = lyric_end if video_duration is None else max(video_duration, lyric_end)
+        
+        for page_start, page_end in text_layout.paginate(word_sizes, max_page_width):
+            # Page word positions start at zero so the page is centered on screen
+            page_x = word_sizes[page_start]['widthRange'][0]
+            page_sizes = [
+                dict(w, widthRange=[w['widthRange'][0] - page_x, w['widthRange'][1] - page_x])
+                for w in word_sizes[page_start:page_end]
+            ]
+            pages.append({
+                'word_timings': word_timings[page_start:page_end],
+                'word_sizes': page_sizes,
+                'start_time': word_timings[page_start].start_time
+            })
     
     # Calculate video duration
-    if not all_word_timings:
+    if video_duration is None:
         raise ValueError("No lyrics data provided")
     
-    video_duration = max(wt.end_time for wt in all_word_timings)
     total_frames = int(video_duration * fps)
+    pages.sort(key=lambda page: page['start_time'])
+    page_starts = [page['start_time'] for page in pages]
     
     # Initialize video writer
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
@@ -97,10 +141,13 @@ def generate_karaoke_video(
     for frame_idx in range(total_frames):
         current_time = frame_idx / fps
         
+        # Show the last page that has started (the first one before singing)
+        page = pages[max(0, bisect.bisect_right(page_starts, current_time) - 1)] if pages else None
+        
         # Render frame
         frame = renderer.render_frame(
-            word_timings=all_word_timings,
-            word_sizes=all_word_sizes,
+            word_timings=page['word_timings'] if page else [],
+            word_sizes=page['word_sizes'] if page else [],
             text_layout=text_layout,
             current_time=current_time,
             active_color=active_color,
@@ -200,53 +247,21 @@ def generate_karaoke_video_with_lines(
     for frame_idx in range(total_frames):
         current_time = frame_idx / fps
         
-        # Create frame with background
-        frame = np.full((height, width, 3), bg_color, dtype=np.uint8)
-        
         # Find active and nearby lines
         active_lines = []
         for line_data in lines_data:
             if line_data['start_time'] <= current_time <= line_data['end_time'] + 1:
                 active_lines.append(line_data)
         
-        # Calculate Y positions for lines
-        if active_lines:
-            from PIL import Image as PILImage
-            
-            total_height = sum(max(w['height'] for w in line['word_sizes']) 
-                             for line in active_lines)
-            total_height += line_spacing * (len(active_lines) - 1)
-            
-            start_y = (height - total_height) / 2
-            current_y = start_y
-            
-            # Start with base background frame
-            frame = np.full((height, width, 3), bg_color, dtype=np.uint8)
-            
-            # Render each line
-            for idx, line_data in enumerate(active_lines):
-                line_height = max(w['height'] for w in line_data['word_sizes'])
-                
-                # Render line frame
-                line_frame = renderer.render_frame(
-                    word_timings=line_data['word_timings'],
-                    word_sizes=line_data['word_sizes'],
-                    text_layout=text_layout,
-                    current_time=current_time,
-                    active_color=active_color,
-                    inactive_color=inactive_color,
-                    y_position=current_y
-                )
-                
-                # For all lines, overlay non-background pixels
-                # Create a mask for non-background pixels
-                bg_array = np.array(bg_color, dtype=np.uint8)
-                mask = np.any(line_frame != bg_array, axis=2)
-                
-                # Copy non-background pixels to frame
-                frame[mask] = line_frame[mask]
-                
-                current_y += line_height + line_spacing
+        # Render all visible lines into one frame
+        frame = renderer.render_lines(
+            active_lines,
+            text_layout=text_layout,
+            current_time=current_time,
+            active_color=active_color,
+            inactive_color=inactive_color,
+            line_spacing=line_spacing
+        )
         
         # Write frame
         out.write(frame)
@@ -257,6 +272,359 @@ def generate_karaoke_video_with_lines(
     return output_path
 
 
+def _scene_timing(lines_data, title_duration, song_title):
+    """
+    Time a Karafun-style video from its timeline.
+    
+    Args:
+        lines_data: Timeline of the lyrics
+        title_duration: Duration of the title screen in seconds
+        song_title: Song title, without which there is no title screen
+    
+    Returns:
+        Tuple of (video_duration, time_offset) where time_offset is the
+        duration of the title screen shown before the lyrics
+    
+    Raises:
+        ValueError: If the timeline has no lines
+    """
+    # Calculate video duration
+    if not len(lines_data):
+        raise ValueError("No lyrics data provided")
+    
+    # Check if first lyric starts too early (before minimum title duration threshold)
+    # Skip title screen if first lyric starts before we can reasonably show title
+    from .utils import MIN_TITLE_THRESHOLD
+    first_lyric_start = lines_data.start_time
+    
+    # Determine if we should skip title screen
+    skip_title = (title_duration > 0 and song_title and 
+                  first_lyric_start < MIN_TITLE_THRESHOLD)
+    
+    # Add title screen duration if enabled and not skipped
+    time_offset = title_duration if (title_duration > 0 and song_title and not skip_title) else 0
+    return lines_data.end_time + time_offset, time_offset
+
+
+def _karafun_frames(lyrics_data, fps, title_duration, song_title, **job):
+    """
+    Count the frames of a Karafun-style video without setting up a renderer.
+    
+    Args:
+        lyrics_data: List of lyric dictionaries, or a Timeline
+        fps: Frames per second
+        title_duration: Duration of the title screen in seconds
+        song_title: Song title
+        **job: Other keyword arguments of _karafun_job, unused
+    
+    Returns:
+        Number of frames _karafun_job would render
+    """
+    # Only the line times are needed, no line is laid out
+    lines_data = lyrics_data if isinstance(lyrics_data, Timeline) else Timeline(lyrics_data, None)
+    video_duration, _ = _scene_timing(lines_data, title_duration, song_title)
+    return int(video_duration * fps)
+
+
+def _karafun_scene(lyrics_data, width, height, font_family, font_size, style,
+                   bg_color, show_header, title_duration, song_title, artist_name,
+                   bg_image, show_time, typewriter_speed, asset_cache_dir, threads,
+                   thread_safe=False, transparent=False, layout='landscape'):
+    """
+    Set up the rendering of a Karafun-style video at any time.
+    
+    Takes the rendering arguments of generate_karafun_video, except fps.
+    
+    Args:
+        thread_safe: Allow render_at() to be called from several threads at once
+        transparent: Render premultiplied BGRA frames without background
+        layout: Placement of the lyric lines, 'landscape' or 'portrait'
+    
+    Returns:
+        Tuple of (video_duration, render_at) where render_at(current_time,
+        out=None) renders the frame at a time in seconds, into out when
+        given; render_at.close() stops the renderer's stripe threads
+    """
+    # Initialize components
+    renderer = KarafunRenderer(
+        width=width,
+        height=height,
+        bg_color=bg_color + (255,),
+        bg_image=bg_image,
+        asset_cache=AssetCache(asset_cache_dir) if asset_cache_dir else None,
+        threads=threads,
+        transparent=transparent,
+        layout=layout
+    )
+    
+    text_layout = TextLayout(
+        font_family=font_family,
+        font_size=font_size,
+        style=style
+    )
+    
+    # Lines are laid out lazily as they become visible (a Timeline, such as
+    # one loaded from a song package, is used as is)
+    if isinstance(lyrics_data, Timeline):
+        lines_data = lyrics_data
+    else:
+        lines_data = Timeline(lyrics_data, text_layout)
+    
+    video_duration, time_offset = _scene_timing(lines_data, title_duration, song_title)
+    
+    local = threading.local()
+    
+    def render_at(current_time, out=None):
+        """Render the frame at a time, into out when given."""
+        frame_renderer = renderer
+        if thread_safe:
+            # Every thread renders with its own renderer sharing the caches
+            if not hasattr(local, 'renderer'):
+                local.renderer = renderer.thread_renderer()
+            frame_renderer = local.renderer
+        
+        # Adjust time for title screen offset
+        lyrics_time = current_time - time_offset if time_offset > 0 else current_time
+        
+        # Determine if we should show title screen
+        show_title = time_offset > 0 and current_time < time_offset
+        
+        # Calculate the effective time for rendering:
+        # - During title screen: use absolute current_time for typewriter animation
+        # - During lyrics: use adjusted lyrics_time (starts at 0 after title ends)
+        time_for_animation = current_time if show_title else lyrics_time
+        
+        # Render frame
+        frame = frame_renderer.render_frame(
+            lines_data=lines_data,
+            text_layout=text_layout,
+            current_time=time_for_animation,
+            show_header=show_header and not show_title,
+            show_title=show_title,
+            song_title=song_title,
+            artist_name=artist_name,
+            show_time=show_time and not show_title,
+            typewriter_speed=typewriter_speed,
+            video_duration=video_duration - time_offset,
+            out=out
+        )
+        return frame
+    
+    render_at.close = renderer.close
+    return video_duration, render_at
+
+
+def _karafun_job(fps, **scene):
+    """
+    Set up the rendering of a Karafun-style video frame by frame.
+    
+    Takes the rendering arguments of generate_karafun_video, so that render
+    workers can set up the same job from the same arguments.
+    
+    Args:
+        fps: Frames per second
+        **scene: Keyword arguments of _karafun_scene
+    
+    Returns:
+        Tuple of (total_frames, render) where render(frame_idx, out=None)
+        renders one frame, into out when given; render.close() stops the
+        renderer's stripe threads
+    """
+    video_duration, render_at = _karafun_scene(**scene)
+    
+    def render(frame_idx, out=None):
+        """Render one frame, into out when given."""
+        return render_at(frame_idx / fps, out)
+    
+    render.close = render_at.close
+    return int(video_duration * fps), render
+
+
+def _karafun_worker(ring, job, start, stop, worker_index, workers):
+    """
+    Render every workers-th frame of a range of frames into a frame ring.
+    
+    Args:
+        ring: FrameRing shared with the encoder
+        job: Keyword arguments of _karafun_job
+        start: First frame of the range
+        stop: Frame to stop before
+        worker_index: Offset from start of the first frame to render
+        workers: Number of render workers
+    """
+    _, render = _karafun_job(**job)
+    try:
+        for frame_idx in range(start + worker_index, stop, workers):
+            # Blocks until the encoder has written out the previous frame of the slot
+            render(frame_idx, out=ring.acquire(frame_idx))
+            ring.publish(frame_idx)
+    finally:
+        render.close()
+    ring.close()
+
+
+def _encode_from_workers(out, job, start, stop, workers):
+    """
+    Render a range of frames in worker processes and write them in order.
+    
+    Args:
+        out: cv2.VideoWriter to write the frames to
+        job: Keyword arguments of _karafun_job
+        start: First frame of the range
+        stop: Frame to stop before
+        workers: Number of render worker processes
+    
+    Raises:
+        RuntimeError: If a render worker fails
+    """
+    context = multiprocessing.get_context()
+    # Every worker owns the slots of its own frames, so slot reuse follows
+    # frame order
+    ring = FrameRing(job['width'], job['height'],
+                     slots=workers * FRAME_RING_SLOTS_PER_WORKER, context=context,
+                     channels=4 if job.get('transparent') else 3)
+    processes = [
+        context.Process(target=_karafun_worker, args=(ring, job, start, stop, i, workers),
+                        daemon=True)
+        for i in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        
+        for frame_idx in range(start, stop):
+            frame = ring.wait(frame_idx, timeout=1.0)
+            while frame is None:
+                failed = [p.exitcode for p in processes if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(f"Render worker failed with exit code {failed[0]}")
+                frame = ring.wait(frame_idx, timeout=1.0)
+            
+            # Encode straight from shared memory, then hand the slot back
+            out.write(frame)
+            del frame
+            ring.release(frame_idx)
+        
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        ring.close()
+        ring.unlink()
+
+
+def _encode_from_threads(out, render, start, stop, frame_threads):
+    """
+    Render a range of frames on a thread pool and write them in order.
+    
+    Args:
+        out: cv2.VideoWriter to write the frames to
+        render: Thread-safe render function from _karafun_job
+        start: First frame of the range
+        stop: Frame to stop before
+        frame_threads: Number of render threads
+    """
+    # Frames submitted ahead of the writer are bounded like the frame ring
+    max_pending = frame_threads * FRAME_RING_SLOTS_PER_WORKER
+    with ThreadPoolExecutor(max_workers=frame_threads) as executor:
+        pending = deque()
+        for frame_idx in range(start, stop):
+            pending.append(executor.submit(render, frame_idx))
+            if len(pending) >= max_pending:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+
+
+def _write_frames(out, job, render, start, stop, workers=1, frame_threads=1):
+    """
+    Render a range of frames of a job and write them in order.
+    
+    Args:
+        out: cv2.VideoWriter (or sink) to write the frames to
+        job: Keyword arguments of _karafun_job
+        render: Render function from _karafun_job, unused (None) with workers
+        start: First frame of the range
+        stop: Frame to stop before
+        workers: Number of render worker processes
+        frame_threads: Number of render threads, render must be thread-safe
+    """
+    if workers > 1:
+        # Render in worker processes, frames are passed through shared memory
+        _encode_from_workers(out, job, start, stop, workers)
+    elif frame_threads > 1:
+        # Render whole frames concurrently on a free-threaded build
+        _encode_from_threads(out, render, start, stop, frame_threads)
+    else:
+        # Generate frames
+        for frame_idx in range(start, stop):
+            out.write(render(frame_idx))
+
+
+def _checkpoint_key(job):
+    """
+    Hash the settings of a job that determine its frames.
+    
+    Args:
+        job: Keyword arguments of _karafun_job
+    
+    Returns:
+        Hex digest string
+    """
+    settings = dict(job)
+    lyrics_data = settings.pop('lyrics_data')
+    if isinstance(lyrics_data, Timeline):
+        settings['lyrics'] = list(zip(lyrics_data.starts, lyrics_data.ends, lyrics_data.texts))
+    else:
+        settings['lyrics'] = [(l['start_time'], l['end_time'], l['text']) for l in lyrics_data]
+    
+    # Threads and the asset cache change how frames are made, not the frames
+    settings.pop('threads', None)
+    settings.pop('asset_cache_dir', None)
+    if settings['bg_image'] and Path(settings['bg_image']).exists():
+        settings['bg_image_hash'] = file_hash(settings['bg_image'])
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _mux_audio(output_path, audio_path, audio_offset):
+    """
+    Add an audio track to a finished video, in place.
+    
+    The video is kept without audio (and a warning printed) if ffmpeg
+    cannot add the track.
+    
+    Args:
+        output_path: Path to the video file
+        audio_path: Path to audio file to add
+        audio_offset: Offset in seconds to delay/advance audio
+    """
+    from .utils import add_audio_to_video
+    import os
+    import tempfile
+    
+    # Create unique temporary path for video without audio
+    output_file = Path(output_path)
+    with tempfile.NamedTemporaryFile(suffix=output_file.suffix, delete=False, dir=output_file.parent) as tmp:
+        temp_video = tmp.name
+    
+    # Rename current video to temp
+    os.rename(output_path, temp_video)
+    
+    try:
+        # Merge audio with video
+        add_audio_to_video(str(temp_video), audio_path, output_path, audio_offset)
+        # Remove temporary file
+        os.remove(temp_video)
+    except (RuntimeError, FileNotFoundError, ValueError) as e:
+        # Restore original video if audio merge fails
+        if os.path.exists(temp_video):
+            os.rename(temp_video, output_path)
+        print(f"Warning: Could not add audio: {e}")
+
+
 def generate_karafun_video(
     lyrics_data,
     output_path='karafun_output.mp4',
@@ -275,7 +643,19 @@ def generate_karafun_video(
     show_time=False,
     typewriter_speed=0.05,
     audio_path=None,
-    audio_offset=0.0
+    audio_offset=0.0,
+    asset_cache_dir=None,
+    workers=1,
+    threads=1,
+    frame_threads=1,
+    compositing='python',
+    frame_store_dir=None,
+    checkpoint_dir=None,
+    resume=False,
+    segment_seconds=CHECKPOINT_SEGMENT_SECONDS,
+    progress_callback=None,
+    streaming=False,
+    stream_segment_seconds=STREAM_SEGMENT_SECONDS
 ):
     """
     Generate a Karafun-style karaoke video with two-line display.
@@ -293,7 +673,8 @@ def generate_karafun_video(
     - Optional audio track
     
     Args:
-        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time'
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                    or a Timeline (e.g. from SongPackage.timeline())
         output_path: Path to output MP4 file
         width: Video width in pixels
         height: Video height in pixels
@@ -311,124 +692,474 @@ def generate_karafun_video(
         typewriter_speed: Speed of typewriter animation (seconds per character)
         audio_path: Path to audio file to add to video (optional)
         audio_offset: Offset in seconds to delay/advance audio (default: 0.0)
+        asset_cache_dir: Directory of the on-disk cache of preprocessed
+                         backgrounds, shared between runs (optional)
+        workers: Number of render worker processes (1 renders in this process)
+        threads: Number of threads sharing the full-frame passes of each frame
+                 (worth it for 4K and above)
+        frame_threads: Number of threads rendering whole frames concurrently.
+                       Used on free-threaded builds only, frames are rendered
+                       in this thread when the GIL is enabled
+        compositing: 'python' to blend every frame over the background here,
+                     or 'ffmpeg' to render only the lyric layer and let an
+                     ffmpeg filter graph blend it over the background while
+                     encoding (requires ffmpeg, writes H.264)
+        frame_store_dir: Directory to also spool the encoded frames to as a
+                         frame store, to encode them again later without
+                         rendering (optional, python compositing only)
+        checkpoint_dir: Directory to render into as checkpointed segments,
+                        so that an interrupted render can be resumed; it is
+                        emptied once the video is written (optional)
+        resume: Keep the segments already rendered into checkpoint_dir by an
+                interrupted run of the same render
+        segment_seconds: Length of a checkpointed segment in seconds
+        progress_callback: Called as progress_callback(frames_rendered,
+                           total_frames) after every rendered frame, from
+                           the thread calling this function; an exception
+                           it raises stops the render (optional)
+        streaming: Encode with ffmpeg into output that can be played while
+                   the rest renders: an HLS playlist of fragmented MP4
+                   segments for a .m3u8 output_path, a fragmented MP4 file
+                   otherwise (requires ffmpeg, writes H.264). The audio
+                   track is muxed while encoding: a missing audio file
+                   raises FileNotFoundError before rendering, and one
+                   ffmpeg cannot read fails the render with RuntimeError
+                   instead of leaving a video without audio. Not
+                   available with checkpoint_dir
+        stream_segment_seconds: Length of a streamed segment in seconds
     
     Returns:
         Path to the generated video file
+    
+    Raises:
+        ValueError: If no lyrics are given, compositing is unknown or is
+                    'ffmpeg' with a frame_store_dir, streaming is combined
+                    with checkpoint_dir, or resuming a checkpoint of a
+                    different render
+        FileNotFoundError: If streaming with an audio file that doesn't exist
+        RuntimeError: If compositing is 'ffmpeg' or streaming and ffmpeg is
+                      not available, or a streaming ffmpeg fails
     """
-    # Initialize components
-    renderer = KarafunRenderer(
-        width=width,
-        height=height,
-        bg_color=bg_color + (255,),
-        bg_image=bg_image
-    )
+    if compositing not in ('python', 'ffmpeg'):
+        raise ValueError(f"Unknown compositing: {compositing}. Use 'python' or 'ffmpeg'")
+    if frame_store_dir and compositing == 'ffmpeg':
+        # The store would hold the lyric layer without its background
+        raise ValueError("frame_store_dir needs compositing='python'")
+    if streaming and checkpoint_dir:
+        # Segments are encoded once all are rendered, nothing would stream
+        raise ValueError("streaming cannot be combined with checkpoint_dir")
     
-    text_layout = TextLayout(
-        font_family=font_family,
-        font_size=font_size,
-        style=style
-    )
+    job = {
+        'lyrics_data': lyrics_data,
+        'width': width,
+        'height': height,
+        'fps': fps,
+        'font_family': font_family,
+        'font_size': font_size,
+        'style': style,
+        'bg_color': bg_color,
+        'show_header': show_header,
+        'title_duration': title_duration,
+        'song_title': song_title,
+        'artist_name': artist_name,
+        'bg_image': bg_image,
+        'show_time': show_time,
+        'typewriter_speed': typewriter_speed,
+        'asset_cache_dir': asset_cache_dir,
+        'threads': threads,
+        # With ffmpeg compositing only the lyric layer is rendered here
+        'transparent': compositing == 'ffmpeg'
+    }
     
-    # Process lyrics line by line
-    lines_data = []
-    for lyric in lyrics_data:
-        text = lyric['text']
-        start_time = lyric['start_time']
-        end_time = lyric['end_time']
+    # Frame threads only pay off when the GIL does not serialize them
+    frame_threads = frame_threads if frame_threads > 1 and not gil_enabled() else 1
+    if workers > 1:
+        # Worker processes set up their own renderers, this one only counts frames
+        total_frames, render = _karafun_frames(**job), None
+    else:
+        total_frames, render = _karafun_job(**job, thread_safe=frame_threads > 1)
+    try:
+        channels = 4 if job['transparent'] else 3
         
-        word_timings = create_word_timings(text, start_time, end_time)
-        words = [wt.text for wt in word_timings]
-        word_sizes = text_layout.measure_words(words)
+        checkpoint = None
+        if checkpoint_dir:
+            # Render into segments recorded in a manifest as they finish; the
+            # video is encoded from the segments once all are rendered
+            checkpoint = RenderCheckpoint(checkpoint_dir, _checkpoint_key(job), total_frames,
+                                          int(round(segment_seconds * fps)), resume=resume)
+            pending = checkpoint.pending()
+            frames_done = total_frames - sum(stop - start for _, start, stop in pending)
+            for index, start, stop in pending:
+                segment = checkpoint.writer(index, width, height, fps, channels=channels)
+                if progress_callback is not None:
+                    segment = ProgressSink(segment, progress_callback, total_frames, frames_done)
+                _write_frames(segment, job, render, start, stop, workers, frame_threads)
+                segment.release()
+                checkpoint.complete(index)
+                frames_done += stop - start
         
-        lines_data.append({
-            'word_timings': word_timings,
-            'word_sizes': word_sizes,
-            'start_time': start_time,
-            'end_time': end_time,
-            'text': text
-        })
+        # Initialize video writer
+        if streaming:
+            # Players can start on the first segments while the rest renders
+            out = streaming_video_sink(
+                output_path, width, height, fps, segment_seconds=stream_segment_seconds,
+                audio_path=audio_path, audio_offset=audio_offset, composite=job['transparent'],
+                bg_color=bg_color, bg_image=bg_image if bg_image and Path(bg_image).exists() else None,
+                overlay_opacity=DEFAULT_OVERLAY_OPACITY
+            )
+        elif compositing == 'ffmpeg':
+            out = composited_video_sink(
+                output_path, width, height, fps, bg_color=bg_color,
+                bg_image=bg_image if bg_image and Path(bg_image).exists() else None,
+                overlay_opacity=DEFAULT_OVERLAY_OPACITY
+            )
+        else:
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        
+        if frame_store_dir:
+            # Frames go to the store exactly as the encoder receives them
+            out = TeeSink(out, FrameStoreWriter(frame_store_dir, width, height, fps, channels=channels))
+        
+        try:
+            if checkpoint is not None:
+                checkpoint.encode(out)
+            else:
+                if progress_callback is not None:
+                    out = ProgressSink(out, progress_callback, total_frames)
+                _write_frames(out, job, render, 0, total_frames, workers, frame_threads)
+        except BaseException:
+            # A stopped render leaves no encoder running
+            out.release()
+            raise
+        
+        # Release video writer
+        out.release()
+    finally:
+        # The renderer's stripe threads stop with the render
+        if render is not None:
+            render.close()
     
-    # Calculate video duration
-    if not lines_data:
+    if checkpoint is not None:
+        checkpoint.remove()
+    
+    # Add audio if provided (a stream has it already)
+    if audio_path and not streaming:
+        _mux_audio(output_path, audio_path, audio_offset)
+    
+    return output_path
+
+
+def _config_settings(config):
+    """
+    Complete a config with the defaults of generate_karafun_video.
+    
+    Args:
+        config: Dictionary of generate_karafun_video keyword arguments,
+                including lyrics_data, and optionally a layout
+    
+    Returns:
+        Dictionary of every generate_karafun_video keyword argument
+    
+    Raises:
+        TypeError: If config holds an unknown setting
+        ValueError: If no lyrics are given
+    """
+    settings = {
+        name: parameter.default
+        for name, parameter in inspect.signature(generate_karafun_video).parameters.items()
+    }
+    unknown = set(config) - set(settings) - {'layout'}
+    if unknown:
+        raise TypeError(f"Unknown settings: {', '.join(sorted(unknown))}")
+    if config.get('lyrics_data') is None:
         raise ValueError("No lyrics data provided")
+    settings.update(config)
+    return settings
+
+
+def _scene_from_config(config):
+    """
+    Set up the rendering of a Karafun-style video at any time from a config.
     
-    # Check if first lyric starts too early (before minimum title duration threshold)
-    # Skip title screen if first lyric starts before we can reasonably show title
-    from .utils import MIN_TITLE_THRESHOLD
-    first_lyric_start = lines_data[0]['start_time']
+    Args:
+        config: Dictionary of generate_karafun_video keyword arguments,
+                including lyrics_data, and optionally a layout
     
-    # Determine if we should skip title screen
-    skip_title = (title_duration > 0 and song_title and 
-                  first_lyric_start < MIN_TITLE_THRESHOLD)
+    Returns:
+        Tuple of (video_duration, render_at), see _karafun_scene
     
-    # Add title screen duration if enabled and not skipped
-    time_offset = title_duration if (title_duration > 0 and song_title and not skip_title) else 0
-    video_duration = max(line['end_time'] for line in lines_data) + time_offset
-    total_frames = int(video_duration * fps)
+    Raises:
+        TypeError: If config holds an unknown setting
+        ValueError: If no lyrics are given
+    """
+    settings = _config_settings(config)
     
-    # Initialize video writer
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    # Settings that do not change the picture (output, audio, workers) are dropped
+    scene = inspect.signature(_karafun_scene).parameters
+    return _karafun_scene(**{name: value for name, value in settings.items() if name in scene})
+
+
+def render_frame_at(config, t):
+    """
+    Render frames of a Karafun-style video at any time, without rendering the video.
     
-    # Generate frames
-    for frame_idx in range(total_frames):
-        current_time = frame_idx / fps
-        
-        # Adjust time for title screen offset
-        lyrics_time = current_time - time_offset if time_offset > 0 else current_time
-        
-        # Determine if we should show title screen
-        show_title = time_offset > 0 and current_time < time_offset
-        
-        # Calculate the effective time for rendering:
-        # - During title screen: use absolute current_time for typewriter animation
-        # - During lyrics: use adjusted lyrics_time (starts at 0 after title ends)
-        time_for_animation = current_time if show_title else lyrics_time
-        
-        # Render frame
-        frame = renderer.render_frame(
-            lines_data=lines_data,
-            text_layout=text_layout,
-            current_time=time_for_animation,
-            show_header=show_header and not show_title,
-            show_title=show_title,
-            song_title=song_title,
-            artist_name=artist_name,
-            show_time=show_time and not show_title,
-            typewriter_speed=typewriter_speed,
-            video_duration=video_duration - time_offset
-        )
-        
-        # Write frame
-        out.write(frame)
+    Frames do not depend on the frames before them, so the frame at a time is
+    the frame generate_karafun_video writes at that time, title screen and
+    time display included. The timeline is built once per call: pass all
+    the times needed at once.
     
-    # Release video writer
-    out.release()
+    Args:
+        config: Dictionary of generate_karafun_video keyword arguments,
+                including lyrics_data; settings that do not change the
+                picture, such as output_path or audio_path, are ignored
+        t: Time in seconds from the start of the video, or a list of times
     
-    # Add audio if provided
-    if audio_path:
-        from .utils import add_audio_to_video
-        import os
-        import tempfile
-        from pathlib import Path
-        
-        # Create unique temporary path for video without audio
-        output_file = Path(output_path)
-        with tempfile.NamedTemporaryFile(suffix=output_file.suffix, delete=False, dir=output_file.parent) as tmp:
-            temp_video = tmp.name
-        
-        # Rename current video to temp
-        os.rename(output_path, temp_video)
+    Returns:
+        H x W x 3 BGR array, or a list of them when t is a list
+    
+    Raises:
+        TypeError: If config holds an unknown setting
+        ValueError: If no lyrics are given
+    """
+    _, render_at = _scene_from_config(config)
+    try:
+        if isinstance(t, (list, tuple)):
+            return [render_at(time).copy() for time in t]
+        return render_at(t).copy()
+    finally:
+        render_at.close()
+
+
+def _rendition_font_size(rendition, reference, font_size, text_layout, texts):
+    """
+    Get the font size of a rendition.
+    
+    Args:
+        rendition: Rendition dictionary
+        reference: First rendition, which font_size applies to
+        font_size: Font size of the reference rendition
+        text_layout: TextLayout at font_size, to measure the lines
+        texts: Text of every lyric line
+    
+    Returns:
+        Font size in pixels
+    """
+    if 'font_size' in rendition:
+        return rendition['font_size']
+    
+    # Text keeps its size relative to the short side of the frame
+    size = font_size * min(rendition['width'], rendition['height']) / min(reference['width'], reference['height'])
+    if rendition['layout'] == 'portrait' and texts:
+        # Narrow frames shrink the text until the widest line fits
+        widest = max(text_layout.measure_text(text)[0] for text in texts)
+        if widest > 0:
+            size = min(size, font_size * RENDITION_MAX_LINE_WIDTH * rendition['width'] / widest)
+    return max(1, int(size))
+
+
+def generate_karafun_renditions(
+    lyrics_data,
+    renditions,
+    fps=30,
+    font_family='Arial',
+    font_size=48,
+    style='bold',
+    bg_color=(0, 0, 0),
+    show_header=True,
+    title_duration=3.0,
+    song_title=None,
+    artist_name=None,
+    bg_image=None,
+    show_time=False,
+    typewriter_speed=0.05,
+    audio_path=None,
+    audio_offset=0.0,
+    asset_cache_dir=None,
+    threads=1
+):
+    """
+    Generate several Karafun-style videos of one song in a single pass.
+    
+    The lyrics are parsed into one timeline, which every rendition lays out
+    with its own font size. Each frame is rendered for every rendition in
+    turn, and each rendition has its own encoder thread, so the encoders
+    run concurrently with each other and with rendering.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                    or a Timeline (e.g. from SongPackage.timeline())
+        renditions: List of rendition dictionaries with 'output_path', 'width'
+                    and 'height', and optionally:
+                    - 'font_size': Font size in pixels. By default font_size
+                      applies to the first rendition and is scaled with the
+                      short side of the others; portrait renditions also
+                      shrink it until the widest line fits
+                    - 'layout': 'landscape' or 'portrait' (default: portrait
+                      when the frame is taller than wide)
+        fps: Frames per second
+        font_family: Font family name or TTF file path
+        font_size: Font size in pixels of the first rendition
+        style: Text style string (default: 'bold')
+        bg_color: RGB color tuple for background
+        show_header: Whether to show header with site name and status
+        title_duration: Duration of title screen in seconds (0 to disable)
+        song_title: Song title for title screen
+        artist_name: Artist name for title screen
+        bg_image: Path to background image file (optional)
+        show_time: Whether to show time remaining display
+        typewriter_speed: Speed of typewriter animation (seconds per character)
+        audio_path: Path to audio file to add to every video (optional)
+        audio_offset: Offset in seconds to delay/advance audio (default: 0.0)
+        asset_cache_dir: Directory of the on-disk cache of preprocessed
+                         backgrounds, shared between runs (optional)
+        threads: Number of threads sharing the full-frame passes of each frame
+    
+    Returns:
+        List of paths to the generated video files, in rendition order
+    
+    Raises:
+        ValueError: If no renditions or lyrics are given, or a rendition is invalid
+    """
+    if not renditions:
+        raise ValueError("No renditions provided")
+    renditions = [dict(rendition) for rendition in renditions]
+    for rendition in renditions:
+        missing = [key for key in ('output_path', 'width', 'height') if key not in rendition]
+        if missing:
+            raise ValueError(f"Rendition is missing {', '.join(missing)}: {rendition}")
+        rendition.setdefault('layout', 'portrait' if rendition['height'] > rendition['width'] else 'landscape')
+    
+    # Lines are parsed and sorted once for every rendition
+    text_layout = TextLayout(font_family=font_family, font_size=font_size, style=style)
+    if isinstance(lyrics_data, Timeline):
+        timeline = lyrics_data
+    else:
+        timeline = Timeline(lyrics_data, text_layout)
+    
+    jobs = []
+    encoders = []
+    try:
+        for rendition in renditions:
+            size = _rendition_font_size(rendition, renditions[0], font_size, text_layout, timeline.texts)
+            total_frames, render = _karafun_job(
+                lyrics_data=timeline.relayout(TextLayout(font_family=font_family, font_size=size, style=style)),
+                width=rendition['width'], height=rendition['height'], fps=fps,
+                font_family=font_family, font_size=size, style=style, bg_color=bg_color,
+                show_header=show_header, title_duration=title_duration, song_title=song_title,
+                artist_name=artist_name, bg_image=bg_image, show_time=show_time,
+                typewriter_speed=typewriter_speed, asset_cache_dir=asset_cache_dir,
+                threads=threads, layout=rendition['layout']
+            )
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            out = cv2.VideoWriter(rendition['output_path'], fourcc, fps,
+                                  (rendition['width'], rendition['height']))
+            jobs.append((render, out))
         
-        try:
-            # Merge audio with video
-            add_audio_to_video(str(temp_video), audio_path, output_path, audio_offset)
-            # Remove temporary file
-            os.remove(temp_video)
-        except (RuntimeError, FileNotFoundError, ValueError) as e:
-            # Restore original video if audio merge fails
-            if os.path.exists(temp_video):
-                os.rename(temp_video, output_path)
-            print(f"Warning: Could not add audio: {e}")
+        # One encoder thread per rendition writes its frames in order, at most
+        # a few frames behind rendering
+        encoders = [ThreadPoolExecutor(max_workers=1) for _ in jobs]
+        pending = [deque() for _ in jobs]
+        for frame_idx in range(total_frames):
+            for (render, out), encoder, queue in zip(jobs, encoders, pending):
+                queue.append(encoder.submit(out.write, render(frame_idx)))
+                if len(queue) >= FRAME_RING_SLOTS_PER_WORKER:
+                    queue.popleft().result()
+        for queue in pending:
+            while queue:
+                queue.popleft().result()
+    finally:
+        # Writers are released after their encoder threads stopped, also
+        # when a render failed
+        for encoder in encoders:
+            encoder.shutdown()
+        for render, out in jobs:
+            render.close()
+            out.release()
+    
+    # Audio is only added to videos that were written completely
+    output_paths = []
+    for rendition in renditions:
+        if audio_path:
+            _mux_audio(rendition['output_path'], audio_path, audio_offset)
+        output_paths.append(rendition['output_path'])
+    return output_paths
+
+
+def generate_karafun_overlay(
+    lyrics_data,
+    output_path='karafun_overlay',
+    width=1280,
+    height=720,
+    fps=30,
+    font_family='Arial',
+    font_size=48,
+    style='bold',
+    show_header=True,
+    title_duration=3.0,
+    song_title=None,
+    artist_name=None,
+    show_time=False,
+    typewriter_speed=0.05,
+    image_format='png',
+    threads=1
+):
+    """
+    Generate the lyrics of a Karafun-style video as a transparent overlay.
+    
+    Only the text, header, time and title layers are rendered, with a real
+    alpha channel, so the overlay can be composited over any background in
+    an editor. Timing is the same as generate_karafun_video with the same
+    arguments.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                    or a Timeline (e.g. from SongPackage.timeline())
+        output_path: Directory for an image sequence, or a .mov (ProRes 4444)
+                     or .webm (VP9) alpha video path (requires ffmpeg)
+        width: Video width in pixels
+        height: Video height in pixels
+        fps: Frames per second
+        font_family: Font family name or TTF file path
+        font_size: Font size in pixels
+        style: Text style string (default: 'bold')
+        show_header: Whether to show header with site name and status
+        title_duration: Duration of title screen in seconds (0 to disable)
+        song_title: Song title for title screen
+        artist_name: Artist name for title screen
+        show_time: Whether to show time remaining display
+        typewriter_speed: Speed of typewriter animation (seconds per character)
+        image_format: Image sequence format, 'png' or 'webp'
+        threads: Number of threads sharing the full-frame passes of each frame
+    
+    Returns:
+        Path to the image sequence directory or alpha video
+    
+    Raises:
+        ValueError: If no lyrics are given
+        RuntimeError: If an alpha video is requested and ffmpeg is not available
+    """
+    total_frames, render = _karafun_job(
+        fps, lyrics_data=lyrics_data, width=width, height=height, font_family=font_family,
+        font_size=font_size, style=style, bg_color=(0, 0, 0), show_header=show_header, title_duration=title_duration,
+        song_title=song_title, artist_name=artist_name, bg_image=None,
+        show_time=show_time, typewriter_speed=typewriter_speed,
+        asset_cache_dir=None, threads=threads, transparent=True
+    )
+    
+    if Path(output_path).suffix.lower() in ALPHA_VIDEO_CODECS:
+        sink = alpha_video_sink(output_path, width, height, fps)
+    else:
+        sink = ImageSequenceSink(output_path, image_format)
+    
+    frame = None
+    try:
+        for frame_idx in range(total_frames):
+            frame = render(frame_idx, out=frame)
+            # Image formats and encoders expect straight alpha
+            sink.write(unpremultiply(frame))
+    finally:
+        render.close()
+    sink.release()
     
     return output_path
@@ -0,0 +1,229 @@
+"""
+Package module for precompiled song packages.
+
+A song package is a single .npz file holding the timeline of a song as flat
+arrays (line and word times, word texts and measured widths) next to a JSON
+header with the resolved render settings and a hash of the font file the
+widths were measured with. Loading a package needs no word splitting and no
+text measurement.
+"""
+
+import json
+from pathlib import Path
+import numpy as np
+from .text_layout import TextLayout
+from .timeline import Timeline
+from .timing import WordTiming
+from .utils import file_hash
+
+PACKAGE_VERSION = 1
+
+
+def font_hash(font):
+    """
+    Hash the file a font was loaded from.
+    
+    Args:
+        font: PIL Font object
+    
+    Returns:
+        SHA-256 hex digest, or None for fonts without a file
+    """
+    path = getattr(font, 'path', None)
+    if not path:
+        return None
+    return file_hash(path)
+
+
+def _text_layout(settings):
+    """Create the text layout described by render settings."""
+    return TextLayout(
+        font_family=settings.get('font_family', 'Arial'),
+        font_size=settings.get('font_size', 48),
+        style=settings.get('style', 'bold')
+    )
+
+
+def compile_song(lyrics_data, settings, path, renditions=None):
+    """
+    Lay out a song once and write it as a song package.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time'
+        settings: Resolved generate_karafun_video keyword arguments (JSON
+                  serializable, without lyrics_data)
+        path: Output .npz path
+        renditions: Renditions to render instead of settings' output_path,
+                    see generate_karafun_renditions (optional)
+    
+    Returns:
+        Path to the written package
+    """
+    text_layout = _text_layout(settings)
+    timeline = Timeline(lyrics_data, text_layout)
+    
+    word_offsets = [0]
+    words = {'text': [], 'start': [], 'end': [], 'width': [], 'height': [], 'x': []}
+    for index in range(len(timeline)):
+        line = timeline._layout(index)
+        for timing, word_info in zip(line['word_timings'], line['word_sizes']):
+            words['text'].append(timing.text)
+            words['start'].append(timing.start_time)
+            words['end'].append(timing.end_time)
+            words['width'].append(word_info['width'])
+            words['height'].append(word_info['height'])
+            words['x'].append(word_info['widthRange'][0])
+        word_offsets.append(len(words['text']))
+    
+    header = {
+        'version': PACKAGE_VERSION,
+        'settings': settings,
+        'renditions': renditions,
+        'font': {
+            'path': getattr(text_layout.font, 'path', None),
+            'sha256': font_hash(text_layout.font)
+        }
+    }
+    
+    np.savez(
+        path,
+        header=np.array(json.dumps(header)),
+        line_start=np.array(timeline.starts, dtype=np.float64),
+        line_end=np.array(timeline.ends, dtype=np.float64),
+        line_text=np.array(timeline.texts, dtype=str),
+        word_offset=np.array(word_offsets, dtype=np.int64),
+        word_text=np.array(words['text'], dtype=str),
+        word_start=np.array(words['start'], dtype=np.float64),
+        word_end=np.array(words['end'], dtype=np.float64),
+        word_width=np.array(words['width'], dtype=np.float64),
+        word_height=np.array(words['height'], dtype=np.float64),
+        word_x=np.array(words['x'], dtype=np.float64)
+    )
+    return str(path)
+
+
+class SongPackage:
+    """A loaded song package."""
+    
+    def __init__(self, header, arrays):
+        """
+        Initialize song package.
+        
+        Args:
+            header: Decoded JSON header
+            arrays: Dictionary of timeline arrays
+        """
+        self.header = header
+        self.arrays = arrays
+        
+        settings = dict(header['settings'])
+        if settings.get('bg_color') is not None:
+            settings['bg_color'] = tuple(settings['bg_color'])
+        self.settings = settings
+        self.renditions = header.get('renditions')
+    
+    @classmethod
+    def load(cls, path, verify_font=True):
+        """
+        Load a song package.
+        
+        Args:
+            path: Path to the .npz package
+            verify_font: Check that the font file still matches the measured widths
+        
+        Returns:
+            SongPackage object
+        
+        Raises:
+            FileNotFoundError: If the package does not exist
+            ValueError: If the package is from another version or its font changed
+        """
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Song package not found: {path}")
+        
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        header = json.loads(str(arrays.pop('header')))
+        
+        if header.get('version') != PACKAGE_VERSION:
+            raise ValueError(f"Unsupported song package version: {header.get('version')}")
+        
+        package = cls(header, arrays)
+        if verify_font:
+            expected = header['font']['sha256']
+            if font_hash(_text_layout(package.settings).font) != expected:
+                raise ValueError(f"Font changed since {path} was compiled, compile it again")
+        return package
+    
+    def timeline(self, max_lines=8):
+        """
+        Get the song timeline, built from the stored layout.
+        
+        Args:
+            max_lines: Maximum number of laid-out lines kept in memory
+        
+        Returns:
+            PackagedTimeline object
+        """
+        return PackagedTimeline(self, max_lines=max_lines)
+
+
+class PackagedTimeline(Timeline):
+    """Timeline whose lines come from a song package instead of text layout."""
+    
+    def __init__(self, package, max_lines=8):
+        """
+        Initialize packaged timeline.
+        
+        Args:
+            package: SongPackage object
+            max_lines: Maximum number of laid-out lines kept in memory
+        """
+        arrays = package.arrays
+        lyrics_data = [
+            {'text': str(text), 'start_time': float(start), 'end_time': float(end)}
+            for text, start, end in zip(arrays['line_text'], arrays['line_start'], arrays['line_end'])
+        ]
+        super().__init__(lyrics_data, None, max_lines=max_lines)
+        self.arrays = arrays
+        self.settings = package.settings
+        # Package line of every line, None for edited lines, which are laid
+        # out again with the package's font
+        self.sources = list(range(len(self.starts)))
+    
+    def _line_moved(self, index, new_index):
+        del self.sources[index]
+        self.sources.insert(new_index, None)
+    
+    def _layout(self, index):
+        """Rebuild a line from the package arrays."""
+        source = self.sources[index]
+        if source is None:
+            if self.text_layout is None:
+                self.text_layout = _text_layout(self.settings)
+            return super()._layout(index)
+        
+        arrays = self.arrays
+        first, last = arrays['word_offset'][source:source + 2]
+        
+        word_timings = []
+        word_sizes = []
+        for i in range(first, last):
+            text = str(arrays['word_text'][i])
+            width = float(arrays['word_width'][i])
+            x = float(arrays['word_x'][i])
+            word_timings.append(WordTiming(text, float(arrays['word_start'][i]), float(arrays['word_end'][i])))
+            word_sizes.append({
+                'text': text,
+                'width': width,
+                'height': float(arrays['word_height'][i]),
+                'widthRange': [x, x + width]
+            })
+        
+        return {
+            'word_timings': word_timings,
+            'word_sizes': word_sizes,
+            'start_time': self.starts[index],
+            'end_time': self.ends[index],
+            'text': self.texts[index]
+        }
@@ -0,0 +1,263 @@
+"""
+Preview server module for editing lyric timings interactively.
+
+A preview session keeps a warm renderer (background, sprites and line
+strips already loaded) and an editable in-memory timeline of one song.
+Frames are rendered at any time on request, and editing a line lays out
+only that line again, so a timing editor can scrub through the song and
+see every change immediately.
+
+The server listens on localhost and answers:
+- GET /: A minimal scrubbing page
+- GET /frame?t=SECONDS[&format=jpeg|png]: The frame at a time
+- GET /lines: The lines and video duration as JSON
+- POST /lines/INDEX: Edit a line from a JSON body with any of 'text',
+  'start_time' and 'end_time'; answers the line's new index as JSON
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+import cv2
+from .main import _config_settings, _scene_from_config
+from .text_layout import TextLayout
+from .timeline import Timeline
+
+PREVIEW_JPEG_QUALITY = 85  # JPEG quality of preview frames
+PREVIEW_PNG_COMPRESSION = 1  # PNG compression level of preview frames, fast over small
+IMAGE_FORMATS = {
+    'jpeg': ('.jpg', 'image/jpeg', [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY]),
+    'png': ('.png', 'image/png', [cv2.IMWRITE_PNG_COMPRESSION, PREVIEW_PNG_COMPRESSION])
+}
+
+PREVIEW_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Karaoke preview</title></head>
+<body style="background:#222;color:#eee;font-family:sans-serif">
+<img id="frame" style="max-width:100%"><br>
+<input id="time" type="range" min="0" step="0.01" value="0" style="width:100%">
+<span id="label">0.00 s</span>
+<script>
+const time = document.getElementById('time');
+const show = () => {
+  document.getElementById('label').textContent = Number(time.value).toFixed(2) + ' s';
+  document.getElementById('frame').src = '/frame?t=' + time.value;
+};
+fetch('/lines').then(r => r.json()).then(info => { time.max = info.duration; show(); });
+time.addEventListener('input', show);
+</script>
+</body>
+</html>
+"""
+
+
+class PreviewSession:
+    """Warm renderer and editable timeline of one song."""
+    
+    def __init__(self, config):
+        """
+        Initialize preview session.
+        
+        Args:
+            config: Dictionary of generate_karafun_video keyword arguments,
+                    including lyrics_data (see render_frame_at)
+        
+        Raises:
+            TypeError: If config holds an unknown setting
+            ValueError: If no lyrics are given
+        """
+        self.settings = _config_settings(config)
+        lyrics_data = self.settings['lyrics_data']
+        if isinstance(lyrics_data, Timeline):
+            self.timeline = lyrics_data
+        else:
+            self.timeline = Timeline(lyrics_data, TextLayout(
+                font_family=self.settings['font_family'],
+                font_size=self.settings['font_size'],
+                style=self.settings['style']
+            ))
+        self.settings['lyrics_data'] = self.timeline
+        # A session may be shared between threads, its renderer may not
+        self._lock = threading.Lock()
+        self._setup()
+    
+    def _setup(self):
+        """Set up the renderer for the current first and last line."""
+        render_at = getattr(self, '_render_at', None)
+        self.video_duration, self._render_at = _scene_from_config(self.settings)
+        self._bounds = (self.timeline.start_time, self.timeline.end_time)
+        if render_at is not None:
+            render_at.close()
+    
+    def close(self):
+        """Stop the renderer's threads; the session must not be used afterwards."""
+        with self._lock:
+            self._render_at.close()
+    
+    def render(self, t):
+        """
+        Render the frame at a time.
+        
+        Args:
+            t: Time in seconds from the start of the video
+        
+        Returns:
+            H x W x 3 BGR array, valid until the next render
+        """
+        with self._lock:
+            return self._render_at(t)
+    
+    def image(self, t, image_format='jpeg'):
+        """
+        Render the frame at a time as an encoded image.
+        
+        Args:
+            t: Time in seconds from the start of the video
+            image_format: 'jpeg' or 'png'
+        
+        Returns:
+            Tuple of (image bytes, content type)
+        
+        Raises:
+            ValueError: If the image format is unknown
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}. Use 'jpeg' or 'png'")
+        extension, content_type, params = IMAGE_FORMATS[image_format]
+        with self._lock:
+            _, data = cv2.imencode(extension, self._render_at(t), params)
+        return data.tobytes(), content_type
+    
+    def lines(self):
+        """
+        Get the lines of the timeline.
+        
+        Returns:
+            List of dictionaries with 'text', 'start_time', 'end_time', in time order
+        """
+        with self._lock:
+            return [
+                {'text': text, 'start_time': start, 'end_time': end}
+                for start, end, text in zip(self.timeline.starts, self.timeline.ends,
+                                            self.timeline.texts)
+            ]
+    
+    def update_line(self, index, text=None, start_time=None, end_time=None):
+        """
+        Edit a line, laying out only that line again.
+        
+        Args:
+            index: Line index in time order
+            text: New text (default: unchanged)
+            start_time: New start time in seconds (default: unchanged)
+            end_time: New end time in seconds (default: unchanged)
+        
+        Returns:
+            New index of the line
+        
+        Raises:
+            IndexError: If there is no line at index
+            ValueError: If the line would end before it starts
+        """
+        with self._lock:
+            new_index = self.timeline.update_line(index, text, start_time, end_time)
+            # The title screen and the video duration follow the first and
+            # last line, the renderer is only set up again when they moved
+            if (self.timeline.start_time, self.timeline.end_time) != self._bounds:
+                self._setup()
+            return new_index
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    """Answers the requests of a preview server from its session."""
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/':
+            self._send(200, PREVIEW_PAGE.encode('utf-8'), 'text/html; charset=utf-8')
+        elif url.path == '/lines':
+            session = self.server.session
+            self._send_json(200, {'duration': session.video_duration, 'lines': session.lines()})
+        elif url.path == '/frame':
+            query = parse_qs(url.query)
+            try:
+                t = float(query.get('t', ['0'])[0])
+                start = time.perf_counter()
+                data, content_type = self.server.session.image(t, query.get('format', ['jpeg'])[0])
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            render_ms = (time.perf_counter() - start) * 1000
+            self._send(200, data, content_type, {'Server-Timing': f"render;dur={render_ms:.1f}"})
+        else:
+            self._send_json(404, {'error': f"Not found: {url.path}"})
+    
+    def do_POST(self):
+        match = re.fullmatch(r'/lines/(\d+)', urlparse(self.path).path)
+        if match is None:
+            self._send_json(404, {'error': f"Not found: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            edit = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(edit, dict):
+                raise ValueError("Expected a JSON object")
+            text = edit.get('text')
+            if text is not None and not isinstance(text, str):
+                raise ValueError("'text' must be a string")
+            start_time, end_time = (
+                None if edit.get(key) is None else float(edit[key]) for key in ('start_time', 'end_time')
+            )
+            index = self.server.session.update_line(int(match.group(1)), text, start_time, end_time)
+        except IndexError as e:
+            self._send_json(404, {'error': str(e)})
+            return
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(200, {'index': index})
+    
+    def _send(self, status, body, content_type, headers=None):
+        """Send a response with a body."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, status, data):
+        """Send a JSON response."""
+        self._send(status, json.dumps(data).encode('utf-8'), 'application/json')
+    
+    def log_request(self, code='-', size='-'):
+        # Scrubbing makes a request per frame, only errors are logged
+        pass
+
+
+def make_preview_server(config, host='127.0.0.1', port=8765):
+    """
+    Create a preview server for a song, without starting it.
+    
+    Args:
+        config: Dictionary of generate_karafun_video keyword arguments,
+                including lyrics_data (see render_frame_at)
+        host: Address to listen on (default: localhost only)
+        port: Port to listen on (0 picks a free port)
+    
+    Returns:
+        HTTPServer object with a session attribute (PreviewSession); call
+        serve_forever() to start it, and close the session with the server
+    """
+    server = HTTPServer((host, port), PreviewRequestHandler)
+    try:
+        server.session = PreviewSession(config)
+    except BaseException:
+        server.server_close()
+        raise
+    return server
@@ -2,9 +2,10 @@
 Renderer module for drawing karaoke frames.
 """
 
-from PIL import Image, ImageDraw
 import numpy as np
-from .utils import map_in_range
+from .compositor import Compositor
+from .sprites import text_layer
+from .utils import map_in_range, parse_text_style
 
 
 class KaraokeRenderer:
@@ -22,6 +23,7 @@ class KaraokeRenderer:
         self.width = width
         self.height = height
         self.bg_color = bg_color
+        self.compositor = Compositor(width, height)
     
     def render_frame(self, word_timings, word_sizes, text_layout, current_time,
                      active_color=(255, 69, 0, 255), inactive_color=(136, 136, 136, 255),
@@ -41,17 +43,94 @@ class KaraokeRenderer:
         Returns:
             NumPy array representing the frame (H x W x 3 in BGR format for OpenCV)
         """
-        # Create PIL image
-        img = Image.new('RGBA', (self.width, self.height), self.bg_color)
+        # Create canvas
+        img = self.compositor.new_canvas(self.bg_color)
         
-        # Calculate total width and height
-        total_width = sum(w['width'] for w in word_sizes)
-        max_height = max(w['height'] for w in word_sizes) if word_sizes else 0
+        if y_position is None:
+            max_height = max(w['height'] for w in word_sizes) if word_sizes else 0
+            y_position = (self.height - max_height) / 2
+        
+        self._draw_line(img, word_timings, word_sizes, text_layout, current_time,
+                        active_color, inactive_color, y_position)
+        
+        # The canvas is already in OpenCV format (BGR)
+        return img
+    
+    def render_lines(self, lines_data, text_layout, current_time,
+                     active_color=(255, 69, 0, 255), inactive_color=(136, 136, 136, 255),
+                     line_spacing=20):
+        """
+        Render several lines stacked and centered vertically in one frame.
+        
+        Each line is drawn directly into its own horizontal band of the
+        canvas, so the cost is proportional to the text drawn rather than to
+        the number of lines times the frame size.
+        
+        Args:
+            lines_data: List of line dictionaries with word_timings and word_sizes
+            text_layout: TextLayout object for font information
+            current_time: Current time in seconds
+            active_color: Color for active/passed words (R, G, B, A)
+            inactive_color: Color for inactive words (R, G, B, A)
+            line_spacing: Spacing between lines in pixels
+        
+        Returns:
+            NumPy array representing the frame (H x W x 3 in BGR format for OpenCV)
+        """
+        img = self.compositor.new_canvas(self.bg_color)
+        if not lines_data:
+            return img
+        
+        # Calculate Y positions for lines
+        line_heights = [
+            max(w['height'] for w in line['word_sizes']) if line['word_sizes'] else 0
+            for line in lines_data
+        ]
+        total_height = sum(line_heights) + line_spacing * (len(lines_data) - 1)
+        current_y = (self.height - total_height) / 2
+        
+        # Every glyph drawn at y lies within the font's ascent and descent
+        try:
+            ascent, descent = text_layout.font.getmetrics()
+        except AttributeError:
+            ascent, descent = text_layout.font_size, text_layout.font_size // 4
         
+        for line, line_height in zip(lines_data, line_heights):
+            # Clip each line to its band, extended halfway into the spacing
+            top = max(0, int(current_y) - line_spacing // 2)
+            bottom = min(self.height, int(current_y) + ascent + descent + line_spacing // 2)
+            if bottom > top:
+                self._draw_line(img[top:bottom], line['word_timings'], line['word_sizes'],
+                                text_layout, current_time, active_color, inactive_color,
+                                current_y - top)
+            current_y += line_height + line_spacing
+        
+        return img
+    
+    def _draw_line(self, img, word_timings, word_sizes, text_layout, current_time,
+                   active_color, inactive_color, y_position):
+        """
+        Draw one line of words, horizontally centered, onto a canvas.
+        
+        Args:
+            img: Canvas array (BGR), may be a band of the frame
+            word_timings: List of WordTiming objects
+            word_sizes: List of word size dictionaries from TextLayout
+            text_layout: TextLayout object for font information
+            current_time: Current time in seconds
+            active_color: Color for active/passed words (R, G, B, A)
+            inactive_color: Color for inactive words (R, G, B, A)
+            y_position: Y position of the text within img
+        """
         # Calculate starting position (center text horizontally)
+        total_width = sum(w['width'] for w in word_sizes)
         start_x = (self.width - total_width) / 2
-        if y_position is None:
-            y_position = (self.height - max_height) / 2
+        
+        # Apply uppercase style if needed
+        styles = parse_text_style(text_layout.style)
+        
+        # Glyphs may overhang their measured box (italic, bold), keep a margin
+        margin = text_layout.font_size
         
         # Draw each word
         for i, (timing, word_info) in enumerate(zip(word_timings, word_sizes)):
@@ -59,9 +138,13 @@ class KaraokeRenderer:
             word_width = word_info['width']
             word_x = start_x + word_info['widthRange'][0]
             
-            # Apply uppercase style if needed
-            from .utils import parse_text_style
-            styles = parse_text_style(text_layout.style)
+            # Cull words outside the visible area before drawing anything;
+            # words are laid out left to right so nothing after is visible
+            if word_x > self.width + margin:
+                break
+            if word_x + word_width < -margin:
+                continue
+            
             if styles.get('uppercase'):
                 word_text = word_text.upper()
             
@@ -88,43 +171,32 @@ class KaraokeRenderer:
                 # Calculate fill width
                 fill_width = map_in_range(progress, 0, 100, 0, word_width, constrain=True)
                 
-                # Create a mask for the filled portion
+                # Draw the active text clipped to the filled portion
                 if fill_width > 0:
-                    # Create a temporary image for the active text
-                    temp_img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-                    self._draw_text(temp_img, word_text, word_x, y_position,
-                                  text_layout.font, active_color)
-                    
-                    # Create a mask that reveals only the filled portion
-                    mask = Image.new('L', (self.width, self.height), 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.rectangle(
-                        [word_x, 0, word_x + fill_width, self.height],
-                        fill=255
-                    )
-                    
-                    # Composite the active text onto the main image using the mask
-                    img = Image.composite(temp_img, img, mask)
-        
-        # Convert PIL image to OpenCV format (BGR)
-        img_rgb = img.convert('RGB')
-        img_array = np.array(img_rgb)
-        # Convert RGB to BGR for OpenCV
-        img_bgr = img_array[:, :, ::-1]
-        
-        return img_bgr
+                    self._draw_text(img, word_text, word_x, y_position,
+                                  text_layout.font, active_color,
+                                  clip_right=word_x + fill_width)
     
-    def _draw_text(self, img, text, x, y, font, color):
+    def _draw_text(self, img, text, x, y, font, color, clip_right=None):
         """
-        Draw text on image.
+        Draw text on the canvas.
         
         Args:
-            img: PIL Image object
+            img: Canvas array (BGR)
             text: Text to draw
             x: X position
             y: Y position
             font: PIL Font object
             color: RGBA color tuple
+            clip_right: Optional x position right of which nothing is drawn
         """
-        draw = ImageDraw.Draw(img)
-        draw.text((x, y), text, font=font, fill=color)
+        origin_x = int(np.floor(x))
+        layer, left, top = text_layer(text, font, color, x_offset=x - origin_x)
+        layer_x = origin_x + left
+        
+        if clip_right is not None:
+            # Covers the same columns as the inclusive PIL mask rectangle
+            columns = int(round(clip_right)) + 1 - layer_x
+            layer = layer[:, :max(0, columns)]
+        
+        self.compositor.over(img, layer, layer_x, int(y) + top)
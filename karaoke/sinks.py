@@ -0,0 +1,490 @@
+"""
+Sinks module for writing rendered frames somewhere other than an MP4 file.
+
+Sinks have the write()/release() interface of cv2.VideoWriter, so they can
+replace it in the frame loops of the generate_* functions.
+"""
+
+import glob
+import subprocess
+from pathlib import Path
+import cv2
+import numpy as np
+from .utils import (
+    DEFAULT_OVERLAY_OPACITY, STREAM_SEGMENT_SECONDS, audio_input_args, check_ffmpeg_available
+)
+
+# ffmpeg encoder arguments of the video containers that can carry alpha
+ALPHA_VIDEO_CODECS = {
+    '.mov': ['-c:v', 'prores_ks', '-profile:v', '4444', '-pix_fmt', 'yuva444p10le'],
+    '.webm': ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuva420p', '-auto-alt-ref', '0']
+}
+
+# ffmpeg encoder arguments of opaque MP4 output
+H264_CODEC_ARGS = ['-c:v', 'libx264', '-pix_fmt', 'yuv420p']
+
+
+class ImageSequenceSink:
+    """Writes every frame to its own numbered image file."""
+    
+    def __init__(self, directory, image_format='png', start_number=0):
+        """
+        Initialize image sequence sink.
+        
+        Args:
+            directory: Output directory (created if missing)
+            image_format: Image file extension, 'png' or 'webp' keep alpha
+            start_number: Number of the first frame file
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.image_format = image_format
+        self.frame_number = start_number
+        # WebP is lossy by default, keep the edges of the text exact
+        self._params = [cv2.IMWRITE_WEBP_QUALITY, 101] if image_format == 'webp' else []
+    
+    def path(self, frame_number):
+        """
+        Get the path of a frame file.
+        
+        Args:
+            frame_number: Frame number
+        
+        Returns:
+            Path object
+        """
+        return self.directory / f"frame_{frame_number:06d}.{self.image_format}"
+    
+    def write(self, frame):
+        """
+        Write the next frame.
+        
+        Args:
+            frame: H x W x 3 BGR or H x W x 4 straight-alpha BGRA array
+        
+        Raises:
+            RuntimeError: If the image cannot be written
+        """
+        path = self.path(self.frame_number)
+        if not cv2.imwrite(str(path), frame, self._params):
+            raise RuntimeError(f"Could not write frame image: {path}")
+        self.frame_number += 1
+    
+    def release(self):
+        """Finish the sequence (every frame is already on disk)."""
+
+
+class TeeSink:
+    """Writes every frame to several sinks."""
+    
+    def __init__(self, *sinks):
+        """
+        Initialize tee sink.
+        
+        Args:
+            *sinks: Objects with write(frame) and release()
+        """
+        self.sinks = sinks
+    
+    def write(self, frame):
+        """
+        Write the next frame to every sink.
+        
+        Args:
+            frame: Frame array
+        """
+        for sink in self.sinks:
+            sink.write(frame)
+    
+    def release(self):
+        """Release every sink."""
+        for sink in self.sinks:
+            sink.release()
+
+
+class ProgressSink:
+    """Reports every frame written to a sink."""
+    
+    def __init__(self, sink, callback, total_frames, frames_done=0):
+        """
+        Initialize progress sink.
+        
+        Args:
+            sink: Object with write(frame) and release()
+            callback: Called as callback(frames_done, total_frames) after every frame
+            total_frames: Number of frames of the whole render
+            frames_done: Number of frames already done before this sink
+        """
+        self.sink = sink
+        self.callback = callback
+        self.total_frames = total_frames
+        self.frames_done = frames_done
+    
+    def write(self, frame):
+        """
+        Write the next frame, then report it.
+        
+        Args:
+            frame: Frame array
+        """
+        self.sink.write(frame)
+        self.frames_done += 1
+        self.callback(self.frames_done, self.total_frames)
+    
+    def release(self):
+        """Release the sink."""
+        self.sink.release()
+
+
+class FFmpegSink:
+    """Pipes raw frames into an ffmpeg process."""
+    
+    def __init__(self, output_path, width, height, fps, codec_args, pix_fmt='bgra',
+                 input_args=()):
+        """
+        Initialize ffmpeg sink and start ffmpeg.
+        
+        Args:
+            output_path: Output video path
+            width: Frame width in pixels
+            height: Frame height in pixels
+            fps: Frames per second
+            codec_args: ffmpeg output arguments selecting the encoder
+            pix_fmt: Pixel format of the written frames ('bgr24' or 'bgra')
+            input_args: ffmpeg arguments of inputs read before the frames
+        
+        Raises:
+            RuntimeError: If ffmpeg is not available
+        """
+        if not check_ffmpeg_available():
+            raise RuntimeError(
+                "ffmpeg is not installed or not in PATH. "
+                "Please install ffmpeg to export video with ffmpeg."
+            )
+        self.output_path = output_path
+        self.command = self.build_command(output_path, width, height, fps, codec_args,
+                                          pix_fmt, input_args)
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    
+    @staticmethod
+    def build_command(output_path, width, height, fps, codec_args, pix_fmt='bgra',
+                      input_args=()):
+        """
+        Build the ffmpeg command line reading raw frames from stdin.
+        
+        Args:
+            output_path: Output video path
+            width: Frame width in pixels
+            height: Frame height in pixels
+            fps: Frames per second
+            codec_args: ffmpeg output arguments selecting the encoder
+            pix_fmt: Pixel format of the written frames
+            input_args: ffmpeg arguments of inputs read before the frames,
+                        which are then the last input
+        
+        Returns:
+            List of command arguments
+        """
+        return [
+            'ffmpeg', '-y',
+            # Only errors are printed, so stderr cannot fill up while encoding
+            '-loglevel', 'error',
+            *input_args,
+            '-f', 'rawvideo',
+            '-pix_fmt', pix_fmt,
+            '-s', f'{width}x{height}',
+            '-r', str(fps),
+            '-i', 'pipe:0',
+            *codec_args,
+            str(output_path)
+        ]
+    
+    def write(self, frame):
+        """
+        Write the next frame.
+        
+        Args:
+            frame: Frame array in the sink's pixel format
+        
+        Raises:
+            RuntimeError: If ffmpeg has exited
+        """
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(frame)))
+        except BrokenPipeError:
+            stderr = self._process.stderr.read()
+            self._process.wait()
+            raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace')}")
+    
+    def release(self):
+        """
+        Finish encoding and wait for ffmpeg.
+        
+        Raises:
+            RuntimeError: If ffmpeg fails
+        """
+        self._process.stdin.close()
+        stderr = self._process.stderr.read()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace')}")
+
+
+def alpha_video_sink(output_path, width, height, fps):
+    """
+    Create an ffmpeg sink encoding straight-alpha BGRA frames.
+    
+    Args:
+        output_path: Output .mov (ProRes 4444) or .webm (VP9) path
+        width: Frame width in pixels
+        height: Frame height in pixels
+        fps: Frames per second
+    
+    Returns:
+        FFmpegSink object
+    
+    Raises:
+        ValueError: If the container cannot carry alpha
+        RuntimeError: If ffmpeg is not available
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix not in ALPHA_VIDEO_CODECS:
+        raise ValueError(
+            f"Unsupported alpha video format: {suffix or output_path}. "
+            f"Use one of: {', '.join(ALPHA_VIDEO_CODECS)}"
+        )
+    return FFmpegSink(output_path, width, height, fps, ALPHA_VIDEO_CODECS[suffix])
+
+
+def background_input_args(width, height, fps, bg_color=(0, 0, 0), bg_image=None):
+    """
+    Build the ffmpeg input arguments of an endless background stream.
+    
+    Args:
+        width: Video width in pixels
+        height: Video height in pixels
+        fps: Frames per second
+        bg_color: RGB background color, used without bg_image
+        bg_image: Path to background image (optional)
+    
+    Returns:
+        List of ffmpeg arguments adding one video input
+    """
+    if bg_image:
+        return ['-loop', '1', '-framerate', str(fps), '-i', str(bg_image)]
+    red, green, blue = bg_color[:3]
+    return [
+        '-f', 'lavfi',
+        '-i', f'color=c=0x{red:02x}{green:02x}{blue:02x}:s={width}x{height}:r={fps}'
+    ]
+
+
+def background_filter(width, height, bg_image=None, overlay_opacity=DEFAULT_OVERLAY_OPACITY):
+    """
+    Build the ffmpeg filter chain preparing a background stream.
+    
+    An image background is resized to the video size and dimmed like
+    load_background() does.
+    
+    Args:
+        width: Video width in pixels
+        height: Video height in pixels
+        bg_image: Whether the background is an image (a color source otherwise)
+        overlay_opacity: Opacity of the black overlay on images (0-255)
+    
+    Returns:
+        Filter chain string, without input or output labels
+    """
+    if not bg_image:
+        return 'format=rgb24'
+    chain = f'scale={width}:{height}:flags=lanczos,format=rgb24'
+    if overlay_opacity:
+        chain += f',drawbox=x=0:y=0:w=iw:h=ih:color=black@{overlay_opacity / 255:.4f}:t=fill'
+    return chain
+
+
+def background_filter_graph(width, height, bg_image=None, overlay_opacity=DEFAULT_OVERLAY_OPACITY):
+    """
+    Build the ffmpeg filter graph putting lyric frames over a background.
+    
+    Input 0 is the background and input 1 the premultiplied BGRA lyric
+    frames.
+    
+    Args:
+        width: Video width in pixels
+        height: Video height in pixels
+        bg_image: Whether the background is an image (a color source otherwise)
+        overlay_opacity: Opacity of the black overlay on images (0-255)
+    
+    Returns:
+        filter_complex string whose output is labelled [out]
+    """
+    return (
+        f'[0:v]{background_filter(width, height, bg_image, overlay_opacity)}[bg];'
+        '[bg][1:v]overlay=alpha=premultiplied:shortest=1:format=auto[out]'
+    )
+
+
+def composited_video_sink(output_path, width, height, fps, bg_color=(0, 0, 0), bg_image=None,
+                          overlay_opacity=DEFAULT_OVERLAY_OPACITY):
+    """
+    Create an ffmpeg sink compositing lyric frames over a background.
+    
+    The sink takes premultiplied BGRA frames of the lyrics only. ffmpeg
+    loops the background image (or generates the background color) and
+    blends the frames over it in the same pass that encodes the video.
+    
+    Args:
+        output_path: Output video path
+        width: Video width in pixels
+        height: Video height in pixels
+        fps: Frames per second
+        bg_color: RGB background color, used without bg_image
+        bg_image: Path to background image (optional)
+        overlay_opacity: Opacity of the black overlay on images (0-255)
+    
+    Returns:
+        FFmpegSink object
+    
+    Raises:
+        RuntimeError: If ffmpeg is not available
+    """
+    input_args = background_input_args(width, height, fps, bg_color, bg_image)
+    codec_args = [
+        '-filter_complex', background_filter_graph(width, height, bg_image, overlay_opacity),
+        '-map', '[out]',
+        *H264_CODEC_ARGS
+    ]
+    return FFmpegSink(output_path, width, height, fps, codec_args, input_args=input_args)
+
+
+def streaming_output_args(output_path, fps, segment_seconds=STREAM_SEGMENT_SECONDS):
+    """
+    Build the ffmpeg output arguments of H.264 video playable while it is written.
+    
+    A .m3u8 output is an HLS playlist of fragmented MP4 segments, written
+    next to it and listed as each one completes. Any other output is a
+    fragmented MP4 file, whose fragments can be played as they are appended.
+    A keyframe starts every segment, so every segment can be played alone.
+    
+    Args:
+        output_path: Output playlist or video path
+        fps: Frames per second
+        segment_seconds: Length of a segment or fragment in seconds
+    
+    Returns:
+        List of ffmpeg output arguments
+    """
+    keyframe_interval = str(max(1, round(fps * segment_seconds)))
+    args = [
+        *H264_CODEC_ARGS,
+        '-g', keyframe_interval,
+        '-keyint_min', keyframe_interval,
+        '-sc_threshold', '0'
+    ]
+    
+    output_file = Path(output_path)
+    if output_file.suffix.lower() == '.m3u8':
+        return args + [
+            '-f', 'hls',
+            '-hls_time', f'{segment_seconds:g}',
+            # The playlist only grows, players can start at the first segment
+            '-hls_playlist_type', 'event',
+            '-hls_segment_type', 'fmp4',
+            '-hls_fmp4_init_filename', f'{output_file.stem}_init.mp4',
+            '-hls_segment_filename', str(output_file.with_name(f'{output_file.stem}_%05d.m4s')),
+            # Segments are written under a temporary name, then renamed
+            '-hls_flags', 'independent_segments+temp_file'
+        ]
+    return args + [
+        '-movflags', 'frag_keyframe+empty_moov+default_base_moof',
+        '-frag_duration', str(round(segment_seconds * 1000000))
+    ]
+
+
+def stream_files(output_path):
+    """
+    List the files of a stream written by streaming_video_sink.
+    
+    Args:
+        output_path: Output playlist or video path
+    
+    Returns:
+        List of Path objects: the output and, for a playlist, its temporary
+        copy, init section and segments written so far
+    """
+    output_file = Path(output_path)
+    files = [output_file]
+    if output_file.suffix.lower() == '.m3u8':
+        files.append(output_file.with_name(f'{output_file.name}.tmp'))
+        files.append(output_file.with_name(f'{output_file.stem}_init.mp4'))
+        # Completed segments and the one being written under a .tmp name
+        files += sorted(output_file.parent.glob(f'{glob.escape(output_file.stem)}_[0-9]*.m4s*'))
+    return files
+
+
+def streaming_video_sink(output_path, width, height, fps, segment_seconds=STREAM_SEGMENT_SECONDS,
+                         audio_path=None, audio_offset=0.0, composite=False, bg_color=(0, 0, 0),
+                         bg_image=None, overlay_opacity=DEFAULT_OVERLAY_OPACITY):
+    """
+    Create an ffmpeg sink writing video that can be played while it renders.
+    
+    See streaming_output_args for the output formats. The audio track is
+    muxed while encoding, as there is no finished file to add it to later.
+    Unlike _mux_audio, which keeps a finished video without audio, an
+    audio file ffmpeg cannot read fails the whole stream, so the file's
+    existence is checked before any frame is written.
+    
+    Args:
+        output_path: Output .m3u8 playlist or fragmented MP4 path
+        width: Video width in pixels
+        height: Video height in pixels
+        fps: Frames per second
+        segment_seconds: Length of a segment or fragment in seconds
+        audio_path: Path to audio file to mux (optional)
+        audio_offset: Offset in seconds to delay/advance audio
+        composite: Take premultiplied BGRA frames of the lyrics only and
+                   blend them over the background like composited_video_sink,
+                   instead of finished BGR frames
+        bg_color: RGB background color, used without bg_image
+        bg_image: Path to background image (optional)
+        overlay_opacity: Opacity of the black overlay on images (0-255)
+    
+    Returns:
+        FFmpegSink object
+    
+    Raises:
+        FileNotFoundError: If the audio file doesn't exist
+        ValueError: If audio_offset is not a valid number
+        RuntimeError: If ffmpeg is not available
+    """
+    if audio_path and not Path(audio_path).exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    
+    if composite:
+        # Input 0 is the background, the frames are input 1
+        input_args = background_input_args(width, height, fps, bg_color, bg_image)
+        frames_index = 1
+        video_args = [
+            '-filter_complex', background_filter_graph(width, height, bg_image, overlay_opacity),
+            '-map', '[out]'
+        ]
+    else:
+        input_args = []
+        frames_index = 0
+        video_args = ['-map', '0:v']
+    
+    audio_args = []
+    if audio_path:
+        # The audio input comes after the frames, so the frames keep the
+        # input index the filter graph expects
+        audio_args = audio_input_args(audio_path, audio_offset)
+        video_args += ['-map', f'{frames_index + 1}:a', '-c:a', 'aac', '-shortest']
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    codec_args = audio_args + video_args + streaming_output_args(output_path, fps, segment_seconds)
+    return FFmpegSink(output_path, width, height, fps, codec_args,
+                      pix_fmt='bgra' if composite else 'bgr24', input_args=input_args)
@@ -0,0 +1,229 @@
+"""
+Sprites module for rasterizing text into compositor layers.
+
+Text effects (outline, shadow, glow) are computed once per sprite with a
+single dilate and/or blur pass over the glyph mask, so they cost nothing
+on later frames.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+from .compositor import Compositor, mask_layer
+from .glyph_atlas import font_key, glyph_atlas
+from .utils import DEFAULT_OUTLINE_COLOR, DEFAULT_SHADOW_COLOR, parse_text_style
+
+
+def text_mask(text, font, x_offset=0.0):
+    """
+    Assemble text into a tight glyph coverage mask from the font's glyph atlas.
+    
+    Args:
+        text: Text to rasterize
+        font: PIL Font object
+        x_offset: Sub-pixel horizontal offset of the draw origin (0.0 to 1.0)
+    
+    Returns:
+        Tuple of (mask, left, top) where mask is an H x W uint8 array and
+        (left, top) is its position relative to the draw origin
+    """
+    return glyph_atlas(font).mask(text, x_offset)
+
+
+def style_effects(style, font_size):
+    """
+    Get the text effects requested by a style string.
+    
+    Args:
+        style: Style string (e.g., 'bold outline shadow')
+        font_size: Font size in pixels, effects scale with it
+    
+    Returns:
+        Dictionary of effect keyword arguments for effects_layer()
+    """
+    styles = parse_text_style(style)
+    effects = {}
+    if styles.get('outline'):
+        effects['outline'] = (max(2, int(font_size) // 16), DEFAULT_OUTLINE_COLOR)
+    if styles.get('shadow'):
+        offset = max(2, int(font_size) // 20)
+        effects['shadow'] = (offset, offset, max(1, int(font_size) // 24), DEFAULT_SHADOW_COLOR)
+    return effects
+
+
+def effects_padding(outline=None, shadow=None, glow=None):
+    """
+    Get how far effects spread beyond the glyph mask.
+    
+    Args:
+        outline: Optional (width, color) tuple
+        shadow: Optional (dx, dy, blur, color) tuple
+        glow: Optional (radius, color) tuple
+    
+    Returns:
+        Padding in pixels
+    """
+    padding = 0
+    if outline:
+        padding = max(padding, outline[0] + 1)
+    if shadow:
+        padding = max(padding, max(abs(shadow[0]), abs(shadow[1])) + shadow[2] * 3 + 1)
+    if glow:
+        padding = max(padding, glow[0] * 3 + 1)
+    return padding
+
+
+def effects_layer(mask, outline=None, shadow=None, glow=None):
+    """
+    Render the effects of a glyph mask into a layer drawn below the text.
+    
+    The mask must already be padded by effects_padding() pixels.
+    
+    Args:
+        mask: H x W uint8 glyph coverage array
+        outline: Optional (width, color) stroke around the glyphs
+        shadow: Optional (dx, dy, blur, color) drop shadow
+        glow: Optional (radius, color) soft glow around the glyphs
+    
+    Returns:
+        H x W x 4 premultiplied BGRA layer (transparent if no effect is set)
+    """
+    height, width = mask.shape
+    layer = np.zeros((height, width, 4), dtype=np.uint8)
+    if not (outline or shadow or glow) or mask.size == 0:
+        return layer
+    
+    compositor = Compositor(width, height)
+    
+    if shadow:
+        dx, dy, blur, color = shadow
+        compositor.over(layer, mask_layer(_blur(mask, blur), color), dx, dy)
+    
+    if glow:
+        radius, color = glow
+        compositor.over(layer, mask_layer(_blur(_dilate(mask, radius), radius), color))
+    
+    if outline:
+        stroke, color = outline
+        compositor.over(layer, mask_layer(_dilate(mask, stroke), color))
+    
+    return layer
+
+
+def text_layer(text, font, color, x_offset=0.0, outline=None, shadow=None, glow=None):
+    """
+    Rasterize text and its effects into a premultiplied BGRA layer.
+    
+    Args:
+        text: Text to rasterize
+        font: PIL Font object
+        color: RGBA color tuple
+        x_offset: Sub-pixel horizontal offset of the draw origin (0.0 to 1.0)
+        outline: Optional (width, color) stroke around the glyphs
+        shadow: Optional (dx, dy, blur, color) drop shadow
+        glow: Optional (radius, color) soft glow around the glyphs
+    
+    Returns:
+        Tuple of (layer, left, top) with the layer position relative to the
+        draw origin
+    """
+    mask, left, top = text_mask(text, font, x_offset)
+    padding = effects_padding(outline, shadow, glow)
+    if padding == 0 or mask.size == 0:
+        return mask_layer(mask, color), left, top
+    
+    mask = np.pad(mask, padding)
+    layer = effects_layer(mask, outline, shadow, glow)
+    Compositor(*mask.shape[::-1]).over(layer, mask_layer(mask, color))
+    return layer, left - padding, top - padding
+
+
+def _dilate(mask, radius):
+    """Grow a mask by radius pixels with a single elliptical dilate pass."""
+    size = radius * 2 + 1
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+    return cv2.dilate(mask, kernel)
+
+
+def _blur(mask, radius):
+    """Soften a mask with a single Gaussian blur pass."""
+    return cv2.GaussianBlur(mask, (0, 0), sigmaX=max(0.5, radius / 2))
+
+
+class SpriteCache:
+    """
+    LRU cache of rasterized text sprites.
+    
+    Sprites are keyed by text, font, color, sub-pixel offset and effects, so
+    static text and its effects are rasterized once and reused on every
+    frame that shows them. The cache can be shared by renderers running on
+    different threads.
+    """
+    
+    def __init__(self, max_entries=512):
+        """
+        Initialize sprite cache.
+        
+        Args:
+            max_entries: Maximum number of cached sprites
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def text(self, text, font, color, x_offset=0.0, outline=None, shadow=None, glow=None):
+        """
+        Get a text sprite, rasterizing it on first use.
+        
+        Args:
+            text: Text to rasterize
+            font: PIL Font object
+            color: RGBA color tuple
+            x_offset: Sub-pixel horizontal offset of the draw origin
+            outline: Optional (width, color) stroke around the glyphs
+            shadow: Optional (dx, dy, blur, color) drop shadow
+            glow: Optional (radius, color) soft glow around the glyphs
+        
+        Returns:
+            Tuple of (layer, left, top) as returned by text_layer()
+        """
+        key = (text, font_key(font), tuple(color), round(x_offset, 3), outline, shadow, glow)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        
+        # Rasterized outside the lock; threads racing on the same key build
+        # identical sprites and the last one is kept
+        sprite = text_layer(text, font, color, x_offset, outline, shadow, glow)
+        with self._lock:
+            # Keep the font alive so id-based keys cannot be reused
+            self._entries[key] = (sprite, font)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return sprite
+    
+    def place(self, text, x, y, font, color, **effects):
+        """
+        Get a cached text sprite placed at a draw position.
+        
+        Args:
+            text: Text to draw
+            x: X position of the draw origin
+            y: Y position of the draw origin
+            font: PIL Font object
+            color: RGBA color tuple
+            **effects: Optional outline, shadow or glow (see text_layer)
+        
+        Returns:
+            (layer, x, y, opacity) sprite for the layer graph
+        """
+        origin_x = int(math.floor(x))
+        layer, left, top = self.text(text, font, color, x - origin_x, **effects)
+        return (layer, origin_x + left, int(y) + top, 1.0)
+    
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,87 @@
+"""
+Stripe module for splitting full-frame passes across threads.
+
+NumPy releases the GIL inside its array loops, so copying or blending
+disjoint bands of rows from several threads scales with the number of
+cores, without the process start-up and frame transfer costs of render
+workers. Small regions are processed on the calling thread.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .utils import STRIPE_MIN_ROWS
+
+
+class StripePool:
+    """Runs a row-range function over horizontal stripes on a thread pool."""
+    
+    def __init__(self, threads, min_rows=STRIPE_MIN_ROWS):
+        """
+        Initialize stripe pool.
+        
+        Args:
+            threads: Maximum number of stripes processed at once
+            min_rows: Minimum height of a stripe in rows
+        """
+        self.threads = max(1, threads)
+        self.min_rows = min_rows
+        # The calling thread processes the first stripe itself
+        self._executor = ThreadPoolExecutor(max_workers=self.threads - 1) if self.threads > 1 else None
+    
+    def stripes(self, top, bottom):
+        """
+        Split a range of rows into stripes.
+        
+        Args:
+            top: First row (inclusive)
+            bottom: Last row (exclusive)
+        
+        Returns:
+            List of (top, bottom) row ranges
+        """
+        rows = bottom - top
+        count = max(1, min(self.threads, rows // self.min_rows))
+        edges = [top + rows * i // count for i in range(count + 1)]
+        return list(zip(edges[:-1], edges[1:]))
+    
+    def run(self, function, top, bottom):
+        """
+        Call a function on every stripe of a range of rows and wait for all.
+        
+        Args:
+            function: Callable taking (stripe_index, top, bottom); stripes
+                      never overlap and stripe_index is below threads
+            top: First row (inclusive)
+            bottom: Last row (exclusive)
+        """
+        stripes = self.stripes(top, bottom)
+        if len(stripes) == 1:
+            function(0, *stripes[0])
+            return
+        
+        futures = [
+            self._executor.submit(function, index, stripe_top, stripe_bottom)
+            for index, (stripe_top, stripe_bottom) in enumerate(stripes[1:], 1)
+        ]
+        function(0, *stripes[0])
+        for future in futures:
+            future.result()
+    
+    def copy(self, dst, src):
+        """
+        Copy an array into another of the same shape, stripe by stripe.
+        
+        Args:
+            dst: Destination array
+            src: Source array
+        """
+        def copy_rows(_, top, bottom):
+            np.copyto(dst[top:bottom], src[top:bottom])
+        
+        self.run(copy_rows, 0, src.shape[0])
+    
+    def close(self):
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
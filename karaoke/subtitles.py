@@ -0,0 +1,440 @@
+"""
+Subtitles module for exporting lyrics as karaoke subtitle files.
+
+An ASS file carries the whole Karafun look as text: the font, the sung and
+not-yet-sung colors, the outline and shadow, and a \\kf fill tag per word
+timed like the rendered wipe. Players and editors draw it over any video,
+and ffmpeg's libass filter can burn it onto a background without rendering
+a single frame in Python. SRT and WebVTT keep only the line text (WebVTT
+also keeps the word timing as cue timestamps).
+"""
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from .sinks import H264_CODEC_ARGS, background_filter, background_input_args
+from .sprites import style_effects
+from .text_layout import TextLayout
+from .timeline import Timeline
+from .timing import create_word_timings
+from .utils import (
+    DEFAULT_OVERLAY_OPACITY, audio_input_args, check_ffmpeg_available, parse_text_style
+)
+
+# Colors of the Karafun renderer (RGBA)
+INACTIVE_COLOR = (255, 255, 255, 255)
+DONE_COLOR = (237, 61, 234, 255)
+
+SUBTITLE_FORMATS = ('.ass', '.srt', '.vtt')
+
+
+def _lines(lyrics_data):
+    """
+    Get the (start_time, end_time, text) lines of lyrics, sorted by start time.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                     or a Timeline
+    
+    Returns:
+        List of (start_time, end_time, text) tuples
+    """
+    if isinstance(lyrics_data, Timeline):
+        return list(zip(lyrics_data.starts, lyrics_data.ends, lyrics_data.texts))
+    return sorted(
+        ((lyric['start_time'], lyric['end_time'], lyric['text']) for lyric in lyrics_data),
+        key=lambda line: line[0]
+    )
+
+
+def _centiseconds(seconds):
+    """Round a time to whole centiseconds, the resolution of ASS."""
+    return max(0, int(round(seconds * 100)))
+
+
+def ass_time(seconds):
+    """
+    Format a time as an ASS timestamp.
+    
+    Args:
+        seconds: Time in seconds
+    
+    Returns:
+        String like '0:01:02.35'
+    """
+    cs = _centiseconds(seconds)
+    return f"{cs // 360000}:{cs // 6000 % 60:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
+
+def _clock_time(seconds, separator):
+    """Format a time as HH:MM:SS<separator>mmm."""
+    ms = max(0, int(round(seconds * 1000)))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}{separator}{ms % 1000:03d}"
+
+
+def srt_time(seconds):
+    """
+    Format a time as an SRT timestamp.
+    
+    Args:
+        seconds: Time in seconds
+    
+    Returns:
+        String like '00:01:02,350'
+    """
+    return _clock_time(seconds, ',')
+
+
+def vtt_time(seconds):
+    """
+    Format a time as a WebVTT timestamp.
+    
+    Args:
+        seconds: Time in seconds
+    
+    Returns:
+        String like '00:01:02.350'
+    """
+    return _clock_time(seconds, '.')
+
+
+def ass_color(color):
+    """
+    Convert an RGB or RGBA color to an ASS color.
+    
+    Args:
+        color: RGB or RGBA tuple (0-255)
+    
+    Returns:
+        String like '&H00EA3DED' (ASS stores transparency, then BGR)
+    """
+    red, green, blue = color[:3]
+    alpha = color[3] if len(color) > 3 else 255
+    return f"&H{255 - alpha:02X}{blue:02X}{green:02X}{red:02X}"
+
+
+def _ass_text(text):
+    """Keep lyric text from being read as ASS override blocks."""
+    return text.replace('{', '(').replace('}', ')').replace('\\', '/')
+
+
+def _display_text(text, style):
+    """Apply the text transforms of a style string to lyric text."""
+    return text.upper() if parse_text_style(style).get('uppercase') else text
+
+
+def to_ass(lyrics_data, width=1280, height=720, font_family='Arial', font_size=52, style='bold',
+           inactive_color=INACTIVE_COLOR, done_color=DONE_COLOR, time_offset=0.0):
+    """
+    Convert lyrics to an ASS karaoke script.
+    
+    Lines alternate between an upper and a lower row like the Karafun
+    display: every line appears, fading in, when the line before it starts,
+    and its words fill from inactive_color to done_color as they are sung.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                     or a Timeline
+        width: Video width in pixels
+        height: Video height in pixels
+        font_family: Font family name or path to TTF file
+        font_size: Font size in pixels
+        style: Style string (e.g., 'bold outline')
+        inactive_color: RGBA color for words not yet sung
+        done_color: RGBA color for sung words
+        time_offset: Seconds added to every lyric time (e.g., a title screen)
+    
+    Returns:
+        ASS script as a string
+    """
+    styles = parse_text_style(style)
+    effects = style_effects(style, font_size)
+    outline = effects['outline'][0] if 'outline' in effects else 0
+    shadow = effects['shadow'][0] if 'shadow' in effects else 0
+    shadow_color = effects['shadow'][3] if 'shadow' in effects else (0, 0, 0, 0)
+    
+    # Name the font actually rendered, which may be a fallback of font_family
+    font = TextLayout(font_family, font_size, style).font
+    font_name = font.getname()[0] if hasattr(font, 'getname') else font_family
+    
+    # Rows centered around 40% from the top, like KarafunRenderer
+    line_height = int(font_size * 1.2)
+    upper_margin = int(height * 0.40) - line_height - int(line_height * 0.4)
+    lower_margin = upper_margin + line_height + int(line_height * 0.8)
+    
+    script = [
+        '[Script Info]',
+        'ScriptType: v4.00+',
+        f'PlayResX: {width}',
+        f'PlayResY: {height}',
+        'WrapStyle: 2',
+        'ScaledBorderAndShadow: yes',
+        '',
+        '[V4+ Styles]',
+        'Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, '
+        'BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, '
+        'BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding',
+        # Karaoke tags fill from the secondary to the primary color
+        f"Style: Karaoke,{font_name},{font_size},{ass_color(done_color)},"
+        f"{ass_color(inactive_color)},&H00000000,{ass_color(shadow_color)},"
+        f"{-1 if styles.get('bold') else 0},{-1 if styles.get('italic') else 0},"
+        f"{-1 if styles.get('underline') else 0},0,100,100,0,0,1,{outline},{shadow},8,0,0,0,1",
+        '',
+        '[Events]',
+        'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text'
+    ]
+    
+    previous_start = 0.0
+    for index, (start_time, end_time, text) in enumerate(_lines(lyrics_data)):
+        start_time += time_offset
+        end_time += time_offset
+        word_timings = create_word_timings(_display_text(text, style), start_time, end_time)
+        if not word_timings:
+            continue
+        
+        appear = min(previous_start, start_time)
+        previous_start = start_time
+        
+        # Fill durations come from rounded absolute times, so they never drift
+        tags = []
+        lead = _centiseconds(start_time) - _centiseconds(appear)
+        if lead > 0:
+            # Fade in during the first half of the previous line
+            tags.append(f"{{\\fad({lead * 5},0)\\k{lead}}}")
+        for word in word_timings:
+            duration = _centiseconds(word.end_time) - _centiseconds(word.start_time)
+            tags.append(f"{{\\kf{duration}}}{_ass_text(word.text)}")
+        
+        margin = upper_margin if index % 2 == 0 else lower_margin
+        end = max(end_time, word_timings[-1].end_time)
+        script.append(
+            f"Dialogue: 0,{ass_time(appear)},{ass_time(end)},Karaoke,,0,0,{margin},,{''.join(tags)}"
+        )
+    
+    return '\n'.join(script) + '\n'
+
+
+def to_srt(lyrics_data, style='', time_offset=0.0):
+    """
+    Convert lyrics to SRT subtitles, one cue per line.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                     or a Timeline
+        style: Style string, only its text transforms apply
+        time_offset: Seconds added to every lyric time
+    
+    Returns:
+        SRT document as a string
+    """
+    cues = []
+    for number, (start_time, end_time, text) in enumerate(_lines(lyrics_data), 1):
+        cues.append(
+            f"{number}\n{srt_time(start_time + time_offset)} --> {srt_time(end_time + time_offset)}\n"
+            f"{_display_text(text, style)}\n"
+        )
+    return '\n'.join(cues)
+
+
+def to_vtt(lyrics_data, style='', time_offset=0.0):
+    """
+    Convert lyrics to WebVTT subtitles, one cue per line.
+    
+    Every word after the first is preceded by a cue timestamp, which
+    players supporting karaoke cues use to highlight the sung words.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                     or a Timeline
+        style: Style string, only its text transforms apply
+        time_offset: Seconds added to every lyric time
+    
+    Returns:
+        WebVTT document as a string
+    """
+    cues = ['WEBVTT\n']
+    for start_time, end_time, text in _lines(lyrics_data):
+        start_time += time_offset
+        end_time += time_offset
+        parts = []
+        for word in create_word_timings(_display_text(text, style), start_time, end_time):
+            word_text = word.text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            # Timestamps must fall strictly inside the cue
+            if not word.text.isspace() and start_time < word.start_time < end_time:
+                parts.append(f"<{vtt_time(word.start_time)}>")
+            parts.append(word_text)
+        cues.append(f"{vtt_time(start_time)} --> {vtt_time(end_time)}\n{''.join(parts)}\n")
+    return '\n'.join(cues)
+
+
+def export_subtitles(lyrics_data, output_path, width=1280, height=720, font_family='Arial',
+                     font_size=52, style='bold', time_offset=0.0):
+    """
+    Write lyrics as a subtitle file, in the format given by its extension.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                     or a Timeline
+        output_path: Output .ass, .srt or .vtt path
+        width: Video width in pixels (ASS only)
+        height: Video height in pixels (ASS only)
+        font_family: Font family name or path to TTF file (ASS only)
+        font_size: Font size in pixels (ASS only)
+        style: Style string (e.g., 'bold outline')
+        time_offset: Seconds added to every lyric time
+    
+    Returns:
+        Path to the subtitle file
+    
+    Raises:
+        ValueError: If the extension is not a supported subtitle format
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix == '.ass':
+        document = to_ass(lyrics_data, width, height, font_family, font_size, style,
+                          time_offset=time_offset)
+    elif suffix == '.srt':
+        document = to_srt(lyrics_data, style, time_offset)
+    elif suffix == '.vtt':
+        document = to_vtt(lyrics_data, style, time_offset)
+    else:
+        raise ValueError(
+            f"Unsupported subtitle format: {suffix or output_path}. "
+            f"Use one of: {', '.join(SUBTITLE_FORMATS)}"
+        )
+    
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return output_path
+
+
+def _filter_value(value):
+    """Escape a string for use as an option value inside a filter graph."""
+    # Escape once for the option parser, then once for the graph parser
+    for char in ('\\', ':', "'"):
+        value = value.replace(char, '\\' + char)
+    for char in ('\\', "'", '[', ']', ',', ';'):
+        value = value.replace(char, '\\' + char)
+    return value
+
+
+def burn_subtitles_command(subtitle_path, output_path, width, height, fps, duration,
+                           bg_color=(0, 0, 0), bg_image=None,
+                           overlay_opacity=DEFAULT_OVERLAY_OPACITY, audio_path=None,
+                           audio_offset=0.0, fonts_dir=None):
+    """
+    Build the ffmpeg command drawing an ASS file over a background.
+    
+    Args:
+        subtitle_path: Path to the ASS file
+        output_path: Output video path
+        width: Video width in pixels
+        height: Video height in pixels
+        fps: Frames per second
+        duration: Video duration in seconds
+        bg_color: RGB background color, used without bg_image
+        bg_image: Path to background image (optional, bg_color is used if
+                  the file doesn't exist, like in rendered videos)
+        overlay_opacity: Opacity of the black overlay on images (0-255)
+        audio_path: Path to an audio track muxed into the video (optional)
+        audio_offset: Offset in seconds to delay/advance audio (positive = delay)
+        fonts_dir: Directory libass also looks for the subtitle font in
+                   (optional, fontconfig only finds installed fonts)
+    
+    Returns:
+        List of command arguments
+    
+    Raises:
+        FileNotFoundError: If the audio file doesn't exist
+        ValueError: If audio_offset is not a valid number
+    """
+    if audio_path and not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    # A missing background image falls back to the color, as the renderer does
+    if bg_image and not Path(bg_image).exists():
+        bg_image = None
+    
+    ass_filter = f'ass=filename={_filter_value(str(subtitle_path))}'
+    if fonts_dir:
+        ass_filter += f':fontsdir={_filter_value(str(fonts_dir))}'
+    graph = f'[0:v]{background_filter(width, height, bg_image, overlay_opacity)},{ass_filter}[out]'
+    command = [
+        'ffmpeg', '-y',
+        '-loglevel', 'error',
+        *background_input_args(width, height, fps, bg_color, bg_image)
+    ]
+    if audio_path:
+        command += audio_input_args(audio_path, audio_offset)
+    command += ['-filter_complex', graph, '-map', '[out]']
+    if audio_path:
+        command += ['-map', '1:a', '-c:a', 'aac']
+    command += ['-t', f'{duration:.3f}', '-r', str(fps), *H264_CODEC_ARGS, str(output_path)]
+    return command
+
+
+def burn_subtitles(lyrics_data, output_path='karaoke_subtitles.mp4', width=1280, height=720,
+                   fps=30, font_family='Arial', font_size=52, style='bold', bg_color=(0, 0, 0),
+                   bg_image=None, overlay_opacity=DEFAULT_OVERLAY_OPACITY, audio_path=None,
+                   audio_offset=0.0):
+    """
+    Make a karaoke video by letting ffmpeg draw ASS subtitles on a background.
+    
+    This is the fast path: no frame is rendered or piped from Python. Only
+    the lyric lines are drawn; there is no title screen, header or time
+    badge.
+    
+    Args:
+        lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time',
+                     or a Timeline
+        output_path: Output video path
+        width: Video width in pixels
+        height: Video height in pixels
+        fps: Frames per second
+        font_family: Font family name or path to TTF file
+        font_size: Font size in pixels
+        style: Style string (e.g., 'bold outline')
+        bg_color: RGB background color, used without bg_image
+        bg_image: Path to background image (optional, bg_color is used if
+                  the file doesn't exist)
+        overlay_opacity: Opacity of the black overlay on images (0-255)
+        audio_path: Path to an audio track muxed into the video (optional)
+        audio_offset: Offset in seconds to delay/advance audio (positive = delay)
+    
+    Returns:
+        Path to the output video
+    
+    Raises:
+        ValueError: If no lyrics are given or audio_offset is not a valid number
+        FileNotFoundError: If the audio file doesn't exist
+        RuntimeError: If ffmpeg is not available or fails
+    """
+    lines = _lines(lyrics_data)
+    if not lines:
+        raise ValueError("No lyrics data provided")
+    if not check_ffmpeg_available():
+        raise RuntimeError(
+            "ffmpeg is not installed or not in PATH. "
+            "Please install ffmpeg to burn subtitles."
+        )
+    
+    fd, subtitle_path = tempfile.mkstemp(suffix='.ass')
+    os.close(fd)
+    try:
+        export_subtitles(lyrics_data, subtitle_path, width, height, font_family,
+                         font_size, style)
+        duration = max(end_time for _, end_time, _ in lines)
+        # The ASS file names the font by family; point libass at its file,
+        # which fontconfig does not know if it is not installed
+        font_path = getattr(TextLayout(font_family, font_size, style).font, 'path', None)
+        fonts_dir = os.path.dirname(os.path.abspath(font_path)) if font_path else None
+        command = burn_subtitles_command(subtitle_path, output_path, width, height, fps, duration,
+                                         bg_color, bg_image, overlay_opacity, audio_path,
+                                         audio_offset, fonts_dir)
+        try:
+            subprocess.run(command, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg failed: {e.stderr}")
+    finally:
+        os.unlink(subtitle_path)
+    return output_path
@@ -4,6 +4,7 @@ Text layout module for measuring word dimensions using Pillow.
 
 from PIL import Image, ImageDraw, ImageFont
 import os
+from .glyph_atlas import font_lock
 
 
 class TextLayout:
@@ -22,6 +23,7 @@ class TextLayout:
         self.font_size = font_size
         self.style = style
         self.font = self._load_font()
+        self._font_variants = {}
     
     def _load_font(self):
         """Load the font based on font_family and style."""
@@ -65,6 +67,29 @@ class TextLayout:
         # Fallback to default font
         return ImageFont.load_default()
     
+    def font_variant(self, font_size):
+        """
+        Get the layout font at another size, loading it only once.
+        
+        Args:
+            font_size: Font size in pixels
+        
+        Returns:
+            PIL Font object (the layout font itself if it cannot be resized)
+        """
+        font = self._font_variants.get(font_size)
+        if font is None:
+            try:
+                font_path = getattr(self.font, 'path', None)
+                if font_path:
+                    font = ImageFont.truetype(font_path, font_size)
+                else:
+                    font = self.font
+            except Exception:
+                font = self.font
+            self._font_variants[font_size] = font
+        return font
+    
     def measure_text(self, text):
         """
         Measure text dimensions.
@@ -86,8 +111,9 @@ class TextLayout:
         img = Image.new('RGBA', (1, 1), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
         
-        # Get bounding box
-        bbox = draw.textbbox((0, 0), text, font=self.font)
+        # Get bounding box (the font face may be shared with other threads)
+        with font_lock(self.font):
+            bbox = draw.textbbox((0, 0), text, font=self.font)
         width = bbox[2] - bbox[0]
         height = bbox[3] - bbox[1]
         
@@ -131,6 +157,45 @@ class TextLayout:
         
         return word_sizes
     
+    def paginate(self, word_sizes, max_width):
+        """
+        Split measured words into pages no wider than max_width.
+        
+        Whitespace at page boundaries is dropped. A single word wider than
+        max_width gets a page of its own.
+        
+        Args:
+            word_sizes: List of word info dictionaries from measure_words()
+            max_width: Maximum page width in pixels
+        
+        Returns:
+            List of (start, end) word index ranges, one per page
+        """
+        pages = []
+        start = 0
+        count = len(word_sizes)
+        
+        while start < count:
+            # Skip whitespace at the start of a page
+            while start < count and not word_sizes[start]['text'].strip():
+                start += 1
+            if start >= count:
+                break
+            
+            page_x = word_sizes[start]['widthRange'][0]
+            end = start + 1
+            while end < count and word_sizes[end]['widthRange'][1] - page_x <= max_width:
+                end += 1
+            
+            # Trim whitespace at the end of the page
+            stop = end
+            while not word_sizes[stop - 1]['text'].strip():
+                stop -= 1
+            pages.append((start, stop))
+            start = end
+        
+        return pages
+    
     def get_total_dimensions(self, word_sizes):
         """
         Get total dimensions from word measurements.
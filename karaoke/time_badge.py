@@ -0,0 +1,135 @@
+"""
+Time badge module for the remaining-time display.
+"""
+
+from collections import OrderedDict
+from .compositor import solid_layer
+from .glyph_atlas import font_lock
+from .sprites import text_layer
+from .timeline import Timeline
+
+
+class TimeBadge:
+    """
+    Remaining-time badge in the bottom right corner.
+    
+    The badge only changes when the displayed second or the waiting state
+    changes, so it is described by a small (seconds, waiting) state and each
+    state is rendered once. Background rectangles are shared between badges
+    of the same width.
+    """
+    
+    def __init__(self, text_layout, width, height, max_entries=8):
+        """
+        Initialize time badge.
+        
+        Args:
+            text_layout: TextLayout object
+            width: Frame width in pixels
+            height: Frame height in pixels
+            max_entries: Maximum number of cached badges
+        """
+        self.width = width
+        self.height = height
+        self.max_entries = max_entries
+        
+        # Font for time display
+        self.font = text_layout.font_variant(24)
+        
+        self._badges = OrderedDict()
+        self._backgrounds = {}
+    
+    def state(self, current_time, video_duration, lines_data):
+        """
+        Get the displayed state of the badge.
+        
+        Args:
+            current_time: Current time in seconds
+            video_duration: Total video duration in seconds
+            lines_data: List of line data or a Timeline (to determine if we're in waiting state)
+        
+        Returns:
+            Tuple of (remaining whole seconds, in_waiting)
+        """
+        # Calculate remaining time
+        remaining_seconds = max(0, video_duration - current_time)
+        
+        # Check if we're in waiting state (before first line or between lines)
+        # Note: any() evaluates until first True is found, optimizing most common case
+        in_waiting = True
+        if isinstance(lines_data, Timeline):
+            in_waiting = lines_data.index_at(current_time) is None
+        elif lines_data:
+            in_waiting = not any(line['start_time'] <= current_time <= line['end_time'] for line in lines_data)
+        
+        return int(remaining_seconds), in_waiting
+    
+    @staticmethod
+    def text(state):
+        """
+        Format the time display string of a badge state.
+        
+        Args:
+            state: Tuple of (remaining whole seconds, in_waiting)
+        
+        Returns:
+            Time display string
+        """
+        remaining_seconds, in_waiting = state
+        
+        # Format time display
+        minutes = remaining_seconds // 60
+        seconds = remaining_seconds % 60
+        
+        if in_waiting:
+            # Show long remaining format when waiting
+            return f"Remaining: {minutes:02d}:{seconds:02d}"
+        # Show short remaining format when singing
+        return f"{minutes:02d}:{seconds:02d}"
+    
+    def sprites(self, state):
+        """
+        Get the badge sprites for a state, rendering them on first use.
+        
+        Args:
+            state: Tuple of (remaining whole seconds, in_waiting)
+        
+        Returns:
+            List of (layer, x, y, opacity) sprites
+        """
+        badge = self._badges.get(state)
+        if badge is not None:
+            self._badges.move_to_end(state)
+            return badge
+        
+        badge = self._build(self.text(state))
+        self._badges[state] = badge
+        if len(self._badges) > self.max_entries:
+            self._badges.popitem(last=False)
+        return badge
+    
+    def _build(self, time_text):
+        """Build the background and text sprites of one badge."""
+        # Measure text
+        with font_lock(self.font):
+            time_bbox = self.font.getbbox(time_text)
+        time_width = time_bbox[2] - time_bbox[0]
+        
+        # Position in bottom right corner
+        time_x = self.width - time_width - 30
+        time_y = self.height - 50
+        
+        # Draw time with semi-transparent background
+        bg_padding = 10
+        bg_width = time_width + bg_padding * 2
+        bg_rect = self._backgrounds.get(bg_width)
+        if bg_rect is None:
+            bg_rect = solid_layer(bg_width, 35, (0, 0, 0, 128))
+            self._backgrounds[bg_width] = bg_rect
+        
+        layer, left, top = text_layer(time_text, self.font, (255, 255, 255, 255))
+        
+        return [
+            (bg_rect, time_x - bg_padding, time_y - 5, 1.0),
+            (layer, time_x + left, time_y + top, 1.0)
+        ]
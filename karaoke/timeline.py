@@ -0,0 +1,237 @@
+"""
+Timeline module for laying out lyric lines lazily.
+
+A timeline keeps only the text and timing of every line. Word timings and
+measurements are computed when a line is first shown and dropped once it
+has scrolled away, so long medleys start rendering immediately and memory
+stays proportional to the visible lines.
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+from .timing import create_word_timings
+
+
+class Timeline:
+    """Lyric lines in time order, laid out on demand."""
+    
+    def __init__(self, lyrics_data, text_layout, max_lines=8):
+        """
+        Initialize timeline.
+        
+        Args:
+            lyrics_data: List of dictionaries with 'text', 'start_time', 'end_time'
+            text_layout: TextLayout object used to measure words
+            max_lines: Maximum number of laid-out lines kept in memory
+        """
+        self.text_layout = text_layout
+        self.max_lines = max_lines
+        
+        entries = sorted(
+            ((lyric['start_time'], lyric['end_time'], lyric['text']) for lyric in lyrics_data),
+            key=lambda entry: entry[0]
+        )
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.texts = [entry[2] for entry in entries]
+        
+        # Running maximum of end times, to find the first line still playing
+        self._max_ends = []
+        max_end = None
+        for end_time in self.ends:
+            max_end = end_time if max_end is None else max(max_end, end_time)
+            self._max_ends.append(max_end)
+        
+        self._lines = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __getstate__(self):
+        # Laid-out lines and the lock stay with this process
+        state = self.__dict__.copy()
+        state['_lines'] = OrderedDict()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def relayout(self, text_layout):
+        """
+        Get a timeline of the same lines laid out with another font.
+        
+        The sorted lines are shared instead of being parsed again; only the
+        word measurements, done lazily per line, are redone.
+        
+        Args:
+            text_layout: TextLayout object used to measure words
+        
+        Returns:
+            Timeline object
+        """
+        timeline = Timeline.__new__(Timeline)
+        timeline.__setstate__({
+            'text_layout': text_layout,
+            'max_lines': self.max_lines,
+            'starts': self.starts,
+            'ends': self.ends,
+            'texts': self.texts,
+            '_max_ends': self._max_ends,
+            '_lines': OrderedDict()
+        })
+        return timeline
+    
+    def update_line(self, index, text=None, start_time=None, end_time=None):
+        """
+        Edit a line, laying out only that line again.
+        
+        Lines stay in time order, so a line whose start time moves past
+        another line's changes index. Laid-out lines other than the edited
+        one are kept.
+        
+        Args:
+            index: Line index in time order
+            text: New text (default: unchanged)
+            start_time: New start time in seconds (default: unchanged)
+            end_time: New end time in seconds (default: unchanged)
+        
+        Returns:
+            New index of the line
+        
+        Raises:
+            IndexError: If there is no line at index
+            ValueError: If the line would end before it starts
+        """
+        with self._lock:
+            if not 0 <= index < len(self.starts):
+                raise IndexError(f"Line {index} out of range (0-{len(self.starts) - 1})")
+            start = self.starts[index] if start_time is None else start_time
+            end = self.ends[index] if end_time is None else end_time
+            if end < start:
+                raise ValueError(f"Line cannot end ({end}) before it starts ({start})")
+            
+            # Lines may be shared with relaid-out timelines, edit copies
+            starts, ends, texts = list(self.starts), list(self.ends), list(self.texts)
+            del starts[index], ends[index]
+            old_text = texts.pop(index)
+            line_text = old_text if text is None else text
+            # After lines starting at the same time, like a stable sort
+            new_index = bisect.bisect_right(starts, start)
+            starts.insert(new_index, start)
+            ends.insert(new_index, end)
+            texts.insert(new_index, line_text)
+            
+            max_ends = []
+            max_end = None
+            for line_end in ends:
+                max_end = line_end if max_end is None else max(max_end, line_end)
+                max_ends.append(max_end)
+            self.starts, self.ends, self.texts, self._max_ends = starts, ends, texts, max_ends
+            self._line_moved(index, new_index)
+            
+            # Lines between the old and new index shift by one
+            lines = OrderedDict()
+            for line_index, line in self._lines.items():
+                if line_index == index:
+                    continue
+                if index < line_index <= new_index:
+                    line_index -= 1
+                elif new_index <= line_index < index:
+                    line_index += 1
+                lines[line_index] = line
+            self._lines = lines
+            return new_index
+    
+    def _line_moved(self, index, new_index):
+        """Called with the lock held after an edited line moved from index to new_index."""
+        pass
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    @property
+    def start_time(self):
+        """Start time of the first line."""
+        return self.starts[0] if self.starts else 0
+    
+    @property
+    def end_time(self):
+        """End time of the last line to finish."""
+        return self._max_ends[-1] if self._max_ends else 0
+    
+    def line(self, index):
+        """
+        Get a laid-out line, measuring its words on first use.
+        
+        Args:
+            index: Line index in time order
+        
+        Returns:
+            Line dictionary with word_timings, word_sizes, start_time,
+            end_time and text
+        """
+        # Renderers on several threads may share a timeline
+        with self._lock:
+            line = self._lines.get(index)
+            if line is not None:
+                self._lines.move_to_end(index)
+                return line
+            
+            line = self._layout(index)
+            self._lines[index] = line
+            if len(self._lines) > self.max_lines:
+                self._lines.popitem(last=False)
+            return line
+    
+    def _layout(self, index):
+        """Split a line into timed words and measure them."""
+        text = self.texts[index]
+        word_timings = create_word_timings(text, self.starts[index], self.ends[index])
+        return {
+            'word_timings': word_timings,
+            'word_sizes': self.text_layout.measure_words([wt.text for wt in word_timings]),
+            'start_time': self.starts[index],
+            'end_time': self.ends[index],
+            'text': text
+        }
+    
+    def index_at(self, current_time):
+        """
+        Find the first line being sung at a time.
+        
+        Args:
+            current_time: Current time in seconds
+        
+        Returns:
+            Line index, or None between lines
+        """
+        index = bisect.bisect_left(self._max_ends, current_time)
+        if index < len(self.starts) and self.starts[index] <= current_time:
+            return index
+        return None
+    
+    def find_lines(self, current_time):
+        """
+        Find the current and next line, like KarafunRenderer does for lists.
+        
+        Args:
+            current_time: Current time in seconds
+        
+        Returns:
+            Tuple of (current_line, next_line), either may be None
+        """
+        count = len(self.starts)
+        index = self.index_at(current_time)
+        if index is None:
+            if count and current_time < self.starts[0]:
+                # Before first line - show first two lines
+                index = 0
+            elif count and current_time > self.ends[-1]:
+                # After last line - show last line
+                return self.line(count - 1), None
+            else:
+                return None, None
+        
+        next_line = self.line(index + 1) if index + 1 < count else None
+        return self.line(index), next_line
@@ -0,0 +1,164 @@
+"""
+Title card module for the typewriter title screen.
+"""
+
+from .compositor import solid_layer
+from .glyph_atlas import font_lock
+from .sprites import SpriteCache
+
+# Constants for underline animation timing
+UNDERLINE_START_DELAY = 0.5  # Wait 0.5s after title completes before starting
+UNDERLINE_SPEED_MULTIPLIER = 2.0  # Speed at which underline progresses (2x = 0.5s duration)
+
+
+class TitleCard:
+    """
+    Song title and artist name with a typewriter animation.
+    
+    Fonts are loaded and the full strings measured once per song. The
+    visible card only changes when a character is typed or the underline
+    grows, so each distinct (title chars, artist chars, underline pixels)
+    state is built once and every other frame is a lookup.
+    """
+    
+    def __init__(self, title, artist, text_layout, width, height,
+                 typewriter_speed=0.05, sprites=None, glow=None):
+        """
+        Initialize title card.
+        
+        Args:
+            title: Song title
+            artist: Artist name (optional)
+            text_layout: TextLayout object
+            width: Frame width in pixels
+            height: Frame height in pixels
+            typewriter_speed: Speed of typewriter effect (seconds per character)
+            sprites: SpriteCache to rasterize text with (optional)
+            glow: Optional (radius, color) glow behind the title
+        """
+        self.title = title
+        self.artist = artist
+        self.width = width
+        self.height = height
+        self.typewriter_speed = typewriter_speed
+        self.sprites = sprites if sprites is not None else SpriteCache()
+        self.glow = glow
+        
+        # Create larger fonts for title and artist
+        self.title_font = text_layout.font_variant(int(text_layout.font_size * 1.8))
+        self.artist_font = text_layout.font_variant(int(text_layout.font_size * 1.2))
+        
+        # Full width for underline animation, measured once
+        with font_lock(self.title_font):
+            full_title_bbox = self.title_font.getbbox(title)
+        self.full_title_width = full_title_bbox[2] - full_title_bbox[0]
+        
+        self.chars_per_second = 1.0 / typewriter_speed if typewriter_speed > 0 else 20
+        
+        # Start showing artist after title is complete
+        self.artist_delay = len(title) * typewriter_speed
+        
+        self._cards = {}
+    
+    def state(self, current_time):
+        """
+        Calculate the visible state of the typewriter animation.
+        
+        Args:
+            current_time: Current time in seconds for animation
+        
+        Returns:
+            Tuple of (title_chars, artist_chars, underline_width) where
+            underline_width is None while the underline is hidden
+        """
+        # Calculate how many characters to display based on current time (typewriter effect)
+        title_chars_to_show = int(current_time * self.chars_per_second)
+        title_chars = min(title_chars_to_show, len(self.title))
+        title_complete = title_chars_to_show >= len(self.title)
+        
+        artist_chars = 0
+        if self.artist and current_time > self.artist_delay:
+            artist_chars_to_show = int((current_time - self.artist_delay) * self.chars_per_second)
+            artist_chars = min(artist_chars_to_show, len(self.artist))
+        
+        # Animate underline from left to right after title completes
+        underline_width = None
+        if title_complete:
+            underline_progress = min(1.0, (current_time - self.artist_delay + UNDERLINE_START_DELAY) * UNDERLINE_SPEED_MULTIPLIER)
+            if underline_progress > 0:
+                underline_width = int(self.full_title_width * underline_progress)
+        
+        return title_chars, artist_chars, underline_width
+    
+    def sprites_at(self, current_time):
+        """
+        Get the title card sprites for a time.
+        
+        Args:
+            current_time: Current time in seconds for animation
+        
+        Returns:
+            List of (layer, x, y, opacity) sprites
+        """
+        return self.card(*self.state(current_time))
+    
+    def card(self, title_chars, artist_chars, underline_width):
+        """
+        Get the sprites for a typewriter state, building them on first use.
+        
+        Args:
+            title_chars: Number of title characters typed so far
+            artist_chars: Number of artist characters typed so far
+            underline_width: Width of the title underline in pixels (None = hidden)
+        
+        Returns:
+            List of (layer, x, y, opacity) sprites
+        """
+        key = (title_chars, artist_chars, underline_width)
+        sprites = self._cards.get(key)
+        if sprites is None:
+            sprites = self._build(title_chars, artist_chars, underline_width)
+            self._cards[key] = sprites
+        return sprites
+    
+    def _build(self, title_chars, artist_chars, underline_width):
+        """Build the sprites of one typewriter state."""
+        # Display partial title with typewriter effect
+        title_display = self.title[:title_chars]
+        
+        # Measure text
+        with font_lock(self.title_font):
+            title_bbox = self.title_font.getbbox(title_display)
+        title_width = title_bbox[2] - title_bbox[0]
+        title_height = title_bbox[3] - title_bbox[1]
+        
+        # Calculate positions (centered)
+        center_y = self.height // 2
+        title_y = center_y - title_height - 40
+        artist_y = center_y + 20
+        title_x = (self.width - title_width) // 2
+        
+        # Main title text with glow effect (one cached dilate and blur pass)
+        effects = {'glow': self.glow} if self.glow else {}
+        sprites = [
+            self.sprites.place(title_display, title_x, title_y, self.title_font,
+                               (255, 255, 255, 255), **effects)
+        ]
+        
+        # Draw decorative animated underline under title (progressive from left to right)
+        if underline_width is not None:
+            line_y = title_y + title_height + 10
+            line_start_x = (self.width - self.full_title_width) // 2
+            underline = solid_layer(underline_width + 1, 3, (237, 61, 234, 255))
+            sprites.append((underline, line_start_x, line_y - 1, 1.0))
+        
+        # Draw artist name if provided and visible
+        if self.artist and artist_chars > 0:
+            artist_text = f"> {self.artist[:artist_chars]} <"
+            with font_lock(self.artist_font):
+                artist_bbox = self.artist_font.getbbox(artist_text)
+            artist_width = artist_bbox[2] - artist_bbox[0]
+            artist_x = (self.width - artist_width) // 2
+            sprites.append(self.sprites.place(artist_text, artist_x, artist_y,
+                                              self.artist_font, (200, 200, 200, 255)))
+        return sprites
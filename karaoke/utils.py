@@ -2,14 +2,25 @@
 Utility functions for karaoke effect.
 """
 
+import hashlib
 import subprocess
 import os
 import shutil
+import sys
 
 
 # Constants
 DEFAULT_OVERLAY_OPACITY = 128  # 50% opacity (0-255 scale)
 MIN_TITLE_THRESHOLD = 2.0  # Minimum seconds needed to show title
+DEFAULT_OUTLINE_COLOR = (0, 0, 0, 255)  # Stroke color for 'outline' text style
+DEFAULT_SHADOW_COLOR = (0, 0, 0, 160)  # Drop shadow color for 'shadow' text style
+DEFAULT_ASSET_CACHE_BYTES = 1 << 30  # Size cap of the on-disk asset cache (1 GiB)
+FRAME_RING_SLOTS_PER_WORKER = 4  # Frames a render worker may run ahead of the encoder
+STRIPE_MIN_ROWS = 64  # Smallest band of rows worth handing to another thread
+RENDITION_MAX_LINE_WIDTH = 0.9  # Widest lyric line of a portrait rendition, as a fraction of its width
+FRAME_STORE_BAND_ROWS = 16  # Height of the row bands a frame store deduplicates
+CHECKPOINT_SEGMENT_SECONDS = 10.0  # Video length rendered between checkpoints of a resumable render
+STREAM_SEGMENT_SECONDS = 2.0  # Length of the segments of video streamed while it renders
 
 
 def check_ffmpeg_available():
@@ -22,36 +33,31 @@ def check_ffmpeg_available():
     return shutil.which('ffmpeg') is not None
 
 
-def add_audio_to_video(video_path, audio_path, output_path, audio_offset=0.0):
+def gil_enabled():
     """
-    Add audio track to video using ffmpeg.
+    Check if the interpreter runs with the global interpreter lock.
+    
+    Returns:
+        bool: False on free-threaded builds with the GIL disabled, True otherwise
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled() if is_gil_enabled is not None else True
+
+
+def audio_input_args(audio_path, audio_offset=0.0):
+    """
+    Build the ffmpeg input arguments of an audio track.
     
     Args:
-        video_path: Path to input video file (without audio)
-        audio_path: Path to audio file to add
-        output_path: Path to output video file (with audio)
+        audio_path: Path to audio file
         audio_offset: Offset in seconds to delay/advance audio (positive = delay, negative = advance)
     
     Returns:
-        Path to output video file
-        
+        List of ffmpeg arguments adding one audio input
+    
     Raises:
-        RuntimeError: If ffmpeg command fails or ffmpeg is not available
-        FileNotFoundError: If input files don't exist
         ValueError: If audio_offset is not a valid number
     """
-    # Check if ffmpeg is available
-    if not check_ffmpeg_available():
-        raise RuntimeError(
-            "ffmpeg is not available in the system PATH. "
-            "Please install ffmpeg: https://ffmpeg.org/download.html"
-        )
-    
-    if not os.path.exists(video_path):
-        raise FileNotFoundError(f"Video file not found: {video_path}")
-    if not os.path.exists(audio_path):
-        raise FileNotFoundError(f"Audio file not found: {audio_path}")
-    
     # Validate audio_offset to prevent command injection
     try:
         audio_offset = float(audio_offset)
@@ -61,6 +67,36 @@ def add_audio_to_video(video_path, audio_path, output_path, audio_offset=0.0):
     except (ValueError, TypeError) as e:
         raise ValueError(f"Invalid audio_offset: must be a number, got {audio_offset}")
     
+    # Add audio offset if specified - MUST come before audio input
+    # Format as string with limited precision to prevent injection
+    if audio_offset != 0:
+        offset_str = f"{audio_offset:.3f}"  # Limit to 3 decimal places
+        return ['-itsoffset', offset_str, '-i', str(audio_path)]
+    return ['-i', str(audio_path)]
+
+
+def audio_mux_command(video_path, audio_path, output_path, audio_offset=0.0):
+    """
+    Build the ffmpeg command adding an audio track to a video.
+    
+    Args:
+        video_path: Path to input video file (without audio)
+        audio_path: Path to audio file to add
+        output_path: Path to output video file (with audio)
+        audio_offset: Offset in seconds to delay/advance audio (positive = delay, negative = advance)
+    
+    Returns:
+        List of command arguments
+    
+    Raises:
+        FileNotFoundError: If input files don't exist
+        ValueError: If audio_offset is not a valid number
+    """
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    
     # Build ffmpeg command
     # -y: overwrite output file
     # -i: input files
@@ -72,22 +108,44 @@ def add_audio_to_video(video_path, audio_path, output_path, audio_offset=0.0):
         'ffmpeg',
         '-y',  # Overwrite output
         '-i', video_path,  # Video input
+        *audio_input_args(audio_path, audio_offset)
     ]
     
-    # Add audio offset if specified - MUST come before audio input
-    # Format as string with limited precision to prevent injection
-    if audio_offset != 0:
-        offset_str = f"{audio_offset:.3f}"  # Limit to 3 decimal places
-        cmd.extend(['-itsoffset', offset_str, '-i', audio_path])
-    else:
-        cmd.extend(['-i', audio_path])
-    
     cmd.extend([
         '-c:v', 'copy',  # Copy video stream
         '-c:a', 'aac',  # Encode audio as AAC
         '-shortest',  # End when shortest stream ends
         output_path
     ])
+    return cmd
+
+
+def add_audio_to_video(video_path, audio_path, output_path, audio_offset=0.0):
+    """
+    Add audio track to video using ffmpeg.
+    
+    Args:
+        video_path: Path to input video file (without audio)
+        audio_path: Path to audio file to add
+        output_path: Path to output video file (with audio)
+        audio_offset: Offset in seconds to delay/advance audio (positive = delay, negative = advance)
+    
+    Returns:
+        Path to output video file
+    
+    Raises:
+        RuntimeError: If ffmpeg command fails or ffmpeg is not available
+        FileNotFoundError: If input files don't exist
+        ValueError: If audio_offset is not a valid number
+    """
+    # Check if ffmpeg is available
+    if not check_ffmpeg_available():
+        raise RuntimeError(
+            "ffmpeg is not available in the system PATH. "
+            "Please install ffmpeg: https://ffmpeg.org/download.html"
+        )
+    
+    cmd = audio_mux_command(video_path, audio_path, output_path, audio_offset)
     
     try:
         result = subprocess.run(
@@ -101,6 +159,23 @@ def add_audio_to_video(video_path, audio_path, output_path, audio_offset=0.0):
         raise RuntimeError(f"ffmpeg failed: {e.stderr}")
 
 
+def file_hash(path):
+    """
+    Hash the contents of a file.
+    
+    Args:
+        path: Path to the file
+    
+    Returns:
+        SHA-256 hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def map_in_range(value, in_min, in_max, out_min, out_max, constrain=False):
     """
     Map a value from one range to another.
@@ -135,7 +210,7 @@ def parse_text_style(styles):
     Parse text style string into style attributes.
     
     Args:
-        styles: Space-separated style string (e.g., 'bold italic underline')
+        styles: Space-separated style string (e.g., 'bold italic underline outline')
     
     Returns:
         Dictionary with style attributes
@@ -154,5 +229,9 @@ def parse_text_style(styles):
         style_object['underline'] = True
     if 'uppercase' in style_array:
         style_object['uppercase'] = True
+    if 'outline' in style_array:
+        style_object['outline'] = True
+    if 'shadow' in style_array:
+        style_object['shadow'] = True
     
     return style_object
@@ -0,0 +1,212 @@
+"""
+Test the asyncio API and render progress reporting.
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import karaoke.sinks
+from karaoke import generate_karafun_video, generate_karafun_video_async, karafun_video_events
+from karaoke.aio import add_audio_to_video_async
+from karaoke.utils import audio_mux_command, check_ffmpeg_available
+
+
+LYRICS = [
+    {'text': 'Rendered off the loop', 'start_time': 0, 'end_time': 1.5},
+    {'text': 'While the service keeps serving', 'start_time': 1.5, 'end_time': 3}
+]
+
+SETTINGS = {'width': 320, 'height': 180, 'fps': 10, 'font_size': 24}
+
+
+class FakeStreamingFFmpeg:
+    """Stands in for a streaming ffmpeg, writing the files of an HLS stream."""
+    
+    def __init__(self, command, stdin=None, stderr=None):
+        playlist = command[-1]
+        stem = playlist[:-len('.m3u8')]
+        for path in (playlist, f'{stem}_init.mp4', f'{stem}_00000.m4s', f'{stem}_00001.m4s.tmp'):
+            with open(path, 'wb') as f:
+                f.write(b'\0')
+        self.stdin = open(os.devnull, 'wb')
+        self.stderr = io.BytesIO()
+    
+    def wait(self):
+        return 0
+
+
+def test_progress_callback():
+    """Test that generate_karafun_video reports every frame, also when resuming."""
+    print("Testing render progress callback...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        reports = []
+        generate_karafun_video(LYRICS, os.path.join(directory, 'video.mp4'),
+                               progress_callback=lambda *report: reports.append(report), **SETTINGS)
+        assert reports == [(n, 30) for n in range(1, 31)]
+        
+        # An exception from the callback stops the render
+        def stop_at_15(frames, total_frames):
+            if frames == 15:
+                raise KeyboardInterrupt
+        checkpoint_dir = os.path.join(directory, 'checkpoint')
+        try:
+            generate_karafun_video(LYRICS, os.path.join(directory, 'resumed.mp4'),
+                                   checkpoint_dir=checkpoint_dir, segment_seconds=1.0,
+                                   progress_callback=stop_at_15, **SETTINGS)
+            assert False, "Render should have stopped"
+        except KeyboardInterrupt:
+            pass
+        
+        # The resumed render counts the finished segment as done
+        reports = []
+        generate_karafun_video(LYRICS, os.path.join(directory, 'resumed.mp4'),
+                               checkpoint_dir=checkpoint_dir, segment_seconds=1.0, resume=True,
+                               progress_callback=lambda *report: reports.append(report), **SETTINGS)
+        assert reports == [(n, 30) for n in range(11, 31)]
+    
+    print("✓ Render progress callback test passed")
+
+
+def test_events():
+    """Test progress events and concurrent renders on one loop."""
+    print("Testing async render events...")
+    
+    async def render_all(directory):
+        events = [event async for event in karafun_video_events(
+            LYRICS, os.path.join(directory, 'events.mp4'), **SETTINGS)]
+        # Several renders share the loop, on a bounded executor
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            paths = await asyncio.gather(*(
+                generate_karafun_video_async(LYRICS, os.path.join(directory, f'{i}.mp4'),
+                                             executor=executor, **SETTINGS)
+                for i in range(3)
+            ))
+        return events, paths
+    
+    with tempfile.TemporaryDirectory() as directory:
+        events, paths = asyncio.run(render_all(directory))
+        renders = [event for event in events if event['stage'] == 'render']
+        assert [event['frames'] for event in renders] == list(range(1, 31))
+        assert events[-1] == {'stage': 'done', 'output_path': os.path.join(directory, 'events.mp4'),
+                              'audio_error': None}
+        
+        direct = os.path.join(directory, 'direct.mp4')
+        generate_karafun_video(LYRICS, direct, **SETTINGS)
+        with open(direct, 'rb') as f:
+            expected = f.read()
+        for path in [events[-1]['output_path']] + paths:
+            with open(path, 'rb') as f:
+                assert f.read() == expected
+    
+    print("✓ Async render events test passed")
+
+
+def test_cancel():
+    """Test that cancelling a render stops it and removes the partial output."""
+    print("Testing async render cancellation...")
+    
+    async def cancel_render(output_path, **settings):
+        started = asyncio.Event()
+        frames = []
+        
+        def progress(event):
+            if event['stage'] == 'render':
+                frames.append(event['frames'])
+                started.set()
+        
+        long_lyrics = [dict(LYRICS[i % 2], start_time=i * 1.5, end_time=(i + 1) * 1.5)
+                       for i in range(40)]
+        task = asyncio.create_task(generate_karafun_video_async(
+            long_lyrics, output_path, progress_callback=progress, **SETTINGS, **settings))
+        await started.wait()
+        task.cancel()
+        try:
+            await task
+            assert False, "Render should have been cancelled"
+        except asyncio.CancelledError:
+            pass
+        return frames
+    
+    with tempfile.TemporaryDirectory() as directory:
+        output_path = os.path.join(directory, 'cancelled.mp4')
+        frames = asyncio.run(cancel_render(output_path))
+        assert frames[-1] < 600
+        assert os.listdir(directory) == []
+        
+        # A cancelled stream removes its segments as well
+        original_check, original_popen = karaoke.sinks.check_ffmpeg_available, karaoke.sinks.subprocess.Popen
+        karaoke.sinks.check_ffmpeg_available = lambda: True
+        karaoke.sinks.subprocess.Popen = FakeStreamingFFmpeg
+        try:
+            asyncio.run(cancel_render(os.path.join(directory, 'live.m3u8'), streaming=True))
+        finally:
+            karaoke.sinks.check_ffmpeg_available = original_check
+            karaoke.sinks.subprocess.Popen = original_popen
+        assert os.listdir(directory) == []
+    
+    print("✓ Async render cancellation test passed")
+
+
+def test_audio():
+    """Test the async audio mux command and its fallback without ffmpeg."""
+    print("Testing async audio...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        video_path = os.path.join(directory, 'video.mp4')
+        audio_path = os.path.join(directory, 'audio.mp3')
+        for path in (video_path, audio_path):
+            with open(path, 'wb') as f:
+                f.write(b'\0')
+        cmd = audio_mux_command(video_path, audio_path, 'out.mp4', 1.5)
+        assert cmd[cmd.index('-itsoffset') + 1] == '1.500'
+        try:
+            audio_mux_command(video_path, os.path.join(directory, 'missing.mp3'), 'out.mp4')
+            assert False, "Missing audio should raise"
+        except FileNotFoundError:
+            pass
+        
+        if not check_ffmpeg_available():
+            try:
+                asyncio.run(add_audio_to_video_async(video_path, audio_path, 'out.mp4'))
+                assert False, "Muxing without ffmpeg should raise"
+            except RuntimeError:
+                pass
+            
+            # The video is kept without audio, and the event says why
+            async def render_with_audio():
+                return [event async for event in karafun_video_events(
+                    LYRICS, os.path.join(directory, 'with_audio.mp4'), audio_path=audio_path,
+                    **SETTINGS)]
+            events = asyncio.run(render_with_audio())
+            assert [event['stage'] for event in events[-2:]] == ['audio', 'done']
+            assert 'ffmpeg' in events[-1]['audio_error']
+            assert os.path.getsize(os.path.join(directory, 'with_audio.mp4')) > 0
+            assert sorted(os.listdir(directory)) == ['audio.mp3', 'video.mp4', 'with_audio.mp4']
+    
+    print("✓ Async audio test passed")
+
+
+def run_all_tests():
+    """Run all asyncio API tests."""
+    print("=" * 50)
+    print("Running Asyncio API Tests")
+    print("=" * 50 + "\n")
+    
+    test_progress_callback()
+    print()
+    test_events()
+    print()
+    test_cancel()
+    print()
+    test_audio()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,115 @@
+"""
+Test the on-disk cache of preprocessed backgrounds.
+"""
+
+import os
+import tempfile
+import numpy as np
+from PIL import Image
+from karaoke.asset_cache import AssetCache, load_background
+from karaoke.karafun_renderer import KarafunRenderer
+
+
+def _write_image(path, color):
+    """Write a small gradient image to use as a background."""
+    gradient = np.linspace(0, 255, 64 * 48, dtype=np.float64).reshape(48, 64)
+    pixels = np.dstack([gradient * c / 255 for c in color]).astype(np.uint8)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_background_hit():
+    """Test that a cached background matches decoding it again."""
+    print("Testing asset cache hit...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_path = _write_image(os.path.join(tmp_dir, 'bg.png'), (255, 128, 0))
+        cache = AssetCache(os.path.join(tmp_dir, 'cache'))
+        
+        expected = load_background(image_path, 160, 90)
+        first = cache.background(image_path, 160, 90)
+        second = cache.background(image_path, 160, 90)
+        
+        assert isinstance(second, np.memmap)
+        assert np.array_equal(first, expected)
+        assert np.array_equal(second, expected)
+        assert len(os.listdir(cache.cache_dir)) == 1
+        
+        # Renderers sharing the cache start from the same background
+        renderer = KarafunRenderer(width=160, height=90, bg_image=image_path, asset_cache=cache)
+        assert np.array_equal(renderer._background, expected)
+        assert len(os.listdir(cache.cache_dir)) == 1
+        
+        # A different size is a different entry
+        cache.background(image_path, 80, 45)
+        assert len(os.listdir(cache.cache_dir)) == 2
+    
+    print("✓ Asset cache hit test passed")
+
+
+def test_eviction():
+    """Test that the least recently used entry is evicted over the size cap."""
+    print("Testing asset cache eviction...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [_write_image(os.path.join(tmp_dir, f'bg{i}.png'), color)
+                 for i, color in enumerate([(255, 0, 0), (0, 255, 0), (0, 0, 255)])]
+        
+        # Room for two 160x90 backgrounds but not three
+        cache = AssetCache(os.path.join(tmp_dir, 'cache'), max_bytes=2 * 160 * 90 * 3 + 512)
+        cache.background(paths[0], 160, 90)
+        first_entry = next(cache.cache_dir.glob('bg-*.npy'))
+        cache.background(paths[1], 160, 90)
+        second_entry = next(e for e in cache.cache_dir.glob('bg-*.npy') if e != first_entry)
+        
+        # The first entry was used more recently than the second
+        os.utime(second_entry, (1000, 1000))
+        os.utime(first_entry, (2000, 2000))
+        
+        cache.background(paths[2], 160, 90)
+        assert cache.size() <= cache.max_bytes
+        assert first_entry.exists()
+        assert not second_entry.exists()
+        assert len(list(cache.cache_dir.glob('bg-*.npy'))) == 2
+    
+    print("✓ Asset cache eviction test passed")
+
+
+def test_corrupt_entry_rebuilt():
+    """Test that a truncated cache entry is rebuilt."""
+    print("Testing corrupt asset cache entry...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_path = _write_image(os.path.join(tmp_dir, 'bg.png'), (0, 128, 255))
+        cache = AssetCache(os.path.join(tmp_dir, 'cache'))
+        cache.background(image_path, 160, 90)
+        
+        entry = next(cache.cache_dir.glob('bg-*.npy'))
+        with open(entry, 'r+b') as f:
+            f.truncate(64)
+        
+        background = cache.background(image_path, 160, 90)
+        assert np.array_equal(background, load_background(image_path, 160, 90))
+    
+    print("✓ Corrupt asset cache entry test passed")
+
+
+def run_all_tests():
+    """Run all asset cache tests."""
+    print("=" * 50)
+    print("Running Asset Cache Tests")
+    print("=" * 50 + "\n")
+    
+    test_background_hit()
+    print()
+    test_eviction()
+    print()
+    test_corrupt_entry_rebuilt()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,133 @@
+"""
+Test resuming an interrupted checkpointed render.
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+import karaoke.main
+from karaoke import generate_karafun_video
+
+
+LYRICS = [
+    {'text': 'Long renders can stop', 'start_time': 0, 'end_time': 1.5},
+    {'text': 'And pick up where they were', 'start_time': 1.5, 'end_time': 3}
+]
+
+SETTINGS = {'width': 320, 'height': 180, 'fps': 10, 'font_size': 24, 'show_time': True,
+            'segment_seconds': 1.0}
+
+
+class FrameRecorder:
+    """Stands in for cv2.VideoWriter, keeping the written frames."""
+    
+    videos = []
+    
+    def __init__(self, *args):
+        self.frames = []
+        FrameRecorder.videos.append(self.frames)
+    
+    def write(self, frame):
+        self.frames.append(np.array(frame))
+    
+    def release(self):
+        pass
+
+
+def test_resume():
+    """Test that a resumed render only renders what is missing and matches a full render."""
+    print("Testing checkpointed render resume...")
+    
+    FrameRecorder.videos = []
+    original_writer = karaoke.main.cv2.VideoWriter
+    original_write_frames = karaoke.main._write_frames
+    rendered = []
+    preempt = {'at_frame': 20}
+    
+    def write_frames(out, job, render, start, stop, *args):
+        if preempt['at_frame'] is not None and start >= preempt['at_frame']:
+            raise RuntimeError("Preempted")
+        rendered.append((start, stop))
+        original_write_frames(out, job, render, start, stop, *args)
+    
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    karaoke.main._write_frames = write_frames
+    try:
+        generate_karafun_video(LYRICS, 'unused.mp4', **dict(SETTINGS, segment_seconds=10))
+        expected = FrameRecorder.videos[0]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_dir = os.path.join(directory, 'checkpoint')
+            try:
+                generate_karafun_video(LYRICS, 'unused.mp4', checkpoint_dir=checkpoint_dir, **SETTINGS)
+                assert False, "Render should have been preempted"
+            except RuntimeError:
+                pass
+            with open(os.path.join(checkpoint_dir, 'manifest.json'), encoding='utf-8') as f:
+                assert json.load(f)['completed'] == [0, 1]
+            # Files that are not part of the checkpoint are left alone
+            with open(os.path.join(checkpoint_dir, 'notes.txt'), 'w') as f:
+                f.write('keep me')
+            
+            # A different render cannot resume the checkpoint
+            try:
+                generate_karafun_video(LYRICS[:1], 'unused.mp4', checkpoint_dir=checkpoint_dir,
+                                       resume=True, **SETTINGS)
+                assert False, "Resuming another render's checkpoint should raise"
+            except ValueError:
+                pass
+            
+            preempt['at_frame'] = None
+            rendered.clear()
+            generate_karafun_video(LYRICS, 'unused.mp4', checkpoint_dir=checkpoint_dir, resume=True,
+                                   **SETTINGS)
+            # Only the last segment was rendered again
+            assert rendered == [(20, 30)]
+            assert os.listdir(checkpoint_dir) == ['notes.txt']
+    finally:
+        karaoke.main.cv2.VideoWriter = original_writer
+        karaoke.main._write_frames = original_write_frames
+    
+    resumed = FrameRecorder.videos[-1]
+    assert len(resumed) == len(expected) == 30
+    assert all(np.array_equal(a, b) for a, b in zip(resumed, expected))
+    
+    print("✓ Checkpointed render resume test passed")
+
+
+def test_identical_file():
+    """Test that a checkpointed render writes the same file as a direct one."""
+    print("Testing checkpointed output file...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        direct = os.path.join(directory, 'direct.mp4')
+        checkpointed = os.path.join(directory, 'checkpointed.mp4')
+        generate_karafun_video(LYRICS, direct, **SETTINGS)
+        # Segments rendered by worker processes end up in the same file
+        generate_karafun_video(LYRICS, checkpointed, checkpoint_dir=os.path.join(directory, 'segments'),
+                               resume=True, workers=2, **SETTINGS)
+        with open(direct, 'rb') as a, open(checkpointed, 'rb') as b:
+            assert a.read() == b.read()
+        assert not os.path.exists(os.path.join(directory, 'segments'))
+    
+    print("✓ Checkpointed output file test passed")
+
+
+def run_all_tests():
+    """Run all checkpoint tests."""
+    print("=" * 50)
+    print("Running Checkpoint Tests")
+    print("=" * 50 + "\n")
+    
+    test_resume()
+    print()
+    test_identical_file()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,114 @@
+"""
+Test the premultiplied-alpha compositor against Pillow's compositing.
+"""
+
+import numpy as np
+from PIL import Image
+from karaoke.compositor import (
+    Compositor, mask_layer, premultiply, solid_layer, unpremultiply
+)
+
+
+def _random_rgba(rng, height, width):
+    return rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+
+
+def test_over_matches_pil():
+    """Test that blending over an opaque canvas matches Image.alpha_composite."""
+    print("Testing compositor over PIL reference...")
+    
+    rng = np.random.default_rng(0)
+    background = _random_rgba(rng, 48, 64)
+    background[:, :, 3] = 255
+    foreground = _random_rgba(rng, 20, 30)
+    
+    # Reference: Pillow straight-alpha compositing
+    reference = Image.fromarray(background, 'RGBA')
+    reference.alpha_composite(Image.fromarray(foreground, 'RGBA'), (10, 5))
+    reference = np.array(reference)[:, :, 2::-1]
+    
+    compositor = Compositor(64, 48)
+    canvas = np.ascontiguousarray(background[:, :, 2::-1])
+    compositor.over(canvas, premultiply(foreground), 10, 5)
+    
+    difference = np.abs(canvas.astype(int) - reference.astype(int))
+    assert difference.max() <= 2, f"Max difference {difference.max()} exceeds tolerance"
+    
+    print("✓ Compositor over test passed")
+
+
+def test_transparent_canvas():
+    """Test blending onto a premultiplied BGRA canvas."""
+    print("Testing compositor with alpha canvas...")
+    
+    compositor = Compositor(16, 16)
+    canvas = compositor.new_canvas((0, 0, 0, 0), channels=4)
+    compositor.over(canvas, solid_layer(8, 8, (255, 0, 0, 128)), 4, 4)
+    
+    straight = unpremultiply(canvas)
+    assert straight[0, 0, 3] == 0
+    assert straight[8, 8, 3] == 128
+    assert abs(int(straight[8, 8, 2]) - 255) <= 1, "Red should survive premultiplication"
+    assert straight[8, 8, 0] == 0
+    
+    print("✓ Compositor alpha canvas test passed")
+
+
+def test_clipping_and_opacity():
+    """Test layers partially off-canvas and extra opacity."""
+    print("Testing compositor clipping and opacity...")
+    
+    compositor = Compositor(20, 10)
+    canvas = compositor.new_canvas((0, 0, 0, 255))
+    layer = mask_layer(np.full((6, 6), 255, dtype=np.uint8), (255, 255, 255, 255))
+    
+    compositor.over(canvas, layer, -3, -3)
+    compositor.over(canvas, layer, 17, 7, opacity=0.5)
+    compositor.over(canvas, layer, 100, 100)
+    
+    assert canvas[0, 0, 0] == 255 and canvas[2, 2, 0] == 255 and canvas[3, 3, 0] == 0
+    assert abs(int(canvas[9, 19, 0]) - 128) <= 1
+    assert canvas[5, 10, 0] == 0
+    
+    print("✓ Compositor clipping test passed")
+
+
+def test_steady_state_reuses_buffers():
+    """Test that scratch buffers are not reallocated once warmed up."""
+    print("Testing compositor buffer reuse...")
+    
+    compositor = Compositor(64, 64)
+    canvas = compositor.new_canvas()
+    layer = solid_layer(32, 32, (10, 20, 30, 100))
+    
+    compositor.over(canvas, layer, 0, 0)
+    scratch = compositor._product
+    for x in range(0, 32, 4):
+        compositor.over(canvas, layer, x, x, opacity=0.7)
+        compositor.fill_rect(canvas, 0, 0, 16, 16, (0, 0, 0, 50))
+    assert compositor._product is scratch, "Scratch buffers should be reused"
+    
+    print("✓ Compositor buffer reuse test passed")
+
+
+def run_all_tests():
+    """Run all compositor tests."""
+    print("=" * 50)
+    print("Running Compositor Tests")
+    print("=" * 50 + "\n")
+    
+    test_over_matches_pil()
+    print()
+    test_transparent_canvas()
+    print()
+    test_clipping_and_opacity()
+    print()
+    test_steady_state_reuses_buffers()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,137 @@
+"""
+Test random-access frame rendering and contact sheets.
+"""
+
+import os
+import tempfile
+import cv2
+import numpy as np
+import karaoke.main
+from karaoke import contact_sheet, generate_karafun_video, render_frame_at
+from karaoke.cli import main
+from karaoke.contact_sheet import SHEET_GAP, format_time, sample_times
+
+
+LYRICS = [
+    {'text': 'Any frame at any time', 'start_time': 2, 'end_time': 3.5},
+    {'text': 'Without rendering the rest', 'start_time': 4.5, 'end_time': 6}
+]
+
+CONFIG = {
+    'lyrics_data': LYRICS, 'width': 320, 'height': 180, 'fps': 10, 'font_size': 24,
+    'show_time': True, 'title_duration': 2.0, 'song_title': 'Random Access',
+    'artist_name': 'Test Artist', 'output_path': 'unused.mp4', 'audio_path': None
+}
+
+
+class FrameRecorder:
+    """Stands in for cv2.VideoWriter, keeping the written frames."""
+    
+    frames = []
+    
+    def __init__(self, *args):
+        FrameRecorder.frames = []
+    
+    def write(self, frame):
+        FrameRecorder.frames.append(np.array(frame))
+    
+    def release(self):
+        pass
+
+
+def test_render_frame_at():
+    """Test that frames rendered at a time match the frames of the video."""
+    print("Testing random-access frame rendering...")
+    
+    original_writer = karaoke.main.cv2.VideoWriter
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    try:
+        generate_karafun_video(**CONFIG)
+    finally:
+        karaoke.main.cv2.VideoWriter = original_writer
+    
+    expected = FrameRecorder.frames
+    assert len(expected) == 80
+    # Title screen, first line, pause with the remaining time, second line
+    frame_numbers = [5, 47, 60, 70]
+    frames = render_frame_at(CONFIG, [n / CONFIG['fps'] for n in frame_numbers])
+    assert all(np.array_equal(frame, expected[n]) for frame, n in zip(frames, frame_numbers))
+    assert np.array_equal(render_frame_at(CONFIG, 4.7), expected[47])
+    
+    try:
+        render_frame_at(dict(CONFIG, fontsize=24), 1.0)
+        assert False, "Unknown setting should raise"
+    except TypeError:
+        pass
+    try:
+        render_frame_at({'width': 320}, 1.0)
+        assert False, "Missing lyrics should raise"
+    except ValueError:
+        pass
+    
+    print("✓ Random-access frame rendering test passed")
+
+
+def test_contact_sheet():
+    """Test the contact sheet grid, in this process and with workers."""
+    print("Testing contact sheet...")
+    
+    assert sample_times(8.0, 4) == [1.0, 3.0, 5.0, 7.0]
+    assert format_time(65.25) == '1:05.2'
+    
+    sheet = contact_sheet(CONFIG, count=5, columns=3, thumb_width=160)
+    # Two rows of three 160 x 90 thumbnails
+    assert sheet.shape == (2 * 90 + 3 * SHEET_GAP, 3 * 160 + 4 * SHEET_GAP, 3)
+    
+    parallel = contact_sheet(CONFIG, count=5, columns=3, thumb_width=160, workers=2)
+    assert np.array_equal(sheet, parallel)
+    
+    # Unlabelled thumbnails are the frames, shrunk
+    times = [0.5, 4.7]
+    plain = contact_sheet(CONFIG, times=times, columns=2, thumb_width=320, labels=False)
+    frames = render_frame_at(CONFIG, times)
+    x = SHEET_GAP * 2 + 320
+    assert np.array_equal(plain[SHEET_GAP:SHEET_GAP + 180, SHEET_GAP:SHEET_GAP + 320], frames[0])
+    assert np.array_equal(plain[SHEET_GAP:SHEET_GAP + 180, x:x + 320], frames[1])
+    
+    print("✓ Contact sheet test passed")
+
+
+def test_sheet_command():
+    """Test the sheet subcommand."""
+    print("Testing sheet command...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write('{"lyrics": [{"text": "Sheet", "start_time": 0, "end_time": 2}],'
+                    ' "video": {"width": 320, "height": 180}}')
+        output_path = os.path.join(directory, 'sheet.png')
+        assert main(['sheet', config_path, output_path, '--count', '4', '--columns', '2',
+                     '--thumb-width', '100']) == 0
+        sheet = cv2.imread(output_path)
+        assert sheet.shape == (2 * 56 + 3 * SHEET_GAP, 2 * 100 + 3 * SHEET_GAP, 3)
+        assert main(['sheet', os.path.join(directory, 'missing.json'), output_path]) == 1
+    
+    print("✓ Sheet command test passed")
+
+
+def run_all_tests():
+    """Run all contact sheet tests."""
+    print("=" * 50)
+    print("Running Contact Sheet Tests")
+    print("=" * 50 + "\n")
+    
+    test_render_frame_at()
+    print()
+    test_contact_sheet()
+    print()
+    test_sheet_command()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
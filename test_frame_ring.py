@@ -0,0 +1,130 @@
+"""
+Test passing frames from render workers to the encoder through shared memory.
+"""
+
+import multiprocessing
+import numpy as np
+import karaoke.main
+from karaoke import generate_karafun_video
+from karaoke.frame_ring import FrameRing
+
+
+class FrameRecorder:
+    """Stand-in for cv2.VideoWriter that keeps copies of the written frames."""
+    
+    frames = []
+    
+    def __init__(self, *args):
+        FrameRecorder.frames = []
+    
+    def write(self, frame):
+        FrameRecorder.frames.append(np.array(frame))
+    
+    def release(self):
+        pass
+
+
+def _produce(ring, count):
+    """Write frames filled with their own index into a ring."""
+    for index in range(count):
+        ring.acquire(index)[:] = index
+        ring.publish(index)
+    ring.close()
+
+
+def test_frame_ring():
+    """Test frame order, back-pressure and slot reuse across processes."""
+    print("Testing frame ring...")
+    
+    context = multiprocessing.get_context()
+    with FrameRing(32, 16, slots=3, context=context) as ring:
+        # A slot cannot be written again before the encoder has read it
+        assert ring.acquire(0) is not None
+        assert ring.acquire(3, timeout=0.05) is None
+        ring.publish(0)
+        assert ring.wait(0)[0, 0, 0] == 0
+        ring.release(0)
+        
+        # Slots are handed back in frame order and reused for later frames
+        producer = context.Process(target=_produce, args=(ring, 20))
+        producer.start()
+        
+        received = []
+        for index in range(20):
+            frame = ring.wait(index, timeout=10)
+            assert frame is not None
+            received.append(int(frame[8, 16, 1]))
+            del frame
+            ring.release(index)
+        producer.join()
+        
+        assert received == list(range(20))
+        assert producer.exitcode == 0
+    
+    print("✓ Frame ring test passed")
+
+
+def test_parallel_render_matches_serial():
+    """Test that rendering in worker processes writes the same frames."""
+    print("Testing parallel Karafun rendering...")
+    
+    lyrics_data = [
+        {'text': 'Hello world from the workers', 'start_time': 2.5, 'end_time': 4},
+        {'text': 'Second line here', 'start_time': 4, 'end_time': 5.5}
+    ]
+    settings = {
+        'width': 320,
+        'height': 180,
+        'fps': 10,
+        'font_size': 24,
+        'song_title': 'Parallel',
+        'artist_name': 'Tester',
+        'title_duration': 1.0,
+        'show_time': True
+    }
+    
+    renderers = []
+    
+    class CountingRenderer(karaoke.main.KarafunRenderer):
+        def __init__(self, *args, **kwargs):
+            renderers.append(self)
+            super().__init__(*args, **kwargs)
+    
+    original_writer, original_renderer = karaoke.main.cv2.VideoWriter, karaoke.main.KarafunRenderer
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    karaoke.main.KarafunRenderer = CountingRenderer
+    try:
+        generate_karafun_video(lyrics_data, 'unused.mp4', **settings)
+        serial = FrameRecorder.frames
+        assert len(renderers) == 1
+        generate_karafun_video(lyrics_data, 'unused.mp4', workers=3, **settings)
+        parallel = FrameRecorder.frames
+    finally:
+        karaoke.main.cv2.VideoWriter, karaoke.main.KarafunRenderer = original_writer, original_renderer
+    
+    # Only the workers set up renderers
+    assert len(renderers) == 1
+    assert len(serial) == len(parallel) == 65
+    for a, b in zip(serial, parallel):
+        assert np.array_equal(a, b)
+    
+    print("✓ Parallel Karafun rendering test passed")
+
+
+def run_all_tests():
+    """Run all frame ring tests."""
+    print("=" * 50)
+    print("Running Frame Ring Tests")
+    print("=" * 50 + "\n")
+    
+    test_frame_ring()
+    print()
+    test_parallel_render_matches_serial()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,151 @@
+"""
+Test spooling frames to a frame store and encoding them from it.
+"""
+
+import os
+import tempfile
+import numpy as np
+import karaoke.main
+from karaoke import generate_karafun_video
+from karaoke.frame_store import FrameStore, FrameStoreWriter, encode_frame_store
+from karaoke.utils import check_ffmpeg_available
+
+
+class FrameRecorder:
+    """Stands in for cv2.VideoWriter, keeping the written frames."""
+    
+    def __init__(self, *args):
+        self.frames = []
+    
+    def write(self, frame):
+        self.frames.append(np.array(frame))
+    
+    def release(self):
+        pass
+
+
+def test_round_trip():
+    """Test that frames read back exactly and static bands are stored once."""
+    print("Testing frame store round trip...")
+    
+    rng = np.random.default_rng(0)
+    # A height that is not a whole number of bands, with alpha
+    base = rng.integers(0, 256, (50, 24, 4), dtype=np.uint8)
+    frames = []
+    for i in range(6):
+        frame = base.copy()
+        if i >= 3:
+            # Only rows 20-21 change from frame 3 on
+            frame[20:22] = i
+        frames.append(frame)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        writer = FrameStoreWriter(directory, 24, 50, 25, channels=4, band_rows=16)
+        try:
+            FrameStore(directory)
+            assert False, "Incomplete store should not open"
+        except FileNotFoundError:
+            pass
+        for frame in frames:
+            writer.write(frame)
+        writer.release()
+        
+        store = FrameStore(directory)
+        assert len(store) == 6 and store.fps == 25
+        # 4 bands for the first frame, then one for each changed frame
+        assert store.stored_bands == 4 + 3
+        for i, frame in enumerate(frames):
+            assert np.array_equal(store[i], frame)
+        assert np.array_equal(store[-1], frames[-1])
+        try:
+            store[6]
+            assert False, "Out of range frame should raise"
+        except IndexError:
+            pass
+        
+        recorder = FrameRecorder()
+        store.encode(recorder, start=2, stop=5)
+        assert len(recorder.frames) == 3
+        assert all(np.array_equal(a, b) for a, b in zip(recorder.frames, frames[2:5]))
+        
+        try:
+            encode_frame_store(directory, os.path.join(directory, 'alpha.mp4'))
+            assert False, "Alpha frames without ffmpeg codec args should raise"
+        except ValueError:
+            pass
+        if not check_ffmpeg_available():
+            try:
+                encode_frame_store(directory, os.path.join(directory, 'alpha.mov'), ['-c:v', 'png'])
+                assert False, "Encoding with ffmpeg should raise without ffmpeg"
+            except RuntimeError:
+                pass
+    
+    print("✓ Frame store round trip test passed")
+
+
+def test_render_once_encode_many():
+    """Test that a video's frames can be encoded again from its frame store."""
+    print("Testing render once, encode many...")
+    
+    lyrics_data = [
+        {'text': 'Rendered only once', 'start_time': 0, 'end_time': 1.5},
+        {'text': 'Encoded many times', 'start_time': 1.5, 'end_time': 3}
+    ]
+    
+    with tempfile.TemporaryDirectory() as directory:
+        store_dir = os.path.join(directory, 'frames')
+        recorders = []
+        original_writer = karaoke.main.cv2.VideoWriter
+        
+        def recorder(*args):
+            recorders.append(FrameRecorder())
+            return recorders[-1]
+        
+        karaoke.main.cv2.VideoWriter = recorder
+        try:
+            generate_karafun_video(lyrics_data, os.path.join(directory, 'video.mp4'), width=320,
+                                   height=180, fps=10, font_size=24, show_time=True,
+                                   frame_store_dir=store_dir)
+        finally:
+            karaoke.main.cv2.VideoWriter = original_writer
+        
+        rendered = recorders[0].frames
+        store = FrameStore(store_dir)
+        assert len(store) == len(rendered) == 30
+        assert all(np.array_equal(store[i], frame) for i, frame in enumerate(rendered))
+        # Frames between fill steps repeat, the store keeps only what changed
+        assert store.nbytes < sum(frame.nbytes for frame in rendered) / 3
+        
+        output_path = os.path.join(directory, 'again.mp4')
+        assert encode_frame_store(store_dir, output_path) == output_path
+        assert os.path.getsize(output_path) > 0
+        
+        # ffmpeg composited frames lack the background, they are not stored
+        try:
+            generate_karafun_video(lyrics_data, os.path.join(directory, 'composited.mp4'),
+                                   compositing='ffmpeg', frame_store_dir=os.path.join(directory, 'lyrics'))
+            assert False, "Storing ffmpeg composited frames should raise"
+        except ValueError:
+            pass
+        assert not os.path.exists(os.path.join(directory, 'lyrics'))
+    
+    print("✓ Render once, encode many test passed")
+
+
+def run_all_tests():
+    """Run all frame store tests."""
+    print("=" * 50)
+    print("Running Frame Store Tests")
+    print("=" * 50 + "\n")
+    
+    test_round_trip()
+    print()
+    test_render_once_encode_many()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
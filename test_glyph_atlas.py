@@ -0,0 +1,136 @@
+"""
+Test the glyph atlas against Pillow's text rasterization.
+"""
+
+import gc
+import os
+import tempfile
+import numpy as np
+from PIL import Image, ImageDraw
+import karaoke.glyph_atlas
+from karaoke.glyph_atlas import MAX_SHARED_ATLASES, GlyphAtlas, font_lock, glyph_atlas
+from karaoke.text_layout import TextLayout
+
+
+def _pillow_mask(text, font, x, y, size):
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).text((x, y), text, font=font, fill=255)
+    return np.array(mask)
+
+
+def test_atlas_matches_pillow():
+    """Test that assembled text matches ImageDraw.text, kerning and overlaps included."""
+    print("Testing glyph atlas against Pillow...")
+    
+    for font_size, style in [(48, 'bold'), (32, ''), (24, 'italic')]:
+        font = TextLayout(font_size=font_size, style=style).font
+        atlas = GlyphAtlas(font)
+        for text in ['Hello World', 'AVATAR Tokyo', 'affine ffi', 'Ça été!']:
+            for x in (5, 5.3, 5.7):
+                reference = _pillow_mask(text, font, x, 6, (400, 80))
+                mask = np.zeros((80, 400), dtype=np.uint8)
+                atlas.draw(mask, text, x, 6)
+                difference = np.abs(mask.astype(int) - reference.astype(int)).max()
+                assert difference <= 1, f"{text!r} at x={x} differs by {difference}"
+    
+    print("✓ Glyph atlas Pillow test passed")
+
+
+def test_glyphs_rasterized_once():
+    """Test that each code point is packed once and shared between strings."""
+    print("Testing glyph reuse...")
+    
+    font = TextLayout(font_size=32).font
+    atlas = glyph_atlas(font)
+    assert glyph_atlas(font) is atlas, "Atlas should be shared per font"
+    
+    atlas.mask('banana')
+    entries = dict(atlas.glyphs)
+    atlas.mask('nab')
+    assert {char: atlas.glyphs[char] for char in entries} == entries
+    assert set('ban') <= set(atlas.glyphs)
+    
+    mask, left, top = atlas.mask('   ')
+    assert mask.size == 0, "Whitespace has no visible glyphs"
+    
+    print("✓ Glyph reuse test passed")
+
+
+def test_save_and_memory_map():
+    """Test that a saved atlas is memory-mapped and still grows."""
+    print("Testing atlas persistence...")
+    
+    font = TextLayout(font_size=40, style='bold').font
+    atlas = GlyphAtlas(font)
+    expected, left, top = atlas.mask('Karaoke')
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'atlas')
+        atlas.save(path)
+        loaded = GlyphAtlas.load(path, font)
+        assert isinstance(loaded.pixels, np.memmap)
+        
+        mask, loaded_left, loaded_top = loaded.mask('Karaoke')
+        assert np.array_equal(mask, expected) and (loaded_left, loaded_top) == (left, top)
+        
+        # New glyphs copy the mapped pixels instead of writing to the file
+        loaded.mask('Zydeco')
+        assert not isinstance(loaded.pixels, np.memmap)
+        assert np.array_equal(loaded.mask('Karaoke')[0], expected)
+        
+        try:
+            GlyphAtlas.load(path, TextLayout(font_size=12).font)
+            assert False, "Loading with another font should fail"
+        except ValueError:
+            pass
+    
+    print("✓ Atlas persistence test passed")
+
+
+def test_shared_atlases_bounded():
+    """Test that shared atlases and font locks do not grow with every font size."""
+    print("Testing shared atlas bounds...")
+    
+    fonts = [TextLayout(font_size=size).font for size in range(10, 10 + MAX_SHARED_ATLASES + 8)]
+    first = glyph_atlas(fonts[0])
+    assert glyph_atlas(fonts[0]) is first
+    for font in fonts[1:]:
+        glyph_atlas(font).mask('Sizes')
+    assert len(karaoke.glyph_atlas._atlases) <= MAX_SHARED_ATLASES
+    # A dropped atlas is created again, while its holders keep using it
+    assert glyph_atlas(fonts[0]) is not first
+    assert first.mask('Still drawn')[0].any()
+    
+    # A lock in use stays shared; unused ones are dropped
+    lock = font_lock(TextLayout(font_size=9).font)
+    with lock:
+        gc.collect()
+        assert font_lock(TextLayout(font_size=9).font) is lock
+    del first, lock
+    gc.collect()
+    assert len(karaoke.glyph_atlas._font_locks) <= MAX_SHARED_ATLASES
+    
+    print("✓ Shared atlas bounds test passed")
+
+
+def run_all_tests():
+    """Run all glyph atlas tests."""
+    print("=" * 50)
+    print("Running Glyph Atlas Tests")
+    print("=" * 50 + "\n")
+    
+    test_atlas_matches_pillow()
+    print()
+    test_glyphs_rasterized_once()
+    print()
+    test_save_and_memory_map()
+    print()
+    test_shared_atlases_bounded()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -3,6 +3,7 @@ Simple test to verify karaoke functionality.
 """
 
 from karaoke import generate_karaoke_video
+from karaoke.renderer import KaraokeRenderer
 from karaoke.timing import create_word_timings, WordTiming
 from karaoke.text_layout import TextLayout
 from karaoke.utils import map_in_range, parse_text_style
@@ -72,6 +73,67 @@ def test_text_layout():
     print("✓ Text layout test passed")
 
 
+def test_pagination():
+    """Test splitting a long line into screen-width pages and culling."""
+    print("Testing pagination...")
+    
+    layout = TextLayout(font_size=24)
+    timings = create_word_timings('one two three four five six seven eight nine ten', 0, 10)
+    word_sizes = layout.measure_words([wt.text for wt in timings])
+    
+    pages = layout.paginate(word_sizes, 120)
+    assert len(pages) > 1, "Long line should span several pages"
+    assert pages[0][0] == 0 and pages[-1][1] == len(word_sizes)
+    for start, end in pages:
+        assert word_sizes[start]['text'].strip() and word_sizes[end - 1]['text'].strip()
+        page_width = word_sizes[end - 1]['widthRange'][1] - word_sizes[start]['widthRange'][0]
+        assert page_width <= 120 or end - start == 1
+    
+    assert layout.paginate(word_sizes, 10000) == [(0, len(word_sizes))]
+    
+    # Words far outside the frame are never rasterized
+    renderer = KaraokeRenderer(width=200, height=100)
+    drawn = []
+    draw_text = renderer._draw_text
+    renderer._draw_text = lambda img, text, *args, **kwargs: (drawn.append(text), draw_text(img, text, *args, **kwargs))
+    renderer.render_frame(timings, word_sizes, layout, 0.0)
+    assert drawn and 'one' not in drawn and 'ten' not in drawn
+    
+    print("✓ Pagination test passed")
+
+
+def test_render_lines():
+    """Test drawing several lines into one frame."""
+    print("Testing multi-line rendering...")
+    
+    layout = TextLayout(font_size=32)
+    renderer = KaraokeRenderer(width=320, height=180)
+    lines = []
+    for text in ['First line', 'Second line']:
+        timings = create_word_timings(text, 0, 2)
+        lines.append({
+            'word_timings': timings,
+            'word_sizes': layout.measure_words([wt.text for wt in timings])
+        })
+    
+    frame = renderer.render_lines(lines, layout, 1.0, line_spacing=20)
+    
+    # Same pixels as rendering each line on its own at its stacked position
+    heights = [max(w['height'] for w in line['word_sizes']) for line in lines]
+    y = (180 - sum(heights) - 20) / 2
+    expected = renderer.render_frame(lines[0]['word_timings'], lines[0]['word_sizes'], layout, 1.0, y_position=y)
+    second = renderer.render_frame(lines[1]['word_timings'], lines[1]['word_sizes'], layout, 1.0,
+                                   y_position=y + heights[0] + 20)
+    expected[second.any(axis=2)] = second[second.any(axis=2)]
+    assert (frame == expected).all(), "Lines should match single-line rendering"
+    
+    # Lines are drawn directly, so text colored like the background is harmless
+    blank = renderer.render_lines(lines, layout, 0.0, inactive_color=(0, 0, 0, 255))
+    assert not blank.any()
+    
+    print("✓ Multi-line rendering test passed")
+
+
 def test_video_generation():
     """Test video generation."""
     print("Testing video generation...")
@@ -122,6 +184,8 @@ def run_all_tests():
         test_utils()
         test_timing()
         test_text_layout()
+        test_pagination()
+        test_render_lines()
         test_video_generation()
         
         print()
@@ -0,0 +1,129 @@
+"""
+Test the retained-mode layer graph and per-layer invalidation.
+"""
+
+import numpy as np
+from karaoke.compositor import Compositor, solid_layer
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.layers import LayerGraph
+from karaoke.text_layout import TextLayout
+from karaoke.timing import create_word_timings
+
+
+def _make_lines(text_layout):
+    lines_data = []
+    for text, start_time, end_time in [('First line here', 0, 2),
+                                       ('Second line follows', 2, 4),
+                                       ('Third line', 5, 7)]:
+        word_timings = create_word_timings(text, start_time, end_time)
+        lines_data.append({
+            'word_timings': word_timings,
+            'word_sizes': text_layout.measure_words([wt.text for wt in word_timings]),
+            'start_time': start_time,
+            'end_time': end_time,
+            'text': text
+        })
+    return lines_data
+
+
+def test_layer_graph_invalidation():
+    """Test that only changed layers produce dirty rectangles."""
+    print("Testing layer graph invalidation...")
+    
+    compositor = Compositor(100, 50)
+    graph = LayerGraph(compositor.new_canvas(), compositor, ['a', 'b'])
+    builds = []
+    
+    def build(x):
+        builds.append(x)
+        return [(solid_layer(10, 10, (255, 255, 255, 255)), x, 5, 1.0)]
+    
+    graph.update('a', 10, lambda: build(10))
+    graph.update('b', 50, lambda: build(50))
+    canvas = graph.compose()
+    assert canvas[10, 15, 0] == 255 and canvas[10, 55, 0] == 255
+    
+    # Same keys: nothing rebuilt, nothing to recompose
+    graph.update('a', 10, lambda: build(10))
+    graph.update('b', 50, lambda: build(50))
+    assert builds == [10, 50]
+    assert graph.dirty_rects() == []
+    
+    # Moving one layer dirties its old and new rectangles only
+    graph.update('a', 20, lambda: build(20))
+    assert graph.dirty_rects() == [(10, 5, 20, 15), (20, 5, 30, 15)]
+    canvas = graph.compose()
+    assert canvas[10, 12, 0] == 0 and canvas[10, 25, 0] == 255 and canvas[10, 55, 0] == 255
+    
+    # Hiding a layer restores the background
+    graph.update('b', None, None)
+    canvas = graph.compose()
+    assert canvas[10, 55, 0] == 0
+    
+    print("✓ Layer graph invalidation test passed")
+
+
+def test_retained_frames_match_fresh_render():
+    """Test that incremental frames are identical to frames rendered from scratch."""
+    print("Testing retained rendering against fresh rendering...")
+    
+    text_layout = TextLayout(font_size=32, style='bold')
+    lines_data = _make_lines(text_layout)
+    renderer = KarafunRenderer(width=480, height=270, bg_color=(10, 10, 30, 255))
+    
+    for frame_idx in range(0, 240, 3):
+        current_time = frame_idx / 30
+        options = dict(
+            show_header=True,
+            show_time=True,
+            video_duration=7,
+            show_title=current_time < 1.5,
+            song_title='Song',
+            artist_name='Artist'
+        )
+        retained = renderer.render_frame(lines_data, text_layout, current_time, **options)
+        fresh = KarafunRenderer(width=480, height=270, bg_color=(10, 10, 30, 255)).render_frame(
+            lines_data, text_layout, current_time, **options
+        )
+        assert np.array_equal(retained, fresh), f"Frame at {current_time:.2f}s differs"
+    
+    print("✓ Retained rendering test passed")
+
+
+def test_static_frames_skip_work():
+    """Test that a frame with no visible change recomposes nothing."""
+    print("Testing static frame detection...")
+    
+    text_layout = TextLayout(font_size=32)
+    lines_data = _make_lines(text_layout)
+    renderer = KarafunRenderer(width=480, height=270)
+    
+    # Between lines 2 and 3 nothing moves within the same second
+    renderer.render_frame(lines_data, text_layout, 4.1, show_time=True, video_duration=7)
+    out = np.zeros((270, 480, 3), dtype=np.uint8)
+    renderer.render_frame(lines_data, text_layout, 4.2, show_time=True, video_duration=7, out=out)
+    assert renderer.layers.dirty_rects() == []
+    assert out.any(), "Frame should be copied into the output buffer"
+    
+    print("✓ Static frame test passed")
+
+
+def run_all_tests():
+    """Run all layer graph tests."""
+    print("=" * 50)
+    print("Running Layer Graph Tests")
+    print("=" * 50 + "\n")
+    
+    test_layer_graph_invalidation()
+    print()
+    test_retained_frames_match_fresh_render()
+    print()
+    test_static_frames_skip_work()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,116 @@
+"""
+Test line strip rasterization and column-cutoff karaoke wipe.
+"""
+
+import numpy as np
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.line_strip import LineStrip
+from karaoke.text_layout import TextLayout
+from karaoke.timing import create_word_timings
+
+
+def _make_line(text_layout, text='Hello karaoke world', start_time=0, end_time=3):
+    word_timings = create_word_timings(text, start_time, end_time)
+    word_sizes = text_layout.measure_words([wt.text for wt in word_timings])
+    return {
+        'word_timings': word_timings,
+        'word_sizes': word_sizes,
+        'start_time': start_time,
+        'end_time': end_time,
+        'text': text
+    }
+
+
+def test_cutoff():
+    """Test that the cutoff follows word timings and widthRange offsets."""
+    print("Testing line strip cutoff...")
+    
+    text_layout = TextLayout(font_size=36)
+    line = _make_line(text_layout)
+    timings, sizes = line['word_timings'], line['word_sizes']
+    
+    assert LineStrip.cutoff(timings, sizes, -1) == 0
+    assert LineStrip.cutoff(timings, sizes, 10) == sizes[-1]['widthRange'][1]
+    
+    # First word half sung
+    half = (timings[0].start_time + timings[0].end_time) / 2
+    cutoff = LineStrip.cutoff(timings, sizes, half)
+    assert abs(cutoff - sizes[0]['width'] / 2) <= 1, f"Unexpected cutoff {cutoff}"
+    
+    # Cutoff never moves backwards
+    previous = 0
+    for step in range(31):
+        cutoff = LineStrip.cutoff(timings, sizes, step / 10)
+        assert cutoff >= previous
+        previous = cutoff
+    
+    print("✓ Line strip cutoff test passed")
+
+
+def test_compose():
+    """Test that composing splits done and inactive pixels at the cutoff."""
+    print("Testing line strip compose...")
+    
+    text_layout = TextLayout(font_size=36)
+    line = _make_line(text_layout)
+    strip = LineStrip(line['word_sizes'], text_layout, (255, 255, 255, 255), (237, 61, 234, 255))
+    
+    pixels = strip.compose(strip.total_width / 2)
+    column = int(round(strip.padding + strip.total_width / 2))
+    
+    left = pixels[:, :column]
+    right = pixels[:, column:]
+    # Layers are premultiplied BGRA, fully covered pixels carry the plain color
+    assert np.all(left[left[:, :, 3] == 255][:, :3] == (234, 61, 237))
+    assert np.all(right[right[:, :, 3] == 255][:, :3] == (255, 255, 255))
+    assert np.all(left[:, :, :3].max(axis=2) <= left[:, :, 3])
+    
+    print("✓ Line strip compose test passed")
+
+
+def test_renderer_reuses_strips():
+    """Test that the renderer rasterizes each visible line only once."""
+    print("Testing line strip caching in renderer...")
+    
+    text_layout = TextLayout(font_size=36)
+    lines_data = [
+        _make_line(text_layout, 'First line', 0, 2),
+        _make_line(text_layout, 'Second line', 2, 4),
+        _make_line(text_layout, 'Third line', 4, 6)
+    ]
+    renderer = KarafunRenderer(width=640, height=360)
+    
+    renderer.render_frame(lines_data, text_layout, 0.5, show_header=False)
+    strips = dict(renderer._line_strips)
+    assert len(strips) == 2, "Current and next line should be cached"
+    
+    renderer.render_frame(lines_data, text_layout, 1.5, show_header=False)
+    for key, strip in strips.items():
+        assert renderer._line_strips[key] is strip, "Strips should be reused"
+    
+    # Lines that are no longer visible are evicted
+    renderer.render_frame(lines_data, text_layout, 4.5, show_header=False)
+    assert len(renderer._line_strips) == 1
+    
+    print("✓ Line strip caching test passed")
+
+
+def run_all_tests():
+    """Run all line strip tests."""
+    print("=" * 50)
+    print("Running Line Strip Tests")
+    print("=" * 50 + "\n")
+    
+    test_cutoff()
+    print()
+    test_compose()
+    print()
+    test_renderer_reuses_strips()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
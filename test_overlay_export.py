@@ -0,0 +1,226 @@
+"""
+Test exporting lyrics as a transparent overlay.
+"""
+
+import os
+import tempfile
+import cv2
+import numpy as np
+import karaoke.main
+from karaoke import generate_karafun_overlay, generate_karafun_video
+from karaoke.cli import overlay_settings
+from karaoke.compositor import Compositor
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.sinks import (
+    ALPHA_VIDEO_CODECS, FFmpegSink, alpha_video_sink, background_filter_graph, composited_video_sink
+)
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+from karaoke.utils import check_ffmpeg_available
+
+
+LYRICS = [
+    {'text': 'Overlay over any footage', 'start_time': 0, 'end_time': 2},
+    {'text': 'Second line', 'start_time': 2, 'end_time': 3}
+]
+
+
+def test_overlay_matches_opaque_render():
+    """Test that the overlay composited over a background matches a normal render."""
+    print("Testing transparent rendering...")
+    
+    text_layout = TextLayout(font_size=40, style='bold outline shadow')
+    timeline = Timeline(LYRICS, text_layout)
+    opaque = KarafunRenderer(width=480, height=270, bg_color=(40, 90, 200, 255), bg_image='bg.jpg')
+    transparent = KarafunRenderer(width=480, height=270, transparent=True)
+    compositor = Compositor(480, 270)
+    
+    for i in range(30):
+        t = i / 10
+        kwargs = {
+            'show_title': t < 1,
+            'song_title': 'Overlay',
+            'artist_name': 'Tester',
+            'show_time': True,
+            'video_duration': 3
+        }
+        expected = opaque.render_frame(timeline, text_layout, t, **kwargs)
+        overlay = transparent.render_frame(timeline, text_layout, t, **kwargs)
+        assert overlay.shape == (270, 480, 4)
+        
+        composited = opaque._background.copy()
+        compositor.over(composited, overlay)
+        # Blending in two steps rounds differently by at most one level
+        assert np.abs(composited.astype(int) - expected).max() <= 1
+    
+    print("✓ Transparent rendering test passed")
+
+
+def test_image_sequence():
+    """Test writing the overlay as PNG and WebP sequences with alpha."""
+    print("Testing overlay image sequence...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_dir = os.path.join(tmp_dir, 'frames')
+        result = generate_karafun_overlay(LYRICS, output_dir, width=320, height=180,
+                                          fps=10, font_size=24, show_time=True)
+        assert result == output_dir
+        
+        files = sorted(os.listdir(output_dir))
+        assert len(files) == 30
+        assert files[0] == 'frame_000000.png'
+        
+        frame = cv2.imread(os.path.join(output_dir, files[5]), cv2.IMREAD_UNCHANGED)
+        assert frame.shape == (180, 320, 4)
+        alpha = frame[:, :, 3]
+        # Mostly transparent, with opaque text
+        assert alpha.min() == 0 and alpha.max() == 255
+        assert (alpha == 0).mean() > 0.5
+        # Straight alpha: fully opaque text pixels keep their full color
+        assert frame[alpha == 255][:, :3].max() == 255
+        
+        webp_dir = os.path.join(tmp_dir, 'webp')
+        generate_karafun_overlay(LYRICS[:1], webp_dir, width=160, height=90, fps=2,
+                                 font_size=16, image_format='webp')
+        frame = cv2.imread(os.path.join(webp_dir, 'frame_000000.webp'), cv2.IMREAD_UNCHANGED)
+        assert frame.shape == (90, 160, 4)
+    
+    print("✓ Overlay image sequence test passed")
+
+
+def test_alpha_video_sink():
+    """Test the ffmpeg command of alpha videos."""
+    print("Testing alpha video sink...")
+    
+    command = FFmpegSink.build_command('out.mov', 1920, 1080, 30, ALPHA_VIDEO_CODECS['.mov'])
+    assert command[command.index('-pix_fmt') + 1] == 'bgra'
+    assert command[command.index('-s') + 1] == '1920x1080'
+    assert command[command.index('-i') + 1] == 'pipe:0'
+    assert 'prores_ks' in command and 'yuva444p10le' in command
+    assert command[-1] == 'out.mov'
+    
+    try:
+        alpha_video_sink('out.mp4', 320, 180, 30)
+        assert False, "MP4 cannot carry alpha"
+    except ValueError:
+        pass
+    
+    if not check_ffmpeg_available():
+        try:
+            generate_karafun_overlay(LYRICS, 'overlay.webm', width=320, height=180, fps=10)
+            assert False, "Expected RuntimeError without ffmpeg"
+        except RuntimeError:
+            pass
+    
+    settings = overlay_settings({
+        'output_path': 'videos/song.mp4', 'width': 320, 'height': 180, 'fps': 10,
+        'bg_image': 'bg.jpg', 'audio_path': 'song.mp3', 'font_size': 24
+    })
+    assert settings == {
+        'output_path': os.path.join('videos', 'song'), 'width': 320, 'height': 180,
+        'fps': 10, 'font_size': 24
+    }
+    assert overlay_settings({'output_path': 'song.MOV'})['output_path'] == 'song.MOV'
+    
+    print("✓ Alpha video sink test passed")
+
+
+def test_ffmpeg_compositing():
+    """Test handing the background to an ffmpeg filter graph."""
+    print("Testing ffmpeg compositing...")
+    
+    graph = background_filter_graph(1280, 720, 'bg.jpg', 128)
+    assert graph.startswith('[0:v]scale=1280:720')
+    assert 'drawbox=' in graph and 'black@0.5020' in graph
+    assert '[bg][1:v]overlay=alpha=premultiplied' in graph and graph.endswith('[out]')
+    assert 'drawbox' not in background_filter_graph(1280, 720)
+    
+    try:
+        generate_karafun_video(LYRICS, 'unused.mp4', compositing='gpu')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    
+    if not check_ffmpeg_available():
+        try:
+            composited_video_sink('out.mp4', 320, 180, 10, bg_image='bg.jpg')
+            assert False, "Expected RuntimeError without ffmpeg"
+        except RuntimeError:
+            pass
+    
+    # Stand in for ffmpeg: record the piped frames and blend them over the
+    # background the way the filter graph does
+    sinks = []
+    
+    class CompositingRecorder:
+        def __init__(self, output_path, width, height, fps, bg_color, bg_image, overlay_opacity):
+            self.frames = []
+            self.background = KarafunRenderer(width, height, tuple(bg_color) + (255,), bg_image)._background
+            sinks.append(self)
+        
+        def write(self, frame):
+            composited = self.background.copy()
+            Compositor(*composited.shape[1::-1]).over(composited, frame)
+            self.frames.append(composited)
+        
+        def release(self):
+            pass
+    
+    class FrameRecorder:
+        def __init__(self, *args):
+            self.frames = []
+            sinks.append(self)
+        
+        def write(self, frame):
+            self.frames.append(np.array(frame))
+        
+        def release(self):
+            pass
+    
+    original_sink = karaoke.main.composited_video_sink
+    original_writer = karaoke.main.cv2.VideoWriter
+    karaoke.main.composited_video_sink = CompositingRecorder
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    try:
+        settings = {'width': 320, 'height': 180, 'fps': 10, 'font_size': 24,
+                    'bg_image': 'bg.jpg', 'show_time': True, 'song_title': 'Offload',
+                    'title_duration': 1.0}
+        lyrics = [dict(lyric, start_time=lyric['start_time'] + 2, end_time=lyric['end_time'] + 2)
+                  for lyric in LYRICS]
+        generate_karafun_video(lyrics, 'unused.mp4', **settings)
+        generate_karafun_video(lyrics, 'unused.mp4', compositing='ffmpeg', **settings)
+        generate_karafun_video(lyrics, 'unused.mp4', compositing='ffmpeg', workers=2, **settings)
+    finally:
+        karaoke.main.composited_video_sink = original_sink
+        karaoke.main.cv2.VideoWriter = original_writer
+    
+    python_frames, ffmpeg_frames, worker_frames = (sink.frames for sink in sinks)
+    assert len(python_frames) == len(ffmpeg_frames) == len(worker_frames) == 60
+    for a, b, c in zip(python_frames, ffmpeg_frames, worker_frames):
+        assert np.abs(a.astype(int) - b).max() <= 1
+        assert np.array_equal(b, c)
+    
+    print("✓ ffmpeg compositing test passed")
+
+
+def run_all_tests():
+    """Run all overlay tests."""
+    print("=" * 50)
+    print("Running Overlay Tests")
+    print("=" * 50 + "\n")
+    
+    test_overlay_matches_opaque_render()
+    print()
+    test_image_sequence()
+    print()
+    test_alpha_video_sink()
+    print()
+    test_ffmpeg_compositing()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
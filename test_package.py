@@ -0,0 +1,129 @@
+"""
+Test compiling songs into binary packages and rendering from them.
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+from karaoke.cli import main as cli_main, resolve_settings
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.package import SongPackage, compile_song
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+
+
+CONFIG = {
+    'lyrics': [
+        {'text': 'Hello world', 'start_time': 0.5, 'end_time': 2},
+        {'text': 'Second line here', 'start_time': 2, 'end_time': 4},
+        {'text': 'Last one', 'start_time': 5, 'end_time': 6}
+    ],
+    'video': {'width': 480, 'height': 270, 'fps': 10},
+    'font': {'size': 32, 'style': 'bold'},
+    'title': {'song': 'Packaged', 'artist': 'Tester'}
+}
+
+
+def test_package_round_trip():
+    """Test that a packaged timeline matches laying the song out again."""
+    print("Testing song package round trip...")
+    
+    settings = resolve_settings(CONFIG)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = compile_song(CONFIG['lyrics'], settings, os.path.join(tmp_dir, 'song.npz'))
+        package = SongPackage.load(path)
+    
+    assert package.settings == settings
+    
+    text_layout = TextLayout(font_size=32, style='bold')
+    expected = Timeline(CONFIG['lyrics'], text_layout)
+    timeline = package.timeline()
+    assert len(timeline) == len(expected)
+    
+    renderer = KarafunRenderer(width=480, height=270)
+    packaged_renderer = KarafunRenderer(width=480, height=270)
+    for step in range(0, 70, 3):
+        current_time = step / 10
+        line, packaged_line = expected.find_lines(current_time)[0], timeline.find_lines(current_time)[0]
+        if line is None:
+            assert packaged_line is None
+        else:
+            assert packaged_line['word_sizes'] == line['word_sizes']
+            assert [(wt.text, wt.start_time, wt.end_time) for wt in packaged_line['word_timings']] == \
+                   [(wt.text, wt.start_time, wt.end_time) for wt in line['word_timings']]
+        
+        frame = renderer.render_frame(expected, text_layout, current_time, show_time=True, video_duration=6)
+        packaged_frame = packaged_renderer.render_frame(timeline, text_layout, current_time,
+                                                        show_time=True, video_duration=6)
+        assert np.array_equal(frame, packaged_frame)
+    
+    print("✓ Song package round trip test passed")
+
+
+def test_font_change_detected():
+    """Test that a package measured with another font file is rejected."""
+    print("Testing font hash check...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = compile_song(CONFIG['lyrics'], resolve_settings(CONFIG), os.path.join(tmp_dir, 'song.npz'))
+        
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        header = json.loads(str(arrays['header']))
+        header['font']['sha256'] = '0' * 64
+        arrays['header'] = np.array(json.dumps(header))
+        np.savez(path, **arrays)
+        
+        try:
+            SongPackage.load(path)
+            assert False, "Stale package should be rejected"
+        except ValueError:
+            pass
+        assert SongPackage.load(path, verify_font=False).settings['width'] == 480
+    
+    print("✓ Font hash check test passed")
+
+
+def test_cli_bulk_compile():
+    """Test compiling several configurations in parallel from the CLI."""
+    print("Testing bulk compile...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_paths = []
+        for name in ('first', 'second', 'third'):
+            config_path = os.path.join(tmp_dir, f'{name}.json')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump(CONFIG, f)
+            config_paths.append(config_path)
+        
+        output_dir = os.path.join(tmp_dir, 'packages')
+        assert cli_main(['compile'] + config_paths + ['--output-dir', output_dir, '--jobs', '2']) == 0
+        assert sorted(os.listdir(output_dir)) == ['first.npz', 'second.npz', 'third.npz']
+        
+        # A missing config fails without stopping the others
+        assert cli_main(['compile', config_paths[0], os.path.join(tmp_dir, 'missing.json'),
+                         '--output-dir', output_dir]) == 1
+    
+    print("✓ Bulk compile test passed")
+
+
+def run_all_tests():
+    """Run all song package tests."""
+    print("=" * 50)
+    print("Running Song Package Tests")
+    print("=" * 50 + "\n")
+    
+    test_package_round_trip()
+    print()
+    test_font_change_detected()
+    print()
+    test_cli_bulk_compile()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
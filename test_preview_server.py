@@ -0,0 +1,168 @@
+"""
+Test the interactive preview server.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+import cv2
+import numpy as np
+from karaoke import render_frame_at
+from karaoke.package import SongPackage, compile_song
+from karaoke.preview_server import PreviewSession, make_preview_server
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+
+
+LYRICS = [
+    {'text': 'Scrub through the song', 'start_time': 0, 'end_time': 1.5},
+    {'text': 'Fix the timing live', 'start_time': 1.5, 'end_time': 3},
+    {'text': 'See it right away', 'start_time': 3, 'end_time': 4.5}
+]
+
+CONFIG = {'lyrics_data': LYRICS, 'width': 320, 'height': 180, 'font_size': 24, 'show_time': True}
+
+
+def test_update_line():
+    """Test that editing a line lays out only that line again."""
+    print("Testing timeline line edits...")
+    
+    timeline = Timeline(LYRICS, TextLayout(font_size=24))
+    shared = timeline.relayout(TextLayout(font_size=12))
+    first, last = timeline.line(0), timeline.line(2)
+    
+    assert timeline.update_line(1, text='Fixed the timing') == 1
+    assert timeline.line(1)['text'] == 'Fixed the timing'
+    assert timeline.line(0) is first and timeline.line(2) is last
+    # Timelines sharing the lines are not edited
+    assert shared.texts[1] == 'Fix the timing live'
+    
+    # Moving a line past another keeps the lines in time order
+    assert timeline.update_line(0, start_time=3.5, end_time=5) == 2
+    assert timeline.texts == ['Fixed the timing', 'See it right away', 'Scrub through the song']
+    assert timeline.line(1) is last
+    assert timeline.end_time == 5
+    
+    for edit in ({'index': 3}, {'index': 0, 'end_time': 1.0}):
+        try:
+            timeline.update_line(**edit)
+            assert False, "Invalid edit should raise"
+        except (IndexError, ValueError):
+            pass
+    
+    print("✓ Timeline line edits test passed")
+
+
+def test_update_packaged_line():
+    """Test that edited lines of a packaged timeline are laid out from their new text."""
+    print("Testing packaged timeline line edits...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = compile_song(LYRICS, {'font_size': 24, 'style': 'bold'}, os.path.join(directory, 'song.npz'))
+        timeline = SongPackage.load(path).timeline()
+    expected = Timeline(LYRICS, TextLayout(font_size=24, style='bold'))
+    for edited in (timeline, expected):
+        edited.line(0)
+        assert edited.update_line(0, text='Moved to the end', start_time=8.0, end_time=8.5) == 2
+        edited.update_line(0, start_time=1.6)
+    
+    assert timeline.sources == [None, 2, None]
+    for index in range(3):
+        line, packaged_line = expected.line(index), timeline.line(index)
+        assert packaged_line['text'] == line['text']
+        assert packaged_line['word_sizes'] == line['word_sizes']
+        assert [(wt.text, wt.start_time, wt.end_time) for wt in packaged_line['word_timings']] == \
+               [(wt.text, wt.start_time, wt.end_time) for wt in line['word_timings']]
+    
+    print("✓ Packaged timeline line edits test passed")
+
+
+def test_session():
+    """Test that a session renders like render_frame_at, before and after edits."""
+    print("Testing preview session...")
+    
+    session = PreviewSession(CONFIG)
+    assert session.video_duration == 4.5
+    assert np.array_equal(session.render(2.0), render_frame_at(CONFIG, 2.0))
+    
+    session.update_line(1, text='Timing fixed live', start_time=1.6)
+    edited = [dict(LYRICS[1], text='Timing fixed live', start_time=1.6)]
+    expected = render_frame_at(dict(CONFIG, lyrics_data=LYRICS[:1] + edited + LYRICS[2:]), 2.0)
+    assert np.array_equal(session.render(2.0), expected)
+    
+    # Moving the last line's end sets the renderer up for the new duration
+    session.update_line(2, end_time=6)
+    assert session.video_duration == 6
+    assert session.lines()[2] == {'text': 'See it right away', 'start_time': 3, 'end_time': 6}
+    
+    print("✓ Preview session test passed")
+
+
+def test_server():
+    """Test the HTTP endpoints of the preview server."""
+    print("Testing preview server...")
+    
+    server = make_preview_server(CONFIG, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/frame?t=2.0&format=png") as response:
+            assert response.headers['Content-Type'] == 'image/png'
+            assert response.headers['Server-Timing'].startswith('render;dur=')
+            frame = cv2.imdecode(np.frombuffer(response.read(), np.uint8), cv2.IMREAD_COLOR)
+        assert np.array_equal(frame, render_frame_at(CONFIG, 2.0))
+        
+        with urllib.request.urlopen(f"{base}/frame?t=1") as response:
+            assert response.headers['Content-Type'] == 'image/jpeg'
+        
+        request = urllib.request.Request(f"{base}/lines/0", method='POST',
+                                         data=json.dumps({'start_time': 3.2, 'end_time': 4}).encode('utf-8'))
+        with urllib.request.urlopen(request) as response:
+            assert json.load(response) == {'index': 2}
+        with urllib.request.urlopen(f"{base}/lines") as response:
+            info = json.load(response)
+        assert [line['text'] for line in info['lines']][2] == 'Scrub through the song'
+        assert info['duration'] == 4.5
+        
+        for url, data, status in ((f"{base}/frame?t=soon", None, 400),
+                                  (f"{base}/frame?t=1&format=gif", None, 400),
+                                  (f"{base}/lines/7", b'{"text": "x"}', 404),
+                                  (f"{base}/nothing", None, 404)):
+            try:
+                urllib.request.urlopen(url, data=data)
+                assert False, f"{url} should fail"
+            except urllib.error.HTTPError as e:
+                assert e.code == status
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.session.close()
+    
+    print("✓ Preview server test passed")
+
+
+def run_all_tests():
+    """Run all preview server tests."""
+    print("=" * 50)
+    print("Running Preview Server Tests")
+    print("=" * 50 + "\n")
+    
+    test_update_line()
+    print()
+    test_update_packaged_line()
+    print()
+    test_session()
+    print()
+    test_server()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,196 @@
+"""
+Test generating several renditions of a song in one pass.
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+import karaoke.main
+from karaoke import generate_karafun_renditions, generate_karafun_video
+from karaoke.cli import compile_config, main as cli_main
+from karaoke.package import SongPackage
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+
+
+LYRICS = [
+    {'text': f'Line {i} with several quite long words here', 'start_time': i * 1.0, 'end_time': i + 1.0}
+    for i in range(4)
+]
+
+SETTINGS = {'fps': 10, 'font_size': 40, 'show_time': True}
+
+
+class FrameRecorder:
+    """Stands in for cv2.VideoWriter, keeping the frames of every output path."""
+    
+    frames = {}
+    
+    def __init__(self, output_path, fourcc, fps, size):
+        self.output_path = output_path
+        self.size = size
+        FrameRecorder.frames[output_path] = []
+    
+    def write(self, frame):
+        FrameRecorder.frames[self.output_path].append(np.array(frame))
+    
+    def release(self):
+        pass
+
+
+def test_relayout():
+    """Test that a relaid-out timeline shares lines but not measurements."""
+    print("Testing timeline relayout...")
+    
+    timeline = Timeline(LYRICS, TextLayout(font_size=40))
+    small = timeline.relayout(TextLayout(font_size=20))
+    assert small.texts is timeline.texts and small.starts is timeline.starts
+    assert small.end_time == timeline.end_time
+    assert small.find_lines(1.5)[0]['text'] == timeline.find_lines(1.5)[0]['text']
+    
+    wide = sum(w['width'] for w in timeline.line(0)['word_sizes'])
+    narrow = sum(w['width'] for w in small.line(0)['word_sizes'])
+    assert narrow < wide * 0.6
+    
+    try:
+        KarafunRenderer(width=320, height=180, layout='diagonal')
+        assert False, "Unknown layout should raise"
+    except ValueError:
+        pass
+    
+    print("✓ Timeline relayout test passed")
+
+
+def test_renditions():
+    """Test that renditions match single renders at their own sizes."""
+    print("Testing multi-rendition output...")
+    
+    FrameRecorder.frames = {}
+    original_writer = karaoke.main.cv2.VideoWriter
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    try:
+        paths = generate_karafun_renditions(LYRICS, [
+            {'output_path': 'landscape.mp4', 'width': 640, 'height': 360},
+            {'output_path': 'small.mp4', 'width': 320, 'height': 180},
+            {'output_path': 'vertical.mp4', 'width': 360, 'height': 640}
+        ], **SETTINGS)
+        generate_karafun_video(LYRICS, 'reference.mp4', width=640, height=360, **SETTINGS)
+        generate_karafun_video(LYRICS, 'small_reference.mp4', width=320, height=180,
+                               **dict(SETTINGS, font_size=20))
+    finally:
+        karaoke.main.cv2.VideoWriter = original_writer
+    
+    frames = FrameRecorder.frames
+    assert paths == ['landscape.mp4', 'small.mp4', 'vertical.mp4']
+    assert all(len(frames[path]) == 40 for path in frames)
+    assert all(np.array_equal(a, b) for a, b in zip(frames['landscape.mp4'], frames['reference.mp4']))
+    # The font size follows the short side of the frame
+    assert all(np.array_equal(a, b) for a, b in zip(frames['small.mp4'], frames['small_reference.mp4']))
+    
+    # The vertical cut is portrait, with its lines shrunk to fit the width
+    # and centered in the frame
+    vertical = frames['vertical.mp4'][25]
+    assert vertical.shape == (640, 360, 3)
+    rows = np.nonzero(vertical[100:560].max(axis=(1, 2)) > 128)[0] + 100
+    columns = np.nonzero(vertical[100:560].max(axis=(0, 2)) > 128)[0]
+    assert 250 < rows.min() and rows.max() < 400
+    assert columns.min() > 0 and columns.max() < 359
+    
+    try:
+        generate_karafun_renditions(LYRICS, [{'output_path': 'missing_size.mp4'}])
+        assert False, "Rendition without a size should raise"
+    except ValueError:
+        pass
+    
+    print("✓ Multi-rendition output test passed")
+
+
+def test_failed_rendition():
+    """Test that a failed render releases every writer and adds no audio."""
+    print("Testing failed rendition cleanup...")
+    
+    released, muxed = [], []
+    
+    class FailingWriter(FrameRecorder):
+        def write(self, frame):
+            if self.output_path == 'failing.mp4' and len(FrameRecorder.frames[self.output_path]) == 5:
+                raise OSError("Disk full")
+            FrameRecorder.write(self, frame)
+        
+        def release(self):
+            released.append(self.output_path)
+    
+    original_writer, original_mux = karaoke.main.cv2.VideoWriter, karaoke.main._mux_audio
+    karaoke.main.cv2.VideoWriter = FailingWriter
+    karaoke.main._mux_audio = lambda *args: muxed.append(args)
+    try:
+        generate_karafun_renditions(LYRICS, [
+            {'output_path': 'working.mp4', 'width': 320, 'height': 180},
+            {'output_path': 'failing.mp4', 'width': 160, 'height': 90}
+        ], audio_path='song.mp3', **SETTINGS)
+        assert False, "A failed write should raise"
+    except OSError:
+        pass
+    finally:
+        karaoke.main.cv2.VideoWriter, karaoke.main._mux_audio = original_writer, original_mux
+    
+    assert sorted(released) == ['failing.mp4', 'working.mp4']
+    assert muxed == []
+    
+    print("✓ Failed rendition cleanup test passed")
+
+
+def test_cli_renditions():
+    """Test that packages keep renditions and single-video flags are rejected."""
+    print("Testing renditions from the CLI...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        renditions = [
+            {'output_path': os.path.join(directory, 'large.mp4'), 'width': 320, 'height': 180},
+            {'output_path': os.path.join(directory, 'small.mp4'), 'width': 160, 'height': 90}
+        ]
+        config_path = os.path.join(directory, 'song.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({'lyrics': LYRICS[:2], 'video': {'fps': 10}, 'renditions': renditions}, f)
+        
+        for flags in (['--stream'], ['--resume'], ['--frame-store', os.path.join(directory, 'frames')]):
+            assert cli_main(['--config', config_path] + flags) == 1
+        assert sorted(os.listdir(directory)) == ['song.json']
+        
+        package_path = compile_config(config_path)
+        assert SongPackage.load(package_path).renditions == renditions
+        FrameRecorder.frames = {}
+        original_writer = karaoke.main.cv2.VideoWriter
+        karaoke.main.cv2.VideoWriter = FrameRecorder
+        try:
+            assert cli_main(['--package', package_path]) == 0
+        finally:
+            karaoke.main.cv2.VideoWriter = original_writer
+        assert sorted(FrameRecorder.frames) == sorted(r['output_path'] for r in renditions)
+    
+    print("✓ Renditions from the CLI test passed")
+
+
+def run_all_tests():
+    """Run all rendition tests."""
+    print("=" * 50)
+    print("Running Rendition Tests")
+    print("=" * 50 + "\n")
+    
+    test_relayout()
+    print()
+    test_renditions()
+    print()
+    test_failed_rendition()
+    print()
+    test_cli_renditions()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,108 @@
+"""
+Test cached text sprites and text effects (glow, outline, shadow).
+"""
+
+import numpy as np
+from karaoke.line_strip import LineStrip
+from karaoke.sprites import SpriteCache, effects_padding, style_effects, text_layer
+from karaoke.text_layout import TextLayout
+from karaoke.utils import parse_text_style
+
+
+def test_effect_styles():
+    """Test that outline and shadow are parsed from the style string."""
+    print("Testing effect styles...")
+    
+    styles = parse_text_style('bold outline shadow')
+    assert styles.get('bold') and styles.get('outline') and styles.get('shadow')
+    
+    effects = style_effects('bold outline shadow', 48)
+    assert set(effects) == {'outline', 'shadow'}
+    assert style_effects('bold', 48) == {}
+    
+    print("✓ Effect styles test passed")
+
+
+def test_effects_extend_glyphs():
+    """Test that effects are drawn around and below the glyphs."""
+    print("Testing text effects...")
+    
+    font = TextLayout(font_size=40, style='bold').font
+    plain, plain_left, plain_top = text_layer('Glow', font, (255, 255, 255, 255))
+    glow = (3, (237, 61, 234, 160))
+    glowing, left, top = text_layer('Glow', font, (255, 255, 255, 255), glow=glow)
+    
+    padding = effects_padding(glow=glow)
+    assert left == plain_left - padding and top == plain_top - padding
+    assert glowing.shape[0] == plain.shape[0] + padding * 2
+    
+    # Glow adds magenta-tinted pixels where the plain text is transparent
+    inner = glowing[padding:-padding, padding:-padding]
+    halo = (plain[:, :, 3] == 0) & (inner[:, :, 3] > 0)
+    assert halo.any(), "Glow should cover pixels around the glyphs"
+    assert np.all(inner[halo][:, 2] >= inner[halo][:, 1])
+    
+    print("✓ Text effects test passed")
+
+
+def test_sprite_cache_reuses_effects():
+    """Test that sprites with effects are rasterized once."""
+    print("Testing sprite cache...")
+    
+    font = TextLayout(font_size=32).font
+    cache = SpriteCache(max_entries=2)
+    
+    first = cache.text('Title', font, (255, 255, 255, 255), glow=(3, (255, 0, 0, 128)))
+    second = cache.text('Title', font, (255, 255, 255, 255), glow=(3, (255, 0, 0, 128)))
+    assert first is second, "Cached sprite should be reused"
+    
+    cache.text('Other', font, (255, 255, 255, 255))
+    cache.text('Third', font, (255, 255, 255, 255))
+    assert len(cache) == 2, "Least recently used sprite should be evicted"
+    
+    print("✓ Sprite cache test passed")
+
+
+def test_outlined_line_strip():
+    """Test that outline styles are baked into both line strips."""
+    print("Testing outlined line strip...")
+    
+    plain_layout = TextLayout(font_size=36, style='bold')
+    outline_layout = TextLayout(font_size=36, style='bold outline')
+    words = ['Sing', ' ', 'along']
+    
+    plain = LineStrip(plain_layout.measure_words(words), plain_layout,
+                      (255, 255, 255, 255), (237, 61, 234, 255))
+    outlined = LineStrip(outline_layout.measure_words(words), outline_layout,
+                         (255, 255, 255, 255), (237, 61, 234, 255))
+    
+    # The outline covers more pixels, with dark (black) edges in both strips
+    assert (outlined.inactive[:, :, 3] > 0).sum() > (plain.inactive[:, :, 3] > 0).sum()
+    for strip in (outlined.inactive, outlined.done):
+        edge = (strip[:, :, 3] == 255) & (strip[:, :, :3].max(axis=2) == 0)
+        assert edge.any(), "Outline should be drawn in both strips"
+    
+    print("✓ Outlined line strip test passed")
+
+
+def run_all_tests():
+    """Run all sprite tests."""
+    print("=" * 50)
+    print("Running Sprite Tests")
+    print("=" * 50 + "\n")
+    
+    test_effect_styles()
+    print()
+    test_effects_extend_glyphs()
+    print()
+    test_sprite_cache_reuses_effects()
+    print()
+    test_outlined_line_strip()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,200 @@
+"""
+Test streaming HLS and fragmented MP4 output.
+"""
+
+import io
+import os
+import tempfile
+import numpy as np
+import karaoke.main
+import karaoke.sinks
+from karaoke import generate_karafun_video
+from karaoke.sinks import streaming_output_args, streaming_video_sink
+from karaoke.utils import check_ffmpeg_available
+
+
+LYRICS = [
+    {'text': 'Playing before', 'start_time': 0, 'end_time': 1.5},
+    {'text': 'The render is done', 'start_time': 1.5, 'end_time': 3}
+]
+
+SETTINGS = {'width': 320, 'height': 180, 'fps': 10, 'font_size': 24, 'show_time': True}
+
+
+class FakeFFmpeg:
+    """Stands in for the ffmpeg process, keeping the command and the piped frames."""
+    
+    commands = []
+    
+    def __init__(self, command, stdin=None, stderr=None):
+        FakeFFmpeg.commands.append(command)
+        self.stdin = io.BytesIO()
+        self.stdin.close = lambda: None
+        self.stderr = io.BytesIO()
+    
+    def wait(self):
+        return 0
+
+
+class FrameRecorder:
+    """Stands in for cv2.VideoWriter, keeping the written frames."""
+    
+    frames = []
+    
+    def __init__(self, *args):
+        FrameRecorder.frames = []
+    
+    def write(self, frame):
+        FrameRecorder.frames.append(np.array(frame))
+    
+    def release(self):
+        pass
+
+
+def fake_ffmpeg(function):
+    """Run a function with ffmpeg replaced by FakeFFmpeg."""
+    original_check = karaoke.sinks.check_ffmpeg_available
+    original_popen = karaoke.sinks.subprocess.Popen
+    karaoke.sinks.check_ffmpeg_available = lambda: True
+    karaoke.sinks.subprocess.Popen = FakeFFmpeg
+    FakeFFmpeg.commands = []
+    try:
+        return function()
+    finally:
+        karaoke.sinks.check_ffmpeg_available = original_check
+        karaoke.sinks.subprocess.Popen = original_popen
+
+
+def test_output_args():
+    """Test the HLS and fragmented MP4 output arguments."""
+    print("Testing streaming output arguments...")
+    
+    hls = streaming_output_args(os.path.join('live', 'song.m3u8'), 30, 2.0)
+    assert hls[hls.index('-g') + 1] == '60' and hls[hls.index('-keyint_min') + 1] == '60'
+    assert hls[hls.index('-f') + 1] == 'hls' and hls[hls.index('-hls_time') + 1] == '2'
+    assert hls[hls.index('-hls_segment_type') + 1] == 'fmp4'
+    assert hls[hls.index('-hls_playlist_type') + 1] == 'event'
+    assert hls[hls.index('-hls_segment_filename') + 1] == os.path.join('live', 'song_%05d.m4s')
+    
+    fragmented = streaming_output_args('song.mp4', 25, 1.0)
+    assert fragmented[fragmented.index('-g') + 1] == '25'
+    assert 'empty_moov' in fragmented[fragmented.index('-movflags') + 1]
+    assert fragmented[fragmented.index('-frag_duration') + 1] == '1000000'
+    assert '-f' not in fragmented
+    
+    print("✓ Streaming output arguments test passed")
+
+
+def test_sink_command():
+    """Test that the audio input does not shift the inputs the video maps."""
+    print("Testing streaming sink command...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        audio_path = os.path.join(directory, 'song.mp3')
+        with open(audio_path, 'wb') as f:
+            f.write(b'\0')
+        
+        def build():
+            streaming_video_sink('song.m3u8', 320, 180, 10, audio_path=audio_path, audio_offset=0.5)
+            streaming_video_sink('song.mp4', 320, 180, 10, audio_path=audio_path, composite=True,
+                                 bg_color=(10, 20, 30))
+            return FakeFFmpeg.commands
+        
+        plain, composited = fake_ffmpeg(build)
+    # Frames, then audio
+    assert plain.index('pipe:0') < plain.index(audio_path)
+    assert plain[plain.index('-itsoffset') + 1] == '0.500'
+    assert plain[plain.index('-pix_fmt') + 1] == 'bgr24'
+    assert ['-map', '0:v', '-map', '1:a'] == [a for a in plain if a in ('-map', '0:v', '1:a')]
+    # Background, frames, then audio
+    assert composited.index('lavfi') < composited.index('pipe:0') < composited.index(audio_path)
+    assert composited[composited.index('-pix_fmt') + 1] == 'bgra'
+    assert composited[composited.index('[out]') + 1: composited.index('[out]') + 3] == ['-map', '2:a']
+    assert '-shortest' in plain and '-shortest' in composited
+    
+    print("✓ Streaming sink command test passed")
+
+
+def test_streaming_render():
+    """Test that a streamed render pipes the frames of a normal render."""
+    print("Testing streamed render...")
+    
+    original_writer = karaoke.main.cv2.VideoWriter
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    try:
+        generate_karafun_video(LYRICS, 'unused.mp4', **SETTINGS)
+    finally:
+        karaoke.main.cv2.VideoWriter = original_writer
+    expected = b''.join(frame.tobytes() for frame in FrameRecorder.frames)
+    
+    piped = []
+    original_release = karaoke.sinks.FFmpegSink.release
+    
+    def release(sink):
+        piped.append(sink._process.stdin.getvalue())
+        original_release(sink)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        playlist = os.path.join(directory, 'live', 'song.m3u8')
+        audio_path = os.path.join(directory, 'song.mp3')
+        with open(audio_path, 'wb') as f:
+            f.write(b'\0')
+        karaoke.sinks.FFmpegSink.release = release
+        try:
+            # The audio is muxed by the stream, not added to a finished file
+            fake_ffmpeg(lambda: generate_karafun_video(LYRICS, playlist, streaming=True,
+                                                       audio_path=audio_path, **SETTINGS))
+        finally:
+            karaoke.sinks.FFmpegSink.release = original_release
+        assert os.path.isdir(os.path.join(directory, 'live'))
+        
+        # A missing audio file fails before ffmpeg is started
+        try:
+            fake_ffmpeg(lambda: generate_karafun_video(
+                LYRICS, playlist, streaming=True, audio_path=os.path.join(directory, 'missing.mp3'),
+                **SETTINGS))
+            assert False, "Streaming with missing audio should raise"
+        except FileNotFoundError:
+            pass
+        assert FakeFFmpeg.commands == []
+    
+    assert piped == [expected]
+    
+    # Checkpointed segments are only encoded at the end, there is nothing to stream
+    try:
+        generate_karafun_video(LYRICS, 'song.m3u8', streaming=True, checkpoint_dir='checkpoint',
+                               **SETTINGS)
+        assert False, "Streaming a checkpointed render should raise"
+    except ValueError:
+        pass
+    assert not os.path.exists('checkpoint')
+    
+    if not check_ffmpeg_available():
+        try:
+            generate_karafun_video(LYRICS, 'song.m3u8', streaming=True, **SETTINGS)
+            assert False, "Streaming without ffmpeg should raise"
+        except RuntimeError:
+            pass
+    
+    print("✓ Streamed render test passed")
+
+
+def run_all_tests():
+    """Run all streaming tests."""
+    print("=" * 50)
+    print("Running Streaming Tests")
+    print("=" * 50 + "\n")
+    
+    test_output_args()
+    print()
+    test_sink_command()
+    print()
+    test_streaming_render()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
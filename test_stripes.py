@@ -0,0 +1,135 @@
+"""
+Test splitting full-frame passes into stripes processed on a thread pool.
+"""
+
+import os
+import tempfile
+import threading
+import numpy as np
+from karaoke import generate_karafun_video, render_frame_at
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.preview_server import PreviewSession
+from karaoke.stripes import StripePool
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+
+
+def test_stripes():
+    """Test that stripes cover a row range exactly once."""
+    print("Testing stripe splitting...")
+    
+    pool = StripePool(4, min_rows=16)
+    try:
+        assert pool.stripes(0, 10) == [(0, 10)]
+        stripes = pool.stripes(5, 1085)
+        assert len(stripes) == 4
+        assert stripes[0][0] == 5 and stripes[-1][1] == 1085
+        assert all(a[1] == b[0] for a, b in zip(stripes, stripes[1:]))
+        
+        seen = np.zeros(200, dtype=np.int32)
+        threads = set()
+        lock = threading.Lock()
+        
+        def mark(index, top, bottom):
+            with lock:
+                seen[top:bottom] += 1
+                threads.add(index)
+        
+        pool.run(mark, 0, 200)
+        assert (seen == 1).all()
+        assert threads == {0, 1, 2, 3}
+        
+        src = np.random.default_rng(0).integers(0, 256, (200, 30, 3), dtype=np.uint8)
+        dst = np.zeros_like(src)
+        pool.copy(dst, src)
+        assert np.array_equal(dst, src)
+    finally:
+        pool.close()
+    
+    print("✓ Stripe splitting test passed")
+
+
+def test_threaded_frames_match():
+    """Test that Karafun frames are the same with and without threads."""
+    print("Testing threaded Karafun frames...")
+    
+    text_layout = TextLayout(font_size=48, style='bold outline')
+    timeline = Timeline([
+        {'text': 'Striped frames look the same', 'start_time': 0, 'end_time': 2},
+        {'text': 'On every thread count', 'start_time': 2, 'end_time': 4}
+    ], text_layout)
+    
+    serial = KarafunRenderer(width=960, height=540)
+    threaded = KarafunRenderer(width=960, height=540, threads=4)
+    out = np.empty((540, 960, 3), dtype=np.uint8)
+    for i in range(0, 40):
+        t = i / 10
+        kwargs = {
+            'show_title': t < 1,
+            'song_title': 'Stripes',
+            'artist_name': 'Tester',
+            'show_time': True,
+            'video_duration': 4
+        }
+        expected = serial.render_frame(timeline, text_layout, t, **kwargs)
+        assert np.array_equal(threaded.render_frame(timeline, text_layout, t, **kwargs), expected)
+        threaded.render_frame(timeline, text_layout, t, out=out, **kwargs)
+        assert np.array_equal(out, expected)
+    threaded.close()
+    
+    print("✓ Threaded Karafun frames test passed")
+
+
+def test_threads_stopped():
+    """Test that renders stop the stripe threads of their renderers."""
+    print("Testing stripe thread shutdown...")
+    
+    lyrics_data = [
+        {'text': 'Threads come', 'start_time': 0, 'end_time': 1},
+        {'text': 'Threads go', 'start_time': 1, 'end_time': 2}
+    ]
+    config = {'lyrics_data': lyrics_data, 'width': 320, 'height': 180, 'fps': 10,
+              'font_size': 24, 'threads': 4}
+    threads = threading.active_count()
+    
+    with KarafunRenderer(width=320, height=180, threads=4) as renderer:
+        renderer.stripes.run(lambda *stripe: None, 0, 180)
+    assert threading.active_count() == threads
+    
+    with tempfile.TemporaryDirectory() as directory:
+        generate_karafun_video(output_path=os.path.join(directory, 'video.mp4'), **config)
+    render_frame_at(config, 1.5)
+    assert threading.active_count() == threads
+    
+    # A preview session replacing its renderer stops the old one's threads
+    session = PreviewSession(config)
+    session.render(1.5)
+    session_threads = threading.active_count()
+    session.update_line(1, end_time=3)
+    session.render(1.5)
+    assert threading.active_count() == session_threads
+    session.close()
+    assert threading.active_count() == threads
+    
+    print("✓ Stripe thread shutdown test passed")
+
+
+def run_all_tests():
+    """Run all stripe tests."""
+    print("=" * 50)
+    print("Running Stripe Tests")
+    print("=" * 50 + "\n")
+    
+    test_stripes()
+    print()
+    test_threaded_frames_match()
+    print()
+    test_threads_stopped()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
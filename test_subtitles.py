@@ -0,0 +1,188 @@
+"""
+Test exporting lyrics as ASS, SRT and WebVTT subtitles.
+"""
+
+import os
+import tempfile
+import karaoke.subtitles
+from karaoke import export_subtitles
+from karaoke.subtitles import (
+    ass_color, ass_time, burn_subtitles, burn_subtitles_command, srt_time, to_ass, to_srt,
+    to_vtt, vtt_time
+)
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+from karaoke.utils import check_ffmpeg_available
+
+
+LYRICS = [
+    {'text': 'Second line here', 'start_time': 3.2, 'end_time': 5},
+    {'text': 'Hello {big} world', 'start_time': 1, 'end_time': 3}
+]
+
+
+def test_timestamps():
+    """Test subtitle timestamp and color formatting."""
+    print("Testing subtitle timestamps...")
+    
+    assert ass_time(62.346) == '0:01:02.35'
+    assert ass_time(3725.5) == '1:02:05.50'
+    assert srt_time(62.3456) == '00:01:02,346'
+    assert vtt_time(3725.5) == '01:02:05.500'
+    assert ass_color((237, 61, 234)) == '&H00EA3DED'
+    assert ass_color((0, 0, 0, 160)) == '&H5F000000'
+    
+    print("✓ Subtitle timestamps test passed")
+
+
+def test_ass_karaoke():
+    """Test that ASS events fill every word in step with its timing."""
+    print("Testing ASS karaoke export...")
+    
+    script = to_ass(LYRICS, width=1920, height=1080, style='bold outline uppercase')
+    assert 'PlayResX: 1920' in script and 'PlayResY: 1080' in script
+    # Sung words turn magenta from white
+    assert ',&H00EA3DED,&H00FFFFFF,' in script
+    
+    events = [line for line in script.splitlines() if line.startswith('Dialogue:')]
+    assert len(events) == 2
+    first, second = events
+    assert first.startswith('Dialogue: 0,0:00:00.00,0:00:03.02,')
+    # The next line shows up when the current one starts, in the other row
+    assert second.startswith('Dialogue: 0,0:00:01.00,0:00:05.02,')
+    assert first.split(',')[7] != second.split(',')[7]
+    
+    # Override blocks in the lyrics are neutralized, text is uppercased
+    assert '(BIG)' in first and '{big}' not in first
+    assert '{\\kf67}HELLO' in first
+    
+    # Lead-in plus fill durations add up to the end of the event
+    tags = [int(tag.split('}')[0]) for tag in second.split('\\kf')[1:]]
+    assert '\\k220}' in second
+    assert 220 + sum(tags) == 502 - 100
+    
+    # A Timeline exports like the lyrics it was made from
+    timeline = Timeline(LYRICS, TextLayout(font_size=52, style='bold outline uppercase'))
+    assert to_ass(timeline, width=1920, height=1080, style='bold outline uppercase') == script
+    
+    print("✓ ASS karaoke export test passed")
+
+
+def test_srt_vtt():
+    """Test plain SRT and word-timed WebVTT export."""
+    print("Testing SRT and WebVTT export...")
+    
+    srt = to_srt(LYRICS, time_offset=2)
+    assert srt.startswith('1\n00:00:03,000 --> 00:00:05,000\nHello {big} world\n')
+    assert '2\n00:00:05,200 --> 00:00:07,000\nSecond line here\n' in srt
+    
+    vtt = to_vtt(LYRICS)
+    assert vtt.startswith('WEBVTT\n')
+    assert '00:00:03.200 --> 00:00:05.000\nSecond <00:00:03.810>line <00:00:04.420>here\n' in vtt
+    
+    print("✓ SRT and WebVTT export test passed")
+
+
+def test_export_and_burn_command():
+    """Test writing subtitle files and building the burn-in command."""
+    print("Testing subtitle files and burn-in command...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ('.ass', '.srt', '.vtt'):
+            path = os.path.join(directory, 'lyrics' + extension)
+            assert export_subtitles(LYRICS, path) == path
+            with open(path, encoding='utf-8') as f:
+                assert f.read()
+        try:
+            export_subtitles(LYRICS, os.path.join(directory, 'lyrics.txt'))
+            assert False, "Unknown subtitle format should raise"
+        except ValueError:
+            pass
+        
+        audio_path = os.path.join(directory, 'song.mp3')
+        with open(audio_path, 'wb') as f:
+            f.write(b'\0')
+        bg_image = os.path.join(directory, 'bg.jpg')
+        with open(bg_image, 'wb') as f:
+            f.write(b'\0')
+        command = burn_subtitles_command("sub's:1.ass", 'out.mp4', 1280, 720, 30, 5.0,
+                                         bg_image=bg_image, audio_path=audio_path, audio_offset=1.5)
+        # A missing image falls back to the background color
+        missing = burn_subtitles_command('lyrics.ass', 'out.mp4', 640, 360, 25, 5.0, bg_color=(1, 2, 3),
+                                         bg_image=os.path.join(directory, 'missing.jpg'))
+        assert 'color=c=0x010203:s=640x360:r=25' in missing and '-loop' not in missing
+        for offset in ('nan', float('inf'), 7200):
+            try:
+                burn_subtitles_command('lyrics.ass', 'out.mp4', 640, 360, 25, 5.0,
+                                       audio_path=audio_path, audio_offset=offset)
+                assert False, f"Audio offset {offset} should raise"
+            except ValueError:
+                pass
+        try:
+            burn_subtitles_command('lyrics.ass', 'out.mp4', 640, 360, 25, 5.0,
+                                   audio_path=os.path.join(directory, 'missing.mp3'))
+            assert False, "Missing audio should raise"
+        except FileNotFoundError:
+            pass
+    
+    assert command[command.index('-loop') + 1] == '1'
+    assert command[command.index('-itsoffset') + 1] == '1.500'
+    graph = command[command.index('-filter_complex') + 1]
+    assert graph.startswith('[0:v]scale=1280:720')
+    assert graph.endswith("ass=filename=sub\\\\\\'s\\\\:1.ass[out]")
+    assert command[command.index('-t') + 1] == '5.000'
+    assert command[-1] == 'out.mp4'
+    
+    command = burn_subtitles_command('lyrics.ass', 'out.mp4', 640, 360, 25, 5.0, bg_color=(255, 0, 16),
+                                     fonts_dir='/fonts/my:fonts')
+    graph = command[command.index('-filter_complex') + 1]
+    assert graph.endswith("ass=filename=lyrics.ass:fontsdir=/fonts/my\\\\:fonts[out]")
+    assert 'color=c=0xff0010:s=640x360:r=25' in command
+    assert '-map' in command and '1:a' not in command
+    
+    # A font file is found by libass in its directory
+    font_path = getattr(TextLayout('Arial', 52, 'bold').font, 'path', None)
+    if font_path:
+        commands = []
+        original_check, original_run = karaoke.subtitles.check_ffmpeg_available, karaoke.subtitles.subprocess.run
+        karaoke.subtitles.check_ffmpeg_available = lambda: True
+        karaoke.subtitles.subprocess.run = lambda command, **kwargs: commands.append(command)
+        try:
+            burn_subtitles(LYRICS, 'unused.mp4', font_family=font_path)
+        finally:
+            karaoke.subtitles.check_ffmpeg_available = original_check
+            karaoke.subtitles.subprocess.run = original_run
+        graph = commands[0][commands[0].index('-filter_complex') + 1]
+        assert f":fontsdir={os.path.dirname(font_path)}[out]" in graph
+    
+    if not check_ffmpeg_available():
+        try:
+            burn_subtitles(LYRICS, 'unused.mp4')
+            assert False, "Burning subtitles without ffmpeg should raise"
+        except RuntimeError:
+            pass
+    
+    print("✓ Subtitle files and burn-in command test passed")
+
+
+def run_all_tests():
+    """Run all subtitle tests."""
+    print("=" * 50)
+    print("Running Subtitle Tests")
+    print("=" * 50 + "\n")
+    
+    test_timestamps()
+    print()
+    test_ass_karaoke()
+    print()
+    test_srt_vtt()
+    print()
+    test_export_and_burn_command()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,133 @@
+"""
+Stress test rendering Karafun frames from several threads at once.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import karaoke.main
+from karaoke import generate_karafun_video
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.sprites import SpriteCache
+from karaoke.text_layout import TextLayout
+from karaoke.timeline import Timeline
+from karaoke.utils import gil_enabled
+
+
+LYRICS = [
+    {'text': f'Thread {i} sings quickly through ÀÉÎÕÜ glyphs {i * 7}', 'start_time': i * 0.5, 'end_time': i * 0.5 + 0.5}
+    for i in range(12)
+]
+
+
+def _frame_kwargs(t):
+    """Render options of the frame at a time, title screen first."""
+    return {
+        'show_title': t < 0.6,
+        'song_title': 'Stress Test',
+        'artist_name': 'Many Threads',
+        'show_time': True,
+        'video_duration': 6
+    }
+
+
+def test_concurrent_frames_match():
+    """Test that frames rendered concurrently match serial rendering."""
+    print("Testing concurrent Karafun rendering...")
+    
+    times = [i / 20 for i in range(120)]
+    
+    # A font size not used elsewhere starts with an empty glyph atlas, and
+    # tiny caches force concurrent evictions
+    text_layout = TextLayout(font_size=37, style='bold outline')
+    timeline = Timeline(LYRICS, text_layout, max_lines=2)
+    renderer = KarafunRenderer(width=480, height=270, sprites=SpriteCache(max_entries=8))
+    threads = 6
+    
+    def render_every_nth(index):
+        thread_renderer = renderer.thread_renderer()
+        return [
+            (i, thread_renderer.render_frame(timeline, text_layout, times[i], **_frame_kwargs(times[i])))
+            for i in range(index, len(times), threads)
+        ]
+    
+    switch_interval = sys.getswitchinterval()
+    # Switch threads as often as possible to interleave them on GIL builds too
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = [frame for frames in executor.map(render_every_nth, range(threads)) for frame in frames]
+    finally:
+        sys.setswitchinterval(switch_interval)
+    
+    # Serial rendering with the same font, now that its glyphs are cached
+    serial_layout = TextLayout(font_size=37, style='bold outline')
+    serial_timeline = Timeline(LYRICS, serial_layout)
+    serial = KarafunRenderer(width=480, height=270)
+    assert len(results) == len(times)
+    for i, frame in results:
+        t = times[i]
+        assert np.array_equal(frame, serial.render_frame(serial_timeline, serial_layout, t, **_frame_kwargs(t)))
+    
+    print("✓ Concurrent Karafun rendering test passed")
+
+
+def test_frame_threads_option():
+    """Test that generate_karafun_video(frame_threads=...) writes the same frames."""
+    print("Testing frame thread mode...")
+    
+    assert gil_enabled() in (True, False)
+    
+    frames = {}
+    
+    class FrameRecorder:
+        def __init__(self, *args):
+            self.frames = []
+        
+        def write(self, frame):
+            self.frames.append(np.array(frame))
+        
+        def release(self):
+            frames[len(frames)] = self.frames
+    
+    original_writer = karaoke.main.cv2.VideoWriter
+    original_gil_enabled = karaoke.main.gil_enabled
+    karaoke.main.cv2.VideoWriter = FrameRecorder
+    try:
+        settings = {'width': 320, 'height': 180, 'fps': 10, 'font_size': 24, 'show_time': True}
+        generate_karafun_video(LYRICS[:4], 'unused.mp4', **settings)
+        # Falls back to rendering in this thread when the GIL is enabled
+        generate_karafun_video(LYRICS[:4], 'unused.mp4', frame_threads=4, **settings)
+        # Use the thread pool whatever the build
+        karaoke.main.gil_enabled = lambda: False
+        generate_karafun_video(LYRICS[:4], 'unused.mp4', frame_threads=4, **settings)
+    finally:
+        karaoke.main.cv2.VideoWriter = original_writer
+        karaoke.main.gil_enabled = original_gil_enabled
+    
+    assert len(frames) == 3
+    assert all(len(written) == 20 for written in frames.values())
+    for a, b, c in zip(frames[0], frames[1], frames[2]):
+        assert np.array_equal(a, b)
+        assert np.array_equal(a, c)
+    
+    print("✓ Frame thread mode test passed")
+
+
+def run_all_tests():
+    """Run all thread safety tests."""
+    print("=" * 50)
+    print("Running Thread Safety Tests")
+    print("=" * 50 + "\n")
+    
+    test_concurrent_frames_match()
+    print()
+    test_frame_threads_option()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,61 @@
+"""
+Test the cached remaining-time badge.
+"""
+
+from karaoke.time_badge import TimeBadge
+from karaoke.text_layout import TextLayout
+
+
+def test_badge_state_and_text():
+    """Test the displayed state and its formatting."""
+    print("Testing time badge state...")
+    
+    badge = TimeBadge(TextLayout(font_size=32), 640, 360)
+    lines_data = [{'start_time': 2.0, 'end_time': 4.0}]
+    
+    assert badge.state(0.5, 75, lines_data) == (74, True)
+    assert badge.state(3.0, 75, lines_data) == (72, False)
+    assert badge.text((74, True)) == "Remaining: 01:14"
+    assert badge.text((72, False)) == "01:12"
+    assert badge.state(80, 75, lines_data) == (0, True)
+    
+    print("✓ Time badge state test passed")
+
+
+def test_badge_cache():
+    """Test that each displayed second is rendered once."""
+    print("Testing time badge cache...")
+    
+    badge = TimeBadge(TextLayout(font_size=32), 640, 360, max_entries=2)
+    
+    first = badge.sprites((10, False))
+    assert badge.sprites((10, False)) is first, "Same second should reuse the badge"
+    
+    # Badges with the same text width share their background
+    second = badge.sprites((11, False))
+    if second[0][0].shape == first[0][0].shape:
+        assert second[0][0] is first[0][0]
+    
+    badge.sprites((12, False))
+    assert badge.sprites((10, False)) is not first, "Oldest badge should be evicted"
+    
+    print("✓ Time badge cache test passed")
+
+
+def run_all_tests():
+    """Run all time badge tests."""
+    print("=" * 50)
+    print("Running Time Badge Tests")
+    print("=" * 50 + "\n")
+    
+    test_badge_state_and_text()
+    print()
+    test_badge_cache()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,93 @@
+"""
+Test the lazily laid-out timeline against list-based line lookup.
+"""
+
+from karaoke.karafun_renderer import KarafunRenderer
+from karaoke.text_layout import TextLayout
+from karaoke.time_badge import TimeBadge
+from karaoke.timeline import Timeline
+from karaoke.timing import create_word_timings
+
+
+LYRICS = [
+    {'text': 'First line', 'start_time': 1.0, 'end_time': 3.0},
+    {'text': 'Second line', 'start_time': 3.0, 'end_time': 5.0},
+    {'text': 'After a gap', 'start_time': 7.0, 'end_time': 9.0},
+    {'text': 'Overlapping', 'start_time': 8.5, 'end_time': 10.0}
+]
+
+
+def _lines_data(text_layout):
+    lines_data = []
+    for lyric in LYRICS:
+        word_timings = create_word_timings(lyric['text'], lyric['start_time'], lyric['end_time'])
+        lines_data.append({
+            'word_timings': word_timings,
+            'word_sizes': text_layout.measure_words([wt.text for wt in word_timings]),
+            'start_time': lyric['start_time'],
+            'end_time': lyric['end_time'],
+            'text': lyric['text']
+        })
+    return lines_data
+
+
+def test_lookup_matches_lists():
+    """Test that the timeline finds the same lines as a full list scan."""
+    print("Testing timeline lookup...")
+    
+    text_layout = TextLayout(font_size=24)
+    lines_data = _lines_data(text_layout)
+    timeline = Timeline(LYRICS, text_layout)
+    renderer = KarafunRenderer(width=320, height=180)
+    badge = TimeBadge(text_layout, 320, 180)
+    
+    for step in range(0, 120):
+        current_time = step / 10
+        expected = renderer._find_lines(lines_data, current_time)
+        found = renderer._find_lines(timeline, current_time)
+        for expected_line, line in zip(expected, found):
+            if expected_line is None:
+                assert line is None, f"No line expected at {current_time}s"
+            else:
+                assert line['text'] == expected_line['text'], f"Wrong line at {current_time}s"
+                assert line['word_sizes'] == expected_line['word_sizes']
+        
+        assert badge.state(current_time, 12, timeline) == badge.state(current_time, 12, lines_data)
+    
+    print("✓ Timeline lookup test passed")
+
+
+def test_lazy_layout_and_eviction():
+    """Test that lines are laid out on demand and old lines are dropped."""
+    print("Testing lazy layout...")
+    
+    lyrics = [{'text': f'Line {i}', 'start_time': i, 'end_time': i + 0.9} for i in range(1000)]
+    timeline = Timeline(lyrics, TextLayout(font_size=24), max_lines=4)
+    assert len(timeline) == 1000 and len(timeline._lines) == 0
+    assert timeline.end_time == 999.9
+    
+    for step in range(0, 500):
+        timeline.find_lines(step / 10)
+    assert len(timeline._lines) <= 4, "Finished lines should be evicted"
+    assert timeline.find_lines(10.5)[0]['text'] == 'Line 10'
+    
+    print("✓ Lazy layout test passed")
+
+
+def run_all_tests():
+    """Run all timeline tests."""
+    print("=" * 50)
+    print("Running Timeline Tests")
+    print("=" * 50 + "\n")
+    
+    test_lookup_matches_lists()
+    print()
+    test_lazy_layout_and_eviction()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,59 @@
+"""
+Test the typewriter title card and its state cache.
+"""
+
+from karaoke.title_card import TitleCard
+from karaoke.text_layout import TextLayout
+
+
+def test_typewriter_state():
+    """Test title, artist and underline progression over time."""
+    print("Testing typewriter state...")
+    
+    card = TitleCard('Song', 'Artist', TextLayout(font_size=32), 640, 360, typewriter_speed=0.1)
+    
+    assert card.state(0.0) == (0, 0, None)
+    assert card.state(0.25) == (2, 0, None)
+    
+    # Title is complete at 0.4s, the underline appears with it
+    assert card.state(0.45) == (4, 0, card.full_title_width)
+    
+    # Artist types after the title, underline reaches full width
+    assert card.state(5.0) == (4, 6, card.full_title_width)
+    
+    print("✓ Typewriter state test passed")
+
+
+def test_card_cache():
+    """Test that each typewriter state is built only once."""
+    print("Testing title card cache...")
+    
+    card = TitleCard('Song', 'Artist', TextLayout(font_size=32), 640, 360, typewriter_speed=0.1)
+    
+    first = card.sprites_at(0.21)
+    assert card.sprites_at(0.29) is first, "Same state should reuse the built sprites"
+    assert card.sprites_at(0.31) is not first
+    
+    # Full card: title, underline and artist
+    assert len(card.sprites_at(5.0)) == 3
+    
+    print("✓ Title card cache test passed")
+
+
+def run_all_tests():
+    """Run all title card tests."""
+    print("=" * 50)
+    print("Running Title Card Tests")
+    print("=" * 50 + "\n")
+    
+    test_typewriter_state()
+    print()
+    test_card_cache()
+    
+    print("\n" + "=" * 50)
+    print("All tests passed! ✓")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    run_all_tests()